@@ -0,0 +1,33 @@
+"""
+Delta-encoded state history.
+
+Each state row records which collections it wrote (changed_collections) and,
+for every collection it did not write, the id of the state row that holds the
+latest version of that collection. A NULL pointer means the rows are stored
+under the state's own id, so rows written before this migration still load.
+"""
+
+from yoyo import step
+
+__depends__ = {"001_initial_schema"}
+
+_POINTER_COLUMNS = (
+    "memories_state_id",
+    "discoveries_state_id",
+    "explored_zones_state_id",
+    "modifiers_state_id",
+    "checkpoints_state_id",
+)
+
+steps = [
+    step(
+        "ALTER TABLE state ADD COLUMN changed_collections TEXT",
+        "ALTER TABLE state DROP COLUMN changed_collections",
+    ),
+] + [
+    step(
+        f"ALTER TABLE state ADD COLUMN {column} INTEGER",
+        f"ALTER TABLE state DROP COLUMN {column}",
+    )
+    for column in _POINTER_COLUMNS
+]
@@ -0,0 +1,24 @@
+"""
+Secondary indexes for the state schema.
+
+Collection loaders filter child tables by state_id and order by timestamp, and
+load_latest_state orders state by timestamp. Without these indexes both scan
+every row ever written.
+"""
+
+from yoyo import step
+
+from modules.database import STATE_INDEXES
+
+__depends__ = {"002_state_delta"}
+
+# idx_state_version was added later, by 004
+_INDEXES = [index for index in STATE_INDEXES if index[0] != "idx_state_version"]
+
+steps = [
+    step(
+        f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})",
+        f"DROP INDEX IF EXISTS {name}",
+    )
+    for name, table, columns in _INDEXES
+]
@@ -0,0 +1,21 @@
+"""
+Index state rows by version.
+
+EternaDatabase.load_state_at(version=...) looks a state up by its version
+number; without this index that lookup scans the whole state history.
+"""
+
+from yoyo import step
+
+from modules.database import STATE_INDEXES
+
+__depends__ = {"003_state_indexes"}
+
+steps = [
+    step(
+        f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})",
+        f"DROP INDEX IF EXISTS {name}",
+    )
+    for name, table, columns in STATE_INDEXES
+    if name == "idx_state_version"
+]
@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional, Union
 from modules.dependency_injection import get_container
 from modules.governor import AlignmentGovernor
 from modules.interfaces import ModuleInterface
+from modules.state_records import to_builtin
 
 
 class APIInterface(ModuleInterface):
@@ -88,7 +89,7 @@ class APIInterface(ModuleInterface):
         
         # Get the modifiers if available
         if hasattr(self._world.eterna.state_tracker, "modifiers"):
-            state["modifiers"] = self._world.eterna.state_tracker.modifiers
+            state["modifiers"] = to_builtin(list(self._world.eterna.state_tracker.modifiers))
         
         # Get the current zone if available
         if hasattr(self._world.eterna.exploration, "current_zone"):
@@ -122,7 +123,6 @@ class APIInterface(ModuleInterface):
                 metrics = self._world.collect_metrics()
                 if self._governor.tick(metrics):
                     self._world.step()
-                    self._world.eterna.runtime.cycle_count += 1
                     result = {"success": True, "message": "Simulation stepped"}
                 else:
                     result = {"success": False, "message": "Governor prevented step"}
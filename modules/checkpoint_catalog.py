@@ -0,0 +1,343 @@
+"""
+Persistent catalog of the checkpoints in a directory.
+
+The governor used to find its latest checkpoint and decide what to prune by
+globbing the checkpoint directory, and the API listed the directory on every
+rollback request. With a long retention that means stat-ing thousands of
+files on every save and rollback. Instead, each checkpoint directory holds a
+small SQLite catalog (``catalog.db``) with one row per checkpoint: its size,
+a checksum, the state version it was taken at, whether it is a full or a
+differential checkpoint, and the base it refers to.
+
+Rows are written in the same step as the file: write_checkpoint_file() inserts
+the row in a transaction, renames the temporary file into place and only then
+commits. If the rename fails the row is rolled back. If the process dies
+between the rename and the commit, the file exists without a row, so the
+directory is scanned once when the catalog is first opened in a process and
+any such file is added back (and rows whose file is gone are dropped).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from modules.checkpoint_format import CheckpointFormatError, container_checksum, is_checkpoint_container, read_container
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = "catalog.db"
+CHECKPOINT_PATTERN = "ckpt_*.bin"
+
+KIND_FULL = "full"
+KIND_DIFFERENTIAL = "differential"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    checksum TEXT,
+    state_version INTEGER,
+    kind TEXT NOT NULL,
+    parent TEXT,
+    created_at REAL NOT NULL
+)
+"""
+_COLUMNS = "name, size, checksum, state_version, kind, parent, created_at"
+
+
+@dataclass(frozen=True)
+class CheckpointEntry:
+    """
+    One catalogued checkpoint.
+
+    Attributes:
+        path: Path of the checkpoint file.
+        size: Size of the file in bytes.
+        checksum: Checksum of the container, or None for legacy files.
+        state_version: Tracker state version the checkpoint was taken at.
+        kind: KIND_FULL or KIND_DIFFERENTIAL.
+        parent: File name of the base of a differential checkpoint.
+        created_at: Unix time the checkpoint was written.
+    """
+
+    path: Path
+    size: int
+    checksum: Optional[str]
+    state_version: Optional[int]
+    kind: str
+    parent: Optional[str]
+    created_at: float
+
+    @property
+    def name(self) -> str:
+        """Return the file name of the checkpoint."""
+        return self.path.name
+
+    def to_record(self) -> Dict[str, Any]:
+        """
+        Return the entry as a checkpoint record for the API.
+
+        The record uses the fields of the records registered with the state
+        tracker, with the catalog columns under ``metadata``.
+        """
+        return {
+            "path": str(self.path),
+            "kind": "auto",
+            "label": self.name,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.created_at)),
+            "size_bytes": self.size,
+            "state_version": self.state_version,
+            "metadata": {"checksum": self.checksum, "format": self.kind, "base": self.parent},
+        }
+
+
+class CheckpointCatalog:
+    """
+    SQLite index of the checkpoints in one directory.
+
+    Use CheckpointCatalog.for_directory() to share one catalog, and its
+    connection, between the governor and the API. The connection is opened
+    lazily; reads on a directory that does not exist return nothing without
+    creating it.
+
+    Attributes:
+        directory: The checkpoint directory.
+        pattern: Glob matching checkpoint files, used when reconciling.
+    """
+
+    _instances: Dict[str, "CheckpointCatalog"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory: Union[str, Path], pattern: str = CHECKPOINT_PATTERN):
+        """
+        Initialize the catalog without opening it.
+
+        Args:
+            directory: The checkpoint directory; the catalog is stored in it.
+            pattern: Glob matching checkpoint files. Defaults to "ckpt_*.bin".
+        """
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def for_directory(cls, directory: Union[str, Path]) -> "CheckpointCatalog":
+        """
+        Return the shared catalog of a directory, creating it on first use.
+
+        Args:
+            directory: The checkpoint directory.
+
+        Returns:
+            CheckpointCatalog: The one catalog instance for that directory.
+        """
+        key = str(Path(directory).resolve())
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls._instances[key] = cls(directory)
+            return catalog
+
+    @property
+    def db_path(self) -> Path:
+        """Return the path of the catalog database."""
+        return self.directory / CATALOG_FILENAME
+
+    def _connect(self, create: bool) -> Optional[sqlite3.Connection]:
+        """Open the catalog, reconciling it with the directory, if needed."""
+        if self._conn is not None:
+            return self._conn
+        if not create and not self.directory.is_dir():
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Shared by the writer thread, the tick thread and API threads under _lock
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None, check_same_thread=False)
+        conn.execute(_SCHEMA)
+        self._conn = conn
+        self._reconcile(conn)
+        return conn
+
+    @contextmanager
+    def recording(self, path: Union[str, Path], size: int, checksum: Optional[str] = None,
+                  state_version: Optional[int] = None, parent: Optional[str] = None) -> Iterator[None]:
+        """
+        Add a checkpoint in a transaction that commits after the block.
+
+        Put the rename that publishes the file inside the block: if it raises,
+        the row is rolled back.
+
+        Args:
+            path: Final path of the checkpoint, inside the directory.
+            size: Size of the file in bytes.
+            checksum: Checksum of the container.
+            state_version: Tracker state version the checkpoint was taken at.
+            parent: File name of the base, for a differential checkpoint.
+        """
+        with self._lock:
+            conn = self._connect(create=True)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO checkpoints ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (Path(path).name, size, checksum, state_version,
+                     KIND_DIFFERENTIAL if parent else KIND_FULL, parent, time.time()),
+                )
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def add(self, path: Union[str, Path], size: int, checksum: Optional[str] = None,
+            state_version: Optional[int] = None, parent: Optional[str] = None) -> None:
+        """Add or replace the row of a checkpoint that is already in place."""
+        with self.recording(path, size, checksum, state_version, parent):
+            pass
+
+    def _entry(self, row: Tuple[Any, ...]) -> CheckpointEntry:
+        name, size, checksum, state_version, kind, parent, created_at = row
+        return CheckpointEntry(self.directory / name, size, checksum, state_version, kind, parent, created_at)
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            return conn.execute(sql, params).fetchall()
+
+    def get(self, name: str) -> Optional[CheckpointEntry]:
+        """
+        Look up a checkpoint by file name.
+
+        Args:
+            name: File name of the checkpoint.
+
+        Returns:
+            The entry, or None if the checkpoint is not catalogued.
+        """
+        rows = self._query(f"SELECT {_COLUMNS} FROM checkpoints WHERE name = ?", (name,))
+        return self._entry(rows[0]) if rows else None
+
+    def latest(self) -> Optional[CheckpointEntry]:
+        """Return the newest checkpoint, or None if there is none."""
+        rows = self._query(f"SELECT {_COLUMNS} FROM checkpoints ORDER BY name DESC LIMIT 1")
+        return self._entry(rows[0]) if rows else None
+
+    def entries(self, limit: Optional[int] = None) -> List[CheckpointEntry]:
+        """
+        Return the newest checkpoints, oldest first.
+
+        Checkpoint names embed their creation time in milliseconds, so they
+        are ordered by name, as the directory listing was.
+
+        Args:
+            limit: Maximum number of entries, or None for all of them.
+
+        Returns:
+            List[CheckpointEntry]: The entries, oldest first.
+        """
+        rows = self._query(
+            f"SELECT {_COLUMNS} FROM checkpoints ORDER BY name DESC LIMIT ?",
+            (-1 if limit is None else max(0, int(limit)),),
+        )
+        return [self._entry(row) for row in reversed(rows)]
+
+    def __len__(self) -> int:
+        rows = self._query("SELECT COUNT(*) FROM checkpoints")
+        return rows[0][0] if rows else 0
+
+    def prune(self, keep: int) -> List[Path]:
+        """
+        Delete all but the newest checkpoints, keeping the bases they need.
+
+        Args:
+            keep: Number of most recent checkpoints to keep.
+
+        Returns:
+            List[Path]: The deleted files.
+        """
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            keep = max(0, int(keep))
+            stale = conn.execute(
+                "SELECT name FROM checkpoints WHERE name NOT IN "
+                "(SELECT name FROM checkpoints ORDER BY name DESC LIMIT ?) "
+                "AND name NOT IN (SELECT parent FROM "
+                "(SELECT parent FROM checkpoints ORDER BY name DESC LIMIT ?) WHERE parent IS NOT NULL) "
+                "ORDER BY name",
+                (keep, keep),
+            ).fetchall()
+            if not stale:
+                return []
+            removed = []
+            for (name,) in stale:
+                path = self.directory / name
+                path.unlink(missing_ok=True)
+                removed.append(path)
+            conn.executemany("DELETE FROM checkpoints WHERE name = ?", stale)
+            return removed
+
+    def reconcile(self) -> Tuple[int, int]:
+        """
+        Bring the catalog in line with the files in the directory.
+
+        Scans the directory once. Called when the catalog is opened; call it
+        again if checkpoints were added or removed by hand.
+
+        Returns:
+            Tuple[int, int]: Number of rows added and removed.
+        """
+        with self._lock:
+            conn = self._connect(create=False)
+            return self._reconcile(conn) if conn is not None else (0, 0)
+
+    def _reconcile(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        on_disk = {path.name: path for path in self.directory.glob(self.pattern) if path.is_file()}
+        known = {name for (name,) in conn.execute("SELECT name FROM checkpoints")}
+        missing = sorted(known - on_disk.keys())
+        added = sorted(on_disk.keys() - known)
+        if missing:
+            conn.executemany("DELETE FROM checkpoints WHERE name = ?", [(name,) for name in missing])
+        for name in added:
+            path = on_disk[name]
+            stat = path.stat()
+            checksum, state_version, parent = _describe(path)
+            conn.execute(
+                f"INSERT INTO checkpoints ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, stat.st_size, checksum, state_version,
+                 KIND_DIFFERENTIAL if parent else KIND_FULL, parent, stat.st_mtime),
+            )
+        if missing or added:
+            logger.info("Reconciled checkpoint catalog in %s: %d added, %d removed",
+                        self.directory, len(added), len(missing))
+        return len(added), len(missing)
+
+    def close(self) -> None:
+        """Close the connection; the catalog reopens on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _describe(path: Path) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """Read the checksum, state version and base of a checkpoint file, if it is a container."""
+    try:
+        if not is_checkpoint_container(path):
+            return None, None, None
+        sections = read_container(path, verify=False, sections=("chain", "runtime"))
+        return (
+            container_checksum(path),
+            sections.get("runtime", {}).get("state_version"),
+            sections.get("chain", {}).get("base"),
+        )
+    except (OSError, CheckpointFormatError):
+        return None, None, None
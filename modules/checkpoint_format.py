@@ -0,0 +1,346 @@
+"""
+Versioned binary container for world checkpoints.
+
+Checkpoints used to be pickles of a dict holding tracker state and torch
+tensors. Loading one meant unpickling it in full, which is slow, cannot be
+streamed, and runs arbitrary code if the file is not trustworthy. This module
+defines a container that holds only data:
+
+- a fixed header (magic, format version, flags, section count);
+- a section table, one entry per section with its name, kind, codec, offset,
+  stored and raw lengths, and the CRC32 of the stored bytes;
+- the sections, each starting on a 64-byte boundary.
+
+A section is either JSON (tracker state, runtime counters) or a set of
+tensors. A tensor section starts with a small JSON index (name, dtype, shape,
+offset) followed by the raw little-endian tensor bytes, each tensor again
+aligned to 64 bytes. Every section can be stored uncompressed or with zlib or
+lzma from the standard library. Uncompressed tensor sections are memory
+mapped on load, so tensors are paged in from disk only when they are used.
+
+Sections are written one after the other and the table is filled in at the
+end, so writing never holds more than one compressed section in memory.
+"""
+
+import json
+import lzma
+import mmap
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+import torch
+
+from modules.state_records import json_default
+
+MAGIC = b"ETNACKPT"
+FORMAT_VERSION = 1
+
+# Magic, format version, flags, number of sections
+_HEADER = struct.Struct("<8sHHI")
+# Name, kind, codec, offset, stored length, raw length, CRC32 of the stored bytes
+_SECTION_ENTRY = struct.Struct("<16sBBxxQQQI")
+# Length of the JSON index at the start of a tensor section
+_TENSOR_INDEX_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 64
+
+KIND_JSON = 0
+KIND_TENSORS = 1
+
+CODECS: Dict[str, int] = {"none": 0, "zlib": 1, "lzma": 2}
+_CODEC_NAMES = {code: name for name, code in CODECS.items()}
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class CheckpointFormatError(ValueError):
+    """Raised when a file is not a valid checkpoint container."""
+
+
+def _padding(offset: int) -> int:
+    return -offset % _ALIGNMENT
+
+
+def is_tensor_section(value: Any) -> bool:
+    """Return True if a section value is a non-empty mapping of names to tensors."""
+    return (
+        isinstance(value, Mapping)
+        and len(value) > 0
+        and all(isinstance(v, torch.Tensor) for v in value.values())
+    )
+
+
+def is_checkpoint_container(path: Union[str, Path]) -> bool:
+    """Return True if the file starts with the container magic."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _tensor_bytes(tensor: torch.Tensor) -> memoryview:
+    """Return the raw little-endian bytes of a tensor."""
+    tensor = tensor.detach().cpu().contiguous()
+    if not _LITTLE_ENDIAN and tensor.element_size() > 1:
+        return memoryview(tensor.numpy().byteswap().tobytes())
+    return memoryview(tensor.reshape(-1).view(torch.uint8).numpy())
+
+
+def _dtype_from_name(name: str) -> torch.dtype:
+    dtype = getattr(torch, name, None)
+    if not isinstance(dtype, torch.dtype):
+        raise CheckpointFormatError(f"Unknown tensor dtype {name!r}")
+    return dtype
+
+
+class _SectionSink:
+    """Compresses and checksums the bytes of one section while writing them."""
+
+    def __init__(self, f: BinaryIO, codec: str):
+        self._f = f
+        if codec == "zlib":
+            self._compressor = zlib.compressobj(6)
+        elif codec == "lzma":
+            self._compressor = lzma.LZMACompressor()
+        else:
+            self._compressor = None
+        self.raw_length = 0
+        self.stored_length = 0
+        self.crc = 0
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._f.write(data)
+            self.stored_length += len(data)
+            self.crc = zlib.crc32(data, self.crc)
+
+    def write(self, data: Union[bytes, memoryview]) -> None:
+        self.raw_length += len(data)
+        self._emit(self._compressor.compress(data) if self._compressor is not None else data)
+
+    def close(self) -> None:
+        if self._compressor is not None:
+            self._emit(self._compressor.flush())
+
+
+def _write_tensors(sink: _SectionSink, tensors: Mapping[str, torch.Tensor]) -> None:
+    """Write a tensor section: index length, JSON index, then aligned raw tensors."""
+    index = []
+    offset = 0
+    for name, tensor in tensors.items():
+        nbytes = tensor.numel() * tensor.element_size()
+        index.append({
+            "name": name,
+            "dtype": str(tensor.dtype).rsplit(".", 1)[-1],
+            "shape": list(tensor.shape),
+            "offset": offset,
+            "nbytes": nbytes,
+        })
+        offset += nbytes + _padding(nbytes)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    header = _TENSOR_INDEX_LENGTH.pack(len(index_bytes)) + index_bytes
+    sink.write(header + bytes(_padding(len(header))))
+
+    for entry, tensor in zip(index, tensors.values()):
+        if entry["nbytes"]:
+            sink.write(_tensor_bytes(tensor))
+        sink.write(bytes(_padding(entry["nbytes"])))
+
+
+def write_container(f: BinaryIO, sections: Mapping[str, Any], codecs: Optional[Mapping[str, str]] = None,
+                    default_codec: str = "zlib") -> int:
+    """
+    Write sections to a binary file as a checkpoint container.
+
+    Args:
+        f: Seekable binary file positioned at its start.
+        sections: Section name to value; a mapping of names to tensors is
+            stored as a tensor section, anything else as JSON.
+        codecs: Optional section name to codec ("none", "zlib" or "lzma").
+        default_codec: Codec for sections not listed in codecs. Defaults to "zlib".
+
+    Returns:
+        int: Size of the container in bytes.
+
+    Raises:
+        CheckpointFormatError: If a section name or codec is invalid.
+    """
+    codecs = codecs or {}
+    names = list(sections)
+    table_offset = _HEADER.size
+    data_offset = table_offset + _SECTION_ENTRY.size * len(names)
+    f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(names)))
+    f.write(bytes(data_offset - table_offset + _padding(data_offset)))
+    offset = data_offset + _padding(data_offset)
+
+    entries = []
+    for name in names:
+        encoded_name = name.encode("utf-8")
+        if len(encoded_name) > 16:
+            raise CheckpointFormatError(f"Section name {name!r} is longer than 16 bytes")
+        codec = codecs.get(name, default_codec)
+        if codec not in CODECS:
+            raise CheckpointFormatError(f"Unknown codec {codec!r} for section {name!r}")
+
+        value = sections[name]
+        sink = _SectionSink(f, codec)
+        if is_tensor_section(value):
+            kind = KIND_TENSORS
+            _write_tensors(sink, value)
+        else:
+            kind = KIND_JSON
+            sink.write(json.dumps(value, separators=(",", ":"), default=json_default).encode("utf-8"))
+        sink.close()
+        entries.append(_SECTION_ENTRY.pack(
+            encoded_name, kind, CODECS[codec], offset, sink.stored_length, sink.raw_length, sink.crc
+        ))
+        offset += sink.stored_length
+        pad = _padding(offset)
+        f.write(bytes(pad))
+        offset += pad
+
+    f.seek(table_offset)
+    f.write(b"".join(entries))
+    f.seek(offset)
+    return offset
+
+
+def _read_table(buffer: Any) -> Iterator[Tuple[str, int, int, int, int, int, int]]:
+    """Yield the validated section table entries of a container."""
+    if len(buffer) < _HEADER.size:
+        raise CheckpointFormatError("File is too short to be a checkpoint")
+    magic, version, _flags, count = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise CheckpointFormatError("Not a checkpoint container")
+    if version > FORMAT_VERSION:
+        raise CheckpointFormatError(f"Unsupported checkpoint format version {version}")
+    if _HEADER.size + count * _SECTION_ENTRY.size > len(buffer):
+        raise CheckpointFormatError("Truncated section table")
+    for i in range(count):
+        raw_name, kind, codec, offset, stored, raw, crc = _SECTION_ENTRY.unpack_from(
+            buffer, _HEADER.size + i * _SECTION_ENTRY.size
+        )
+        name = raw_name.rstrip(b"\0").decode("utf-8", "replace")
+        if offset + stored > len(buffer):
+            raise CheckpointFormatError(f"Section {name!r} extends past the end of the file")
+        if codec not in _CODEC_NAMES or kind not in (KIND_JSON, KIND_TENSORS):
+            raise CheckpointFormatError(f"Invalid table entry for section {name!r}")
+        yield name, kind, codec, offset, stored, raw, crc
+
+
+def _decompress(data: memoryview, codec: int, raw_length: int) -> bytes:
+    if codec == CODECS["zlib"]:
+        data = zlib.decompress(data)
+    elif codec == CODECS["lzma"]:
+        data = lzma.decompress(data)
+    else:
+        data = bytes(data)
+    if len(data) != raw_length:
+        raise CheckpointFormatError("Section length does not match the section table")
+    return data
+
+
+def _read_tensors(buffer: Any, base: int, length: int) -> Dict[str, torch.Tensor]:
+    """Build tensors over a tensor section without copying uncompressed data."""
+    (index_length,) = _TENSOR_INDEX_LENGTH.unpack_from(buffer, base)
+    start = base + _TENSOR_INDEX_LENGTH.size
+    index = json.loads(bytes(buffer[start:start + index_length]))
+    header = _TENSOR_INDEX_LENGTH.size + index_length
+    data_start = base + header + _padding(header)
+
+    tensors = {}
+    for entry in index:
+        dtype = _dtype_from_name(entry["dtype"])
+        shape = tuple(entry["shape"])
+        offset = data_start + entry["offset"]
+        if offset + entry["nbytes"] > base + length:
+            raise CheckpointFormatError(f"Tensor {entry['name']!r} extends past its section")
+        if entry["nbytes"] == 0:
+            tensors[entry["name"]] = torch.empty(shape, dtype=dtype)
+            continue
+        count = entry["nbytes"] // torch.empty((), dtype=dtype).element_size()
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+        if not _LITTLE_ENDIAN and tensor.element_size() > 1:
+            tensor = torch.from_numpy(tensor.numpy().byteswap())
+        tensors[entry["name"]] = tensor
+    return tensors
+
+
+def container_checksum(path: Union[str, Path]) -> str:
+    """
+    Return a checksum of a container's contents without reading its sections.
+
+    The section table stores the CRC32 of every section, so the CRC32 of the
+    header and table covers the whole file while only reading its first bytes.
+
+    Args:
+        path: Path of the container.
+
+    Returns:
+        str: The checksum as eight hex digits.
+
+    Raises:
+        CheckpointFormatError: If the file is not a valid container.
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise CheckpointFormatError("File is too short to be a checkpoint")
+        magic, _version, _flags, count = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise CheckpointFormatError("Not a checkpoint container")
+        table = f.read(count * _SECTION_ENTRY.size)
+    if len(table) < count * _SECTION_ENTRY.size:
+        raise CheckpointFormatError("Truncated section table")
+    return f"{zlib.crc32(table, zlib.crc32(header)):08x}"
+
+
+def read_container(path: Union[str, Path], verify: bool = True,
+                   sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Read the sections of a checkpoint container.
+
+    The file is memory mapped copy-on-write. Tensors in uncompressed sections
+    are views of the mapping, so their pages are read from disk lazily;
+    writing to them never changes the file.
+
+    Args:
+        path: Path of the container.
+        verify: Whether to check each section's CRC32. Defaults to True.
+        sections: Optional names of the sections to read; others are skipped
+            without being read from disk. Defaults to all sections.
+
+    Returns:
+        Dict[str, Any]: Section name to its JSON value or its name-to-tensor dict.
+
+    Raises:
+        CheckpointFormatError: If the file is not a valid container.
+    """
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except ValueError as e:
+            raise CheckpointFormatError("File is too short to be a checkpoint") from e
+
+    wanted = set(sections) if sections is not None else None
+    result: Dict[str, Any] = {}
+    for name, kind, codec, offset, stored, raw, crc in _read_table(buffer):
+        if wanted is not None and name not in wanted:
+            continue
+        view = memoryview(buffer)[offset:offset + stored]
+        try:
+            if verify and zlib.crc32(view) != crc:
+                raise CheckpointFormatError(f"Checksum mismatch in section {name!r}")
+            if kind == KIND_JSON:
+                result[name] = json.loads(_decompress(view, codec, raw))
+            elif codec == CODECS["none"]:
+                result[name] = _read_tensors(buffer, offset, stored)
+            else:
+                result[name] = _read_tensors(bytearray(_decompress(view, codec, raw)), 0, raw)
+        except (zlib.error, lzma.LZMAError, ValueError, struct.error) as e:
+            if isinstance(e, CheckpointFormatError):
+                raise
+            raise CheckpointFormatError(f"Corrupt section {name!r}: {e}") from e
+        finally:
+            view.release()
+    return result
@@ -0,0 +1,463 @@
+"""
+Background checkpoint writing for the AlignmentGovernor.
+
+Saving a checkpoint used to pickle the tracker collections and the policy
+weights on the simulation thread. Now the tick thread only captures a
+consistent in-memory snapshot (EternaWorld.capture_checkpoint), and a
+BackgroundCheckpointWriter serializes, compresses and fsyncs it on its own
+thread. The writer holds at most one checkpoint at a time: if the previous
+one is still being written, submit() refuses the new one and the caller tries
+again on a later tick, so a slow disk applies backpressure instead of queueing
+snapshots in memory.
+
+Finished checkpoints are handed back through completed(), which the governor
+drains on the tick thread to register them with the state tracker.
+
+On disk a checkpoint is a container in the format of
+modules.checkpoint_format, written under a temporary name and renamed into
+place, so a crash never leaves a partial checkpoint under its final name.
+read_checkpoint_file() can still read the pickles written by earlier
+versions, but only when the caller trusts the file.
+
+A checkpoint is either full or differential. A differential checkpoint names
+a full base checkpoint in the same directory and stores only what changed
+since it: tracker collections that were modified (for the bounded rings, just
+the entries appended since the base) and policy tensors that were updated.
+read_checkpoint_file() resolves the base transparently, and
+prune_checkpoints() never deletes a base that a kept checkpoint still needs.
+
+Given a CheckpointCatalog, write_checkpoint_file() also records the
+checkpoint in it, committing the row together with the rename.
+"""
+
+import gzip
+import itertools
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+from modules.checkpoint_catalog import CheckpointCatalog
+from modules.checkpoint_format import (
+    CheckpointFormatError,
+    container_checksum,
+    is_checkpoint_container,
+    read_container,
+    write_container,
+)
+
+logger = logging.getLogger(__name__)
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+# Codecs of the checkpoint sections; the policy weights stay uncompressed so
+# loading can memory map them
+DEFAULT_CODECS: Dict[str, str] = {"tracker": "zlib", "policy": "none", "runtime": "none", "chain": "none"}
+
+
+def _appended_tail(base: List[Any], current: List[Any]) -> Optional[List[Any]]:
+    """
+    Return the entries appended to a bounded ring since it held ``base``.
+
+    A ring that was only appended to (evicting from the front) holds a
+    suffix of ``base`` followed by the new entries. Entries are compared by
+    identity, since the tracker shares its immutable records with captures.
+
+    Args:
+        base: The ring's entries when the base checkpoint was captured.
+        current: The ring's entries now.
+
+    Returns:
+        The appended entries, or None if ``current`` is not of that shape.
+    """
+    if not base or not current:
+        return None
+    first = current[0]
+    for start, entry in enumerate(base):
+        if entry is first:
+            break
+    else:
+        return None
+    overlap = len(base) - start
+    if overlap > len(current):
+        return None
+    for kept, entry in zip(itertools.islice(base, start, None), current):
+        if kept is not entry:
+            return None
+    return current[overlap:]
+
+
+def _to_sections(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Split EternaWorld checkpoint data into container sections.
+
+    If the data names a ``base``, the tracker collections that were only
+    appended to since the base are reduced to their new entries, and a
+    "chain" section records the base and how to rebuild them.
+    """
+    tracker = data.get("state_tracker_data", {})
+    runtime = {"cycle_count": data.get("cycle_count", 0)}
+    if data.get("state_version") is not None:
+        runtime["state_version"] = data["state_version"]
+    sections: Dict[str, Any] = {"tracker": tracker, "runtime": runtime}
+    policy = (data.get("companion_trainer_weights") or {}).get("policy")
+    if policy:
+        sections["policy"] = dict(policy)
+
+    base = data.get("base")
+    if base is not None:
+        tracker = dict(tracker)
+        appended = {}
+        for key, value in tracker.items():
+            base_value = base["tracker"].get(key)
+            if isinstance(value, list) and isinstance(base_value, list):
+                tail = _appended_tail(base_value, value)
+                if tail is not None:
+                    tracker[key] = tail
+                    appended[key] = len(value)
+        sections["tracker"] = tracker
+        sections["chain"] = {"base": base["name"], "appended": appended}
+    return sections
+
+
+def _merge_sections(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the sections of a differential checkpoint to those of its base."""
+    appended = delta["chain"].get("appended", {})
+    tracker = dict(base.get("tracker", {}))
+    for key, value in delta.get("tracker", {}).items():
+        if key in appended:
+            length = appended[key]
+            value = (list(tracker.get(key) or []) + value)[-length:] if length else []
+        tracker[key] = value
+
+    merged = dict(delta, tracker=tracker)
+    merged.pop("chain")
+    if "policy" in base or "policy" in delta:
+        merged["policy"] = {**base.get("policy", {}), **delta.get("policy", {})}
+    return merged
+
+
+def _from_sections(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild EternaWorld checkpoint data from container sections."""
+    return {
+        "state_tracker_data": sections.get("tracker", {}),
+        "companion_trainer_weights": {"policy": sections.get("policy")},
+        "cycle_count": sections.get("runtime", {}).get("cycle_count", 0),
+    }
+
+
+def _base_path(path: Path, base: Any) -> Path:
+    """Resolve the base named by a differential checkpoint, next to it."""
+    if not isinstance(base, str) or not base or Path(base).name != base:
+        raise CheckpointFormatError(f"Invalid base {base!r} in {path.name}")
+    return path.with_name(base)
+
+
+def checkpoint_base(path: Union[str, Path]) -> Optional[str]:
+    """
+    Return the file name of a checkpoint's base, or None for a full checkpoint.
+
+    Only the small chain section is read. Files that are not readable
+    containers are treated as full checkpoints.
+    """
+    try:
+        if not is_checkpoint_container(path):
+            return None
+        return read_container(path, sections=("chain",)).get("chain", {}).get("base")
+    except (OSError, CheckpointFormatError):
+        return None
+
+
+def prune_checkpoints(directory: Union[str, Path], keep: int, pattern: str = "ckpt_*.bin") -> List[Path]:
+    """
+    Delete all but the newest checkpoints, keeping the bases they need.
+
+    This scans the directory and reads the chain section of every kept
+    checkpoint; CheckpointCatalog.prune() does the same from the catalog.
+
+    Args:
+        directory: Directory holding the checkpoints.
+        keep: Number of most recent checkpoints to keep.
+        pattern: Glob matching the checkpoint files, which must sort by age.
+
+    Returns:
+        List[Path]: The deleted files.
+    """
+    files = sorted(Path(directory).glob(pattern))
+    if len(files) <= keep:
+        return []
+    survivors = files[len(files) - keep:] if keep > 0 else []
+    needed = {checkpoint_base(path) for path in survivors}
+    removed = []
+    for old in files[:len(files) - keep]:
+        if old.name in needed:
+            continue
+        old.unlink(missing_ok=True)
+        removed.append(old)
+    return removed
+
+
+def write_checkpoint_file(path: Union[str, Path], data: Dict[str, Any],
+                          codecs: Optional[Dict[str, str]] = None,
+                          catalog: Optional[CheckpointCatalog] = None) -> int:
+    """
+    Atomically write a checkpoint container.
+
+    The data is written to ``<path>.tmp``, fsynced, renamed over ``path``
+    and the directory entry fsynced. With a catalog, the checkpoint's row is
+    committed only once the rename succeeded.
+
+    Args:
+        path: Destination of the checkpoint.
+        data: Checkpoint data from EternaWorld.capture_checkpoint(). For a
+            differential checkpoint it also holds ``base``: the base's file
+            name (``name``) and its captured tracker data (``tracker``).
+        codecs: Optional section name ("tracker", "policy", "runtime") to
+            codec ("none", "zlib" or "lzma"), overriding DEFAULT_CODECS.
+        catalog: Optional catalog of the checkpoint's directory to record
+            the checkpoint in.
+
+    Returns:
+        int: Size of the written checkpoint in bytes.
+
+    Raises:
+        OSError, TypeError, CheckpointFormatError: If the checkpoint cannot
+            be written; the temporary file is removed.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            size = write_container(f, _to_sections(data), {**DEFAULT_CODECS, **(codecs or {})})
+            f.flush()
+            os.fsync(f.fileno())
+        if catalog is None:
+            os.replace(tmp_path, path)
+        else:
+            base = data.get("base")
+            with catalog.recording(path, size, container_checksum(tmp_path), data.get("state_version"),
+                                   base["name"] if base is not None else None):
+                os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _fsync_directory(path.parent)
+    return size
+
+
+def read_checkpoint_file(path: Union[str, Path], allow_pickle: bool = True) -> Dict[str, Any]:
+    """
+    Read a checkpoint container, or a legacy pickle if the file is trusted.
+
+    A differential checkpoint is combined with its base, so the result is
+    always a full checkpoint.
+
+    Args:
+        path: Path of the checkpoint.
+        allow_pickle: Whether pickled checkpoints from earlier versions may be
+            loaded. Unpickling can run arbitrary code, so pass False for
+            paths that did not come from the governor itself.
+
+    Returns:
+        Dict[str, Any]: The checkpoint data, shaped like capture_checkpoint().
+
+    Raises:
+        CheckpointFormatError: If the file is not a valid container and
+            pickles are not allowed.
+    """
+    path = Path(path)
+    if is_checkpoint_container(path):
+        sections = read_container(path)
+        if "chain" in sections:
+            base_path = _base_path(path, sections["chain"].get("base"))
+            if not base_path.exists():
+                raise CheckpointFormatError(f"Base {base_path.name} of {path.name} is missing")
+            base_sections = read_container(base_path)
+            if "chain" in base_sections:
+                raise CheckpointFormatError(f"Base {base_path.name} of {path.name} is not a full checkpoint")
+            sections = _merge_sections(base_sections, sections)
+        return _from_sections(sections)
+    if not allow_pickle:
+        raise CheckpointFormatError(f"{path.name} is not a checkpoint container")
+    with open(path, "rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+        f.seek(0)
+        if compressed:
+            with gzip.GzipFile(fileobj=f, mode="rb") as gz:
+                return pickle.load(gz)
+        return pickle.load(f)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a directory entry after a rename, where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@dataclass(frozen=True)
+class CompletedCheckpoint:
+    """
+    Outcome of one background checkpoint write.
+
+    Attributes:
+        path: Destination of the checkpoint.
+        metadata: Metadata passed to submit(), e.g. for registering the checkpoint.
+        size: Bytes written, or 0 if the write failed.
+        duration: Seconds spent serializing and writing.
+        error: The exception raised by the write, or None on success.
+    """
+
+    path: Path
+    metadata: Dict[str, Any]
+    size: int
+    duration: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the checkpoint was written."""
+        return self.error is None
+
+
+class BackgroundCheckpointWriter:
+    """
+    Writes captured checkpoints on a background thread, one at a time.
+
+    Attributes:
+        writes: Number of checkpoints written successfully.
+        failures: Number of checkpoint writes that raised.
+        rejected: Number of submits refused because a write was in flight.
+    """
+
+    def __init__(self, write: Callable[[Path, Any], int] = write_checkpoint_file):
+        """
+        Initialize and start the writer thread.
+
+        Args:
+            write: Callable writing checkpoint data to a path and returning
+                the number of bytes written. Defaults to write_checkpoint_file.
+        """
+        self._write = write
+        self.writes = 0
+        self.failures = 0
+        self.rejected = 0
+
+        self._cond = threading.Condition()
+        self._pending: Optional[tuple] = None
+        self._writing = False
+        self._closed = False
+        self._completed: Deque[CompletedCheckpoint] = deque()
+
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """Return True while a checkpoint is queued or being written."""
+        with self._cond:
+            return self._pending is not None or self._writing
+
+    def submit(self, path: Path, data: Any, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Hand a captured checkpoint to the writer thread.
+
+        Args:
+            path: Destination of the checkpoint.
+            data: Checkpoint data that no longer aliases live simulation state.
+            metadata: Optional metadata returned with the completed checkpoint.
+
+        Returns:
+            bool: True if the checkpoint was accepted, False if the previous
+                one is still being written.
+
+        Raises:
+            RuntimeError: If the writer is closed.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Checkpoint writer is closed")
+            if self._pending is not None or self._writing:
+                self.rejected += 1
+                return False
+            self._pending = (Path(path), data, dict(metadata or {}))
+            self._cond.notify_all()
+            return True
+
+    def completed(self) -> List[CompletedCheckpoint]:
+        """
+        Return and clear the checkpoints finished since the last call.
+
+        Returns:
+            List[CompletedCheckpoint]: Finished writes, oldest first.
+        """
+        results = []
+        while self._completed:
+            results.append(self._completed.popleft())
+        return results
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the checkpoint in flight, if any, has been written.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            bool: True if the writer is idle, False if the timeout expired.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Finish the checkpoint in flight and stop the writer thread.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+        """
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                path, data, metadata = self._pending
+                self._pending = None
+                self._writing = True
+            start = time.perf_counter()
+            try:
+                size = self._write(path, data)
+                result = CompletedCheckpoint(path, metadata, size, time.perf_counter() - start)
+                self.writes += 1
+            except Exception as e:
+                logger.exception("Background checkpoint write to %s failed", path)
+                result = CompletedCheckpoint(path, metadata, 0, time.perf_counter() - start, e)
+                self.failures += 1
+            finally:
+                # Drop the reference so the snapshot can be freed while idle
+                data = None
+            with self._cond:
+                self._completed.append(result)
+                self._writing = False
+                self._cond.notify_all()
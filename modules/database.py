@@ -6,18 +6,145 @@ It uses SQLite as the database engine for simplicity and portability.
 """
 
 import datetime
+import functools
 import json
 import logging
 import os
 import sqlite3
+import threading
 import time
-from typing import List, Optional, Tuple
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
 
 from pathlib import Path
+from modules.db_connections import ConnectionManager
 from modules.migration_manager import MigrationManager
+from modules.utilities.file_utils import iter_ndjson, write_ndjson
 
 logger = logging.getLogger(__name__)
 
+# Collections stored in child tables. A state row that did not write one of
+# them points at the state holding its latest version via <name>_state_id.
+STATE_COLLECTIONS = ("memories", "discoveries", "explored_zones", "modifiers", "checkpoints")
+
+# Secondary indexes, (name, table, columns); migrations 003 and 004 create them
+# from this tuple and _ensure_indexes() adds any that are missing
+STATE_INDEXES = (
+    ("idx_state_timestamp", "state", "timestamp"),
+    ("idx_state_version", "state", "version"),
+    ("idx_memories_state_timestamp", "memories", "state_id, timestamp"),
+    ("idx_discoveries_state_timestamp", "discoveries", "state_id, timestamp"),
+    ("idx_explored_zones_state_timestamp", "explored_zones", "state_id, timestamp"),
+    ("idx_modifiers_state_timestamp", "modifiers", "state_id, timestamp"),
+    ("idx_checkpoints_state_timestamp", "checkpoints", "state_id, timestamp"),
+)
+
+# Prepared statements for save_state()
+_INSERT_STATE = """
+    INSERT INTO state (version, timestamp, last_emotion, last_intensity, last_dominance,
+                       last_zone, evolution_stats, max_memories, max_discoveries,
+                       max_explored_zones, max_modifiers, max_checkpoints,
+                       changed_collections, memories_state_id, discoveries_state_id,
+                       explored_zones_state_id, modifiers_state_id, checkpoints_state_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_MEMORY = """
+    INSERT INTO memories (state_id, description, emotional_quality, clarity, timestamp, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_INSERT_DISCOVERY = """
+    INSERT INTO discoveries (state_id, name, category, timestamp, data)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_EXPLORED_ZONE = """
+    INSERT INTO explored_zones (state_id, name, timestamp)
+    VALUES (?, ?, ?)
+"""
+_INSERT_MODIFIER = """
+    INSERT INTO modifiers (state_id, zone, type, effect, timestamp, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_INSERT_CHECKPOINT = """
+    INSERT INTO checkpoints (state_id, path, timestamp)
+    VALUES (?, ?, ?)
+"""
+
+
+# Read queries. Every one of them is listed in EternaDatabase.QUERIES so that
+# explain_queries() can check it against the indexes of migration 003.
+_SELECT_SCHEMA_VERSION = """
+    SELECT version FROM schema_version WHERE id = (SELECT MAX(id) FROM schema_version)
+"""
+_SELECT_LATEST_STATE = """
+    SELECT * FROM state ORDER BY timestamp DESC, id DESC LIMIT 1
+"""
+_SELECT_STATE_AT_VERSION = """
+    SELECT * FROM state WHERE version = ? ORDER BY id DESC LIMIT 1
+"""
+_SELECT_STATE_AT_TIMESTAMP = """
+    SELECT * FROM state WHERE timestamp <= ? ORDER BY timestamp DESC, id DESC LIMIT 1
+"""
+# Keyset-paginated history; {columns} is filled in by iter_state_range()
+_SELECT_STATE_RANGE = """
+    SELECT {columns} FROM state
+    WHERE timestamp >= ? AND timestamp < ? AND (timestamp > ? OR id > ?)
+    ORDER BY timestamp, id LIMIT ?
+"""
+_SELECT_MEMORIES = """
+    SELECT * FROM memories WHERE state_id = ? ORDER BY timestamp, id
+"""
+_SELECT_DISCOVERIES = """
+    SELECT * FROM discoveries WHERE state_id = ? ORDER BY timestamp, id
+"""
+_SELECT_EXPLORED_ZONES = """
+    SELECT name FROM explored_zones WHERE state_id = ? ORDER BY timestamp, id
+"""
+_SELECT_MODIFIERS = """
+    SELECT * FROM modifiers WHERE state_id = ? ORDER BY timestamp, id
+"""
+_SELECT_CHECKPOINTS = """
+    SELECT path, timestamp FROM checkpoints WHERE state_id = ? ORDER BY timestamp, id
+"""
+
+
+# Scalar state fields readable through iter_state_range(): field -> column
+STATE_HISTORY_COLUMNS = {
+    "version": "version",
+    "emotion": "last_emotion",
+    "last_intensity": "last_intensity",
+    "last_dominance": "last_dominance",
+    "last_zone": "last_zone",
+    "evolution": "evolution_stats",
+}
+
+# History fields stored as JSON text
+_JSON_HISTORY_FIELDS = ("emotion", "evolution")
+
+# Collection size limits stored with every state row
+_LIMIT_COLUMNS = ("max_memories", "max_discoveries", "max_explored_zones", "max_modifiers", "max_checkpoints")
+
+# Value of the "format" key in the header line of NDJSON dumps
+NDJSON_FORMAT = "eternia-state-ndjson"
+
+
+def find_full_scans(plans: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Return the plan steps that scan a whole table without an index.
+
+    Args:
+        plans: Query plans as returned by EternaDatabase.explain_queries().
+
+    Returns:
+        Dict[str, List[str]]: Offending plan steps keyed by query name.
+    """
+    scans = {}
+    for name, steps in plans.items():
+        offending = [step for step in steps if step.startswith("SCAN ") and "USING" not in step]
+        if offending:
+            scans[name] = offending
+    return scans
+
 
 def _iso_from_timestamp(timestamp: float) -> str:
     return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
@@ -32,6 +159,15 @@ def _timestamp_from_iso(value: str) -> Optional[float]:
         return None
 
 
+def _synchronized(method):
+    """Serialize access to the shared connection/cursor across threads."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class EternaDatabase:
     """
     Database manager for Eternia state persistence.
@@ -49,6 +185,20 @@ class EternaDatabase:
     # Schema version expected by application-level serialization/export
     SCHEMA_VERSION = 1
 
+    # Read queries by name, with sample parameters for EXPLAIN QUERY PLAN
+    QUERIES = {
+        "schema_version": (_SELECT_SCHEMA_VERSION, ()),
+        "latest_state": (_SELECT_LATEST_STATE, ()),
+        "state_at_version": (_SELECT_STATE_AT_VERSION, (1,)),
+        "state_at_timestamp": (_SELECT_STATE_AT_TIMESTAMP, (0.0,)),
+        "state_range": (_SELECT_STATE_RANGE.format(columns="*"), (0.0, 1.0, 0.0, 0, 100)),
+        "memories": (_SELECT_MEMORIES, (1,)),
+        "discoveries": (_SELECT_DISCOVERIES, (1,)),
+        "explored_zones": (_SELECT_EXPLORED_ZONES, (1,)),
+        "modifiers": (_SELECT_MODIFIERS, (1,)),
+        "checkpoints": (_SELECT_CHECKPOINTS, (1,)),
+    }
+
     def __init__(self, db_path="data/eternia.db", migrations_path="migrations"):
         """
         Initialize the database manager.
@@ -58,8 +208,13 @@ class EternaDatabase:
             migrations_path: Path to the directory containing migration scripts.
                 Defaults to "migrations".
         """
+        # The writer connection is shared by the simulation thread, the
+        # background state writer and the backup scheduler; reads use
+        # per-thread read-only connections and do not take this lock
+        self._lock = threading.RLock()
         self.db_path = db_path
         self._ensure_dir_exists()
+        self._connections = ConnectionManager(db_path, self._lock)
         self.conn = None
         self.cursor = None
         self._connect()
@@ -72,34 +227,16 @@ class EternaDatabase:
         self._apply_migrations()
         # Ensure application-level schema_version bookkeeping table is up-to-date
         self._ensure_app_schema_version()
+        self._ensure_delta_columns()
+        self._ensure_indexes()
 
     def _ensure_dir_exists(self):
         """Ensure the directory for the database file exists."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
     def _connect(self):
-        """Connect to the SQLite database with sane concurrency defaults."""
-        # Increase busy timeout and allow cross-thread usage for test harness concurrency
-        self.conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
-        # Enable WAL mode to reduce writer blocking readers
-        try:
-            self.conn.execute("PRAGMA journal_mode=WAL")
-        except sqlite3.Error:
-            pass
-        # Set reasonable sync level for performance tests while maintaining durability
-        try:
-            self.conn.execute("PRAGMA synchronous=NORMAL")
-        except sqlite3.Error:
-            pass
-        # Increase busy timeout at the SQLite engine level
-        try:
-            self.conn.execute("PRAGMA busy_timeout=30000")
-        except sqlite3.Error:
-            pass
-        # Enable foreign keys
-        self.conn.execute("PRAGMA foreign_keys = ON")
-        # Use Row factory to get column names
-        self.conn.row_factory = sqlite3.Row
+        """Open the writer connection with sane concurrency defaults."""
+        self.conn = self._connections.open_writer()
         self.cursor = self.conn.cursor()
 
     def _create_tables(self):
@@ -160,9 +297,7 @@ class EternaDatabase:
             self.conn.commit()
 
             # Get current version if any
-            self.cursor.execute(
-                "SELECT version FROM schema_version ORDER BY id DESC LIMIT 1"
-            )
+            self.cursor.execute(_SELECT_SCHEMA_VERSION)
             row = self.cursor.fetchone()
             current_version = row[0] if row else None
 
@@ -176,6 +311,31 @@ class EternaDatabase:
         except Exception as e:
             logger.warning(f"Schema version bookkeeping failed or is unavailable: {e}")
 
+    def _ensure_delta_columns(self) -> None:
+        """Add the delta-encoding columns of migration 002 if they are missing.
+
+        Databases whose tables predate yoyo bookkeeping skip the migrations
+        (see _apply_migrations), so the columns are added here instead.
+        """
+        self.cursor.execute("PRAGMA table_info(state)")
+        existing = {row["name"] for row in self.cursor.fetchall()}
+        if not existing:
+            return
+        columns = ["changed_collections TEXT"] + [f"{name}_state_id INTEGER" for name in STATE_COLLECTIONS]
+        for column in columns:
+            if column.split()[0] not in existing:
+                self.cursor.execute(f"ALTER TABLE state ADD COLUMN {column}")
+        self.conn.commit()
+
+    def _ensure_indexes(self) -> None:
+        """Create the secondary indexes of migration 003 if they are missing."""
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = {row["name"] for row in self.cursor.fetchall()}
+        for name, table, columns in STATE_INDEXES:
+            if table in tables:
+                self.cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        self.conn.commit()
+
     def _set_schema_version(self, version: int) -> None:
         """Insert a new schema_version row."""
         self.cursor.execute(
@@ -250,100 +410,134 @@ class EternaDatabase:
         """
         return self.migration_manager.create_migration(name)
 
-    def save_state(self, state_data):
+    def explain_queries(self) -> Dict[str, List[str]]:
         """
-        Save the state data to the database.
-
-        Args:
-            state_data: Dictionary containing the state data.
+        Run EXPLAIN QUERY PLAN on every query in QUERIES.
 
         Returns:
-            int: The ID of the saved state.
+            Dict[str, List[str]]: The plan steps of each query, keyed by name.
         """
-        # Get the current timestamp
-        timestamp = time.time()
-
-        # Extract the main state data
-        version = state_data.get("version", 1)
-        last_emotion = (
-            json.dumps(state_data.get("emotion")) if state_data.get("emotion") else None
-        )
-        last_intensity = state_data.get("last_intensity", 0.0)
-        last_dominance = state_data.get("last_dominance", 0.0)
-        last_zone = state_data.get("last_zone")
-        evolution_stats = json.dumps(state_data.get("evolution", {}))
-
-        # Extract configuration parameters
-        max_memories = state_data.get("max_memories", 100)
-        max_discoveries = state_data.get("max_discoveries", 50)
-        max_explored_zones = state_data.get("max_explored_zones", 20)
-        max_modifiers = state_data.get("max_modifiers", 50)
-        max_checkpoints = state_data.get("max_checkpoints", 10)
-
-        # Insert or update the state
-        self.cursor.execute(
-            """
-            INSERT INTO state (version, timestamp, last_emotion, last_intensity, last_dominance,
-                               last_zone, evolution_stats, max_memories, max_discoveries,
-                               max_explored_zones, max_modifiers, max_checkpoints)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                version,
-                timestamp,
-                last_emotion,
-                last_intensity,
-                last_dominance,
-                last_zone,
-                evolution_stats,
-                max_memories,
-                max_discoveries,
-                max_explored_zones,
-                max_modifiers,
-                max_checkpoints,
-            ),
-        )
-
-        # Get the ID of the inserted state
-        state_id = self.cursor.lastrowid
+        plans = {}
+        with self._connections.snapshot() as cursor:
+            for name, (sql, params) in self.QUERIES.items():
+                rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                plans[name] = [row[3] for row in rows]
+        return plans
+
+    @contextmanager
+    def _transaction(self):
+        """Run a block inside one explicit transaction, rolling back on error."""
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        try:
+            yield self.cursor
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
 
-        # Save memories
-        memories = state_data.get("memories", [])
-        for memory in memories:
-            self._save_memory(state_id, memory)
+    @_synchronized
+    def save_state(self, state_data, timestamp=None):
+        """
+        Save the state data to the database.
 
-        # Save discoveries
-        discoveries = state_data.get("discoveries", [])
-        for discovery in discoveries:
-            self._save_discovery(state_id, discovery)
+        States are delta-encoded: only the collections present in state_data
+        are written as child rows. For every other collection the new state
+        row points at the state that holds its latest version, and scalar
+        fields missing from state_data are carried forward from the previous
+        state. The previous state is the latest one at or before the new
+        state's timestamp, in the (timestamp, id) order the readers use, so
+        states imported with older timestamps do not become the base of live
+        saves. The state row and all collection rows are written with prepared
+        executemany() batches inside a single transaction.
 
-        # Save explored zones
-        explored_zones = state_data.get("explored_zones", [])
-        for zone in explored_zones:
-            self._save_explored_zone(state_id, zone)
+        Args:
+            state_data: Dictionary containing the full state or only the
+                fields that changed since the previous save.
+            timestamp: Time to record the state at, e.g. when importing a
+                dump. Defaults to now.
 
-        # Save modifiers
-        modifiers = state_data.get("modifiers", {})
-        for zone, zone_modifiers in modifiers.items():
-            for modifier in zone_modifiers:
-                self._save_modifier(state_id, zone, modifier)
+        Returns:
+            int: The ID of the saved state.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._transaction() as cursor:
+            cursor.execute(_SELECT_STATE_AT_TIMESTAMP, (timestamp,))
+            previous = cursor.fetchone()
+
+            def carry(key, column, default, encode=None):
+                # Use the value from state_data, else the previous state's column
+                if key in state_data:
+                    value = state_data[key]
+                    return encode(value) if encode else value
+                return previous[column] if previous is not None else default
+
+            changed = [name for name in STATE_COLLECTIONS if name in state_data]
+            pointers = [
+                None
+                if name in changed or previous is None
+                else previous[f"{name}_state_id"] or previous["id"]
+                for name in STATE_COLLECTIONS
+            ]
+
+            # Insert the state
+            cursor.execute(
+                _INSERT_STATE,
+                (
+                    state_data.get("version", 1),
+                    timestamp,
+                    carry("emotion", "last_emotion", None, lambda v: json.dumps(v) if v else None),
+                    state_data.get("last_intensity", 0.0),
+                    state_data.get("last_dominance", 0.0),
+                    carry("last_zone", "last_zone", None),
+                    carry("evolution", "evolution_stats", json.dumps({}), json.dumps),
+                    carry("max_memories", "max_memories", 100),
+                    carry("max_discoveries", "max_discoveries", 50),
+                    carry("max_explored_zones", "max_explored_zones", 20),
+                    carry("max_modifiers", "max_modifiers", 50),
+                    carry("max_checkpoints", "max_checkpoints", 10),
+                    json.dumps(changed),
+                    *pointers,
+                ),
+            )
 
-        # Save checkpoints
-        checkpoints = state_data.get("checkpoints", [])
-        for checkpoint in checkpoints:
-            self._save_checkpoint(state_id, checkpoint)
+            # Get the ID of the inserted state
+            state_id = cursor.lastrowid
 
-        # Commit the changes
-        self.conn.commit()
+            # Bulk insert the changed collections
+            if "memories" in changed:
+                cursor.executemany(
+                    _INSERT_MEMORY, self._memory_rows(state_id, state_data["memories"] or [], timestamp)
+                )
+            if "discoveries" in changed:
+                cursor.executemany(
+                    _INSERT_DISCOVERY, self._discovery_rows(state_id, state_data["discoveries"] or [], timestamp)
+                )
+            if "explored_zones" in changed:
+                cursor.executemany(
+                    _INSERT_EXPLORED_ZONE,
+                    self._explored_zone_rows(state_id, state_data["explored_zones"] or [], timestamp),
+                )
+            if "modifiers" in changed:
+                cursor.executemany(
+                    _INSERT_MODIFIER, self._modifier_rows(state_id, state_data["modifiers"] or {}, timestamp)
+                )
+            if "checkpoints" in changed:
+                cursor.executemany(
+                    _INSERT_CHECKPOINT, self._checkpoint_rows(state_id, state_data["checkpoints"] or [], timestamp)
+                )
 
         return state_id
 
-    def _save_memory(self, state_id, memory):
-        """Save a memory to the database."""
-        if isinstance(memory, dict):
-            description = memory.get("description", "")
-            emotional_quality = memory.get("emotional_quality")
-            clarity = memory.get("clarity", 0.0)
+    @staticmethod
+    def _memory_rows(state_id, memories, timestamp):
+        """Yield memories table rows; memories that are not mappings are skipped."""
+        for memory in memories:
+            if not isinstance(memory, Mapping):
+                continue
             # Store any additional data as JSON
             data = json.dumps(
                 {
@@ -352,88 +546,70 @@ class EternaDatabase:
                     if k not in ["description", "emotional_quality", "clarity"]
                 }
             )
-
-            self.cursor.execute(
-                """
-                INSERT INTO memories (state_id, description, emotional_quality, clarity, timestamp,
-                                      data)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (state_id, description, emotional_quality, clarity, time.time(), data),
+            yield (
+                state_id,
+                memory.get("description", ""),
+                memory.get("emotional_quality"),
+                memory.get("clarity", 0.0),
+                timestamp,
+                data,
             )
 
-    def _save_discovery(self, state_id, discovery):
-        """Save a discovery to the database."""
-        if isinstance(discovery, dict):
-            name = discovery.get("name", "")
-            category = discovery.get("category")
+    @staticmethod
+    def _discovery_rows(state_id, discoveries, timestamp):
+        """Yield discoveries table rows; discoveries that are not mappings are skipped."""
+        for discovery in discoveries:
+            if not isinstance(discovery, Mapping):
+                continue
             # Store any additional data as JSON
             data = json.dumps(
                 {k: v for k, v in discovery.items() if k not in ["name", "category"]}
             )
+            yield (state_id, discovery.get("name", ""), discovery.get("category"), timestamp, data)
 
-            self.cursor.execute(
-                """
-                INSERT INTO discoveries (state_id, name, category, timestamp, data)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (state_id, name, category, time.time(), data),
-            )
-
-    def _save_explored_zone(self, state_id, zone):
-        """Save an explored zone to the database."""
-        self.cursor.execute(
-            """
-            INSERT INTO explored_zones (state_id, name, timestamp)
-            VALUES (?, ?, ?)
-            """,
-            (state_id, zone, time.time()),
-        )
-
-    def _save_modifier(self, state_id, zone, modifier):
-        """Save a modifier to the database."""
-        modifier_type = None
-        effect = None
-        data = None
+    @staticmethod
+    def _explored_zone_rows(state_id, zones, timestamp):
+        """Yield explored_zones table rows."""
+        for zone in zones:
+            yield (state_id, zone, timestamp)
 
-        if isinstance(modifier, dict):
-            modifier_type = modifier.get("type")
-            effect = modifier.get("effect")
-            # Store any additional data as JSON
-            data = json.dumps(
-                {k: v for k, v in modifier.items() if k not in ["type", "effect"]}
-            )
-        elif isinstance(modifier, str):
-            modifier_type = modifier
-
-        self.cursor.execute(
-            """
-            INSERT INTO modifiers (state_id, zone, type, effect, timestamp, data)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (state_id, zone, modifier_type, effect, time.time(), data),
-        )
-
-    def _save_checkpoint(self, state_id, checkpoint):
-        """Save a checkpoint to the database."""
-        path = checkpoint
-        timestamp = time.time()
-        if isinstance(checkpoint, dict):
-            path = checkpoint.get("path")
-            created_at = checkpoint.get("created_at")
-            if isinstance(created_at, str):
-                parsed = _timestamp_from_iso(created_at)
-                if parsed is not None:
-                    timestamp = parsed
-        if not path:
-            return
-        self.cursor.execute(
-            """
-            INSERT INTO checkpoints (state_id, path, timestamp)
-            VALUES (?, ?, ?)
-            """,
-            (state_id, str(path), timestamp),
-        )
+    @staticmethod
+    def _modifier_rows(state_id, modifiers, timestamp):
+        """Yield modifiers table rows for a {zone: [modifier, ...]} mapping."""
+        for zone, zone_modifiers in modifiers.items():
+            for modifier in zone_modifiers:
+                modifier_type = None
+                effect = None
+                data = None
+
+                if isinstance(modifier, dict):
+                    modifier_type = modifier.get("type")
+                    effect = modifier.get("effect")
+                    # Store any additional data as JSON
+                    data = json.dumps(
+                        {k: v for k, v in modifier.items() if k not in ["type", "effect"]}
+                    )
+                elif isinstance(modifier, str):
+                    modifier_type = modifier
+
+                yield (state_id, zone, modifier_type, effect, timestamp, data)
+
+    @staticmethod
+    def _checkpoint_rows(state_id, checkpoints, timestamp):
+        """Yield checkpoints table rows, timestamped from created_at when present."""
+        for checkpoint in checkpoints:
+            path = checkpoint
+            row_timestamp = timestamp
+            if isinstance(checkpoint, dict):
+                path = checkpoint.get("path")
+                created_at = checkpoint.get("created_at")
+                if isinstance(created_at, str):
+                    parsed = _timestamp_from_iso(created_at)
+                    if parsed is not None:
+                        row_timestamp = parsed
+            if not path:
+                continue
+            yield (state_id, str(path), row_timestamp)
 
     def load_latest_state(self, lazy_load=False):
         """
@@ -448,17 +624,155 @@ class EternaDatabase:
         Returns:
             dict: The latest state data, or None if no state exists.
         """
-        # Get the latest state
-        self.cursor.execute(
-            """
-            SELECT *
-            FROM state
-            ORDER BY timestamp DESC
-                LIMIT 1
-            """
-        )
+        # Read the state row and its collections from one WAL snapshot on
+        # this thread's read-only connection
+        with self._connections.snapshot() as cursor:
+            return self._load_state(cursor, lazy_load)
+
+    def load_state_at(self, version=None, timestamp=None, lazy_load=False):
+        """
+        Load the state as it was at a given version or point in time.
+
+        Args:
+            version: State version to load. If several rows carry it, the
+                most recent one is returned.
+            timestamp: Unix time; loads the last state saved at or before it.
+            lazy_load: If True, defer loading the collections, as in
+                load_latest_state(). Defaults to False.
+
+        Returns:
+            dict: The state data, or None if no state matches.
+
+        Raises:
+            ValueError: If not exactly one of version and timestamp is given.
+        """
+        if (version is None) == (timestamp is None):
+            raise ValueError("Pass exactly one of version and timestamp")
+        if version is not None:
+            query, params = _SELECT_STATE_AT_VERSION, (int(version),)
+        else:
+            query, params = _SELECT_STATE_AT_TIMESTAMP, (float(timestamp),)
+        with self._connections.snapshot() as cursor:
+            return self._load_state(cursor, lazy_load, query, params)
 
-        state_row = self.cursor.fetchone()
+    def iter_state_range(self, start=None, end=None, fields=None, batch_size=500, after=None):
+        """
+        Stream saved states in timestamp order, reading only the requested fields.
+
+        States are fetched in keyset-paginated batches, each in its own short
+        read transaction, so iterating over a long history neither holds a
+        snapshot open nor loads everything into memory.
+
+        Args:
+            start: Earliest timestamp to include. Defaults to the beginning.
+            end: Timestamp to stop before. Defaults to the end of the history.
+            fields: Names of the fields to read: keys of STATE_HISTORY_COLUMNS
+                and/or STATE_COLLECTIONS. Defaults to every scalar field;
+                collections are only loaded when requested.
+            batch_size: Number of states fetched per query. Defaults to 500.
+            after: (timestamp, id) of the last state already seen, to resume
+                iteration after it.
+
+        Yields:
+            dict: The state's "id" and "timestamp" plus the requested fields.
+
+        Raises:
+            ValueError: If a field name is unknown.
+        """
+        fields = list(STATE_HISTORY_COLUMNS) if fields is None else list(fields)
+        unknown = [f for f in fields if f not in STATE_HISTORY_COLUMNS and f not in STATE_COLLECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown state fields: {', '.join(unknown)}")
+        scalars = [f for f in fields if f in STATE_HISTORY_COLUMNS]
+        collections = [f for f in fields if f in STATE_COLLECTIONS]
+        columns = ["id", "timestamp"] + [STATE_HISTORY_COLUMNS[f] for f in scalars]
+        columns += [f"{name}_state_id" for name in collections]
+
+        def build(cursor, row):
+            state = {"id": row["id"], "timestamp": row["timestamp"]}
+            for field in scalars:
+                state[field] = self._history_value(row, field)
+            for name in collections:
+                state_id = row[f"{name}_state_id"] or row["id"]
+                state[name] = self._load_collection(cursor, name, state_id)
+            return state
+
+        for batch in self._iter_state_batches(", ".join(columns), start, end, batch_size, build, after):
+            yield from batch
+
+    def iter_state_records(self, start=None, end=None, batch_size=500):
+        """
+        Stream saved states as self-contained, delta-encoded records.
+
+        Each record holds the state's scalar fields and the collections that
+        state wrote itself; the first record carries every collection, so
+        replaying the records through save_state() rebuilds the history.
+        Used by export_to_ndjson().
+
+        Args:
+            start: Earliest timestamp to include. Defaults to the beginning.
+            end: Timestamp to stop before. Defaults to the end of the history.
+            batch_size: Number of states fetched per query. Defaults to 500.
+
+        Yields:
+            dict: One state record, oldest first.
+        """
+        first = True
+
+        def build(cursor, row):
+            nonlocal first
+            record = {"id": row["id"], "timestamp": row["timestamp"]}
+            for field in STATE_HISTORY_COLUMNS:
+                record[field] = self._history_value(row, field)
+            for column in _LIMIT_COLUMNS:
+                record[column] = row[column]
+            changed = json.loads(row["changed_collections"]) if row["changed_collections"] else STATE_COLLECTIONS
+            for name in STATE_COLLECTIONS:
+                if first or name in changed:
+                    state_id = row[f"{name}_state_id"] or row["id"]
+                    record[name] = self._load_collection(cursor, name, state_id)
+            first = False
+            return record
+
+        for batch in self._iter_state_batches("*", start, end, batch_size, build):
+            yield from batch
+
+    def _iter_state_batches(self, columns, start, end, batch_size, build, after=None):
+        """
+        Yield batches of states in (timestamp, id) order.
+
+        Each batch of state rows is read, and turned into plain values by
+        build(cursor, row), inside its own read transaction. The transaction
+        is closed before the batch is yielded, so the consumer may read the
+        database itself or resume the iteration on another thread.
+        """
+        query = _SELECT_STATE_RANGE.format(columns=columns)
+        lower = float("-inf") if start is None else float(start)
+        upper = float("inf") if end is None else float(end)
+        last_timestamp, last_id = after if after is not None else (lower, -1)
+        while True:
+            with self._connections.snapshot() as cursor:
+                cursor.execute(query, (max(lower, last_timestamp), upper, last_timestamp, last_id, batch_size))
+                rows = cursor.fetchall()
+                batch = [build(cursor, row) for row in rows]
+            yield batch
+            if len(rows) < batch_size:
+                return
+            last_timestamp, last_id = rows[-1]["timestamp"], rows[-1]["id"]
+
+    @staticmethod
+    def _history_value(row, field):
+        """Return a scalar history field from a state row, decoding JSON columns."""
+        value = row[STATE_HISTORY_COLUMNS[field]]
+        if field in _JSON_HISTORY_FIELDS and value is not None:
+            value = json.loads(value)
+        return value
+
+    def _load_state(self, cursor, lazy_load, query=_SELECT_LATEST_STATE, params=()):
+        """Load the state selected by a query (the latest by default) through a read cursor."""
+        cursor.execute(query, params)
+
+        state_row = cursor.fetchone()
         if not state_row:
             return None
 
@@ -474,6 +788,13 @@ class EternaDatabase:
 
         state_data["evolution"] = json.loads(state_data["evolution_stats"])
 
+        # Collections this row wrote itself; rows older than the delta schema
+        # wrote all of them
+        if state_data.get("changed_collections"):
+            state_data["changed_collections"] = json.loads(state_data["changed_collections"])
+        else:
+            state_data["changed_collections"] = list(STATE_COLLECTIONS)
+
         if lazy_load:
             # Store state_id for lazy loading
             state_data["_state_id"] = state_id
@@ -492,12 +813,9 @@ class EternaDatabase:
             state_data["modifiers"] = {}
             state_data["checkpoints"] = []
         else:
-            # Load all related collections
-            state_data["memories"] = self._load_memories(state_id)
-            state_data["discoveries"] = self._load_discoveries(state_id)
-            state_data["explored_zones"] = self._load_explored_zones(state_id)
-            state_data["modifiers"] = self._load_modifiers(state_id)
-            state_data["checkpoints"] = self._load_checkpoints(state_id)
+            # Load all related collections, following the delta pointers
+            for name in STATE_COLLECTIONS:
+                state_data[name] = self._load_collection(cursor, name, self._collection_state_id(state_data, name))
 
         return state_data
 
@@ -520,41 +838,36 @@ class EternaDatabase:
             # Already loaded, return the existing collection
             return state_data.get(collection_name, [])
 
-        # Load the collection
-        state_id = state_data.get("_state_id")
-        if not state_id:
+        # Load the collection from the state that holds its latest version
+        if not state_data.get("_state_id"):
             return state_data.get(collection_name, [])
+        state_id = self._collection_state_id(state_data, collection_name)
 
-        if collection_name == "memories":
-            state_data["memories"] = self._load_memories(state_id)
-        elif collection_name == "discoveries":
-            state_data["discoveries"] = self._load_discoveries(state_id)
-        elif collection_name == "explored_zones":
-            state_data["explored_zones"] = self._load_explored_zones(state_id)
-        elif collection_name == "modifiers":
-            state_data["modifiers"] = self._load_modifiers(state_id)
-        elif collection_name == "checkpoints":
-            state_data["checkpoints"] = self._load_checkpoints(state_id)
+        if collection_name in STATE_COLLECTIONS:
+            with self._connections.snapshot() as cursor:
+                state_data[collection_name] = self._load_collection(cursor, collection_name, state_id)
 
         # Mark as loaded
         state_data["_lazy_loaded"][collection_name] = True
 
         return state_data.get(collection_name, [])
 
-    def _load_memories(self, state_id):
+    @staticmethod
+    def _collection_state_id(state_data, collection_name):
+        """Return the id of the state row holding a collection's rows, i.e. COALESCE(pointer, id)."""
+        return state_data.get(f"{collection_name}_state_id") or state_data.get("_state_id") or state_data["id"]
+
+    def _load_collection(self, cursor, collection_name, state_id):
+        """Load one collection's rows for a state through a read cursor."""
+        loader = getattr(self, f"_load_{collection_name}")
+        return loader(cursor, state_id)
+
+    def _load_memories(self, cursor, state_id):
         """Load memories for a state."""
-        self.cursor.execute(
-            """
-            SELECT *
-            FROM memories
-            WHERE state_id = ?
-            ORDER BY timestamp
-            """,
-            (state_id,),
-        )
+        cursor.execute(_SELECT_MEMORIES, (state_id,))
 
         memories = []
-        for row in self.cursor.fetchall():
+        for row in cursor.fetchall():
             memory = {
                 "description": row["description"],
                 "emotional_quality": row["emotional_quality"],
@@ -569,20 +882,12 @@ class EternaDatabase:
 
         return memories
 
-    def _load_discoveries(self, state_id):
+    def _load_discoveries(self, cursor, state_id):
         """Load discoveries for a state."""
-        self.cursor.execute(
-            """
-            SELECT *
-            FROM discoveries
-            WHERE state_id = ?
-            ORDER BY timestamp
-            """,
-            (state_id,),
-        )
+        cursor.execute(_SELECT_DISCOVERIES, (state_id,))
 
         discoveries = []
-        for row in self.cursor.fetchall():
+        for row in cursor.fetchall():
             discovery = {"name": row["name"], "category": row["category"]}
 
             # Add any additional data
@@ -593,34 +898,18 @@ class EternaDatabase:
 
         return discoveries
 
-    def _load_explored_zones(self, state_id):
+    def _load_explored_zones(self, cursor, state_id):
         """Load explored zones for a state."""
-        self.cursor.execute(
-            """
-            SELECT name
-            FROM explored_zones
-            WHERE state_id = ?
-            ORDER BY timestamp
-            """,
-            (state_id,),
-        )
+        cursor.execute(_SELECT_EXPLORED_ZONES, (state_id,))
 
-        return [row["name"] for row in self.cursor.fetchall()]
+        return [row["name"] for row in cursor.fetchall()]
 
-    def _load_modifiers(self, state_id):
+    def _load_modifiers(self, cursor, state_id):
         """Load modifiers for a state."""
-        self.cursor.execute(
-            """
-            SELECT *
-            FROM modifiers
-            WHERE state_id = ?
-            ORDER BY timestamp
-            """,
-            (state_id,),
-        )
+        cursor.execute(_SELECT_MODIFIERS, (state_id,))
 
         modifiers = {}
-        for row in self.cursor.fetchall():
+        for row in cursor.fetchall():
             zone = row["zone"]
 
             if zone not in modifiers:
@@ -644,20 +933,12 @@ class EternaDatabase:
 
         return modifiers
 
-    def _load_checkpoints(self, state_id):
+    def _load_checkpoints(self, cursor, state_id):
         """Load checkpoints for a state."""
-        self.cursor.execute(
-            """
-            SELECT path, timestamp
-            FROM checkpoints
-            WHERE state_id = ?
-            ORDER BY timestamp
-            """,
-            (state_id,),
-        )
+        cursor.execute(_SELECT_CHECKPOINTS, (state_id,))
 
         results = []
-        for row in self.cursor.fetchall():
+        for row in cursor.fetchall():
             path = row["path"]
             ts = row["timestamp"]
             created_at = _iso_from_timestamp(ts)
@@ -670,10 +951,11 @@ class EternaDatabase:
                 })
         return results
 
+    @_synchronized
     def close(self):
-        """Close the database connection."""
+        """Close the writer and all read-only connections."""
         if self.conn:
-            self.conn.close()
+            self._connections.close()
             self.conn = None
             self.cursor = None
 
@@ -681,6 +963,7 @@ class EternaDatabase:
         """Ensure the database connection is closed when the object is deleted."""
         self.close()
 
+    @_synchronized
     def backup_state(self, backup_path=None):
         """
         Create a backup of the current database.
@@ -750,6 +1033,7 @@ class EternaDatabase:
             except Exception:
                 pass
 
+    @_synchronized
     def restore_from_backup(self, backup_path):
         """
         Restore the database from a backup.
@@ -942,6 +1226,7 @@ class EternaDatabase:
             print(f"❌ Database export failed: {e}")
             return None
 
+    @_synchronized
     def import_from_json(self, input_path):
         """
         Import data from a JSON file into the database.
@@ -984,3 +1269,97 @@ class EternaDatabase:
         except Exception as e:
             print(f"❌ Data import failed: {e}")
             return False
+
+    def export_to_ndjson(self, output_path=None, start=None, end=None, compress=None):
+        """
+        Stream the state history to a newline-delimited JSON file.
+
+        Unlike export_to_json(), which exports only the latest state, this
+        writes every saved state in [start, end), one per line after a header
+        line, reading and writing one batch of states at a time so memory use
+        stays bounded however large the database is. States are written
+        delta-encoded, as stored.
+
+        Args:
+            output_path: Path of the dump. If None, a timestamped path in an
+                "exports" directory next to the database is used.
+            start: Earliest timestamp to export. Defaults to the beginning.
+            end: Timestamp to stop before. Defaults to the end of the history.
+            compress: Whether to gzip the dump; None compresses if the path
+                ends in ".gz".
+
+        Returns:
+            str: The path to the dump, or None if the export failed.
+        """
+        if output_path is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_dir = os.path.join(os.path.dirname(self.db_path), "exports")
+            output_path = os.path.join(export_dir, f"eternia_export_{timestamp}.ndjson" + (".gz" if compress else ""))
+
+        header = {
+            "format": NDJSON_FORMAT,
+            "kind": "database",
+            "schema_version": self.SCHEMA_VERSION,
+            "export_timestamp": time.time(),
+        }
+
+        def lines():
+            yield header
+            for record in self.iter_state_records(start, end):
+                record["type"] = "state"
+                yield record
+
+        try:
+            count = write_ndjson(output_path, lines(), compress=compress) - 1
+            print(f"✅ Database exported to {output_path} ({count} states)")
+            return output_path
+        except Exception as e:
+            print(f"❌ Database export failed: {e}")
+            return None
+
+    @_synchronized
+    def import_from_ndjson(self, input_path):
+        """
+        Import the states of an NDJSON dump, one at a time.
+
+        States are saved in file order with their original timestamps. The
+        writer lock is held for the whole import so the delta chain is not
+        interleaved with concurrent saves.
+
+        Args:
+            input_path: Path of a dump written by export_to_ndjson() or
+                EternaStateTracker.export_to_ndjson(), optionally gzipped.
+
+        Returns:
+            int: The number of states imported, or None if the import failed.
+                States imported before a failure are kept.
+        """
+        if not os.path.exists(input_path):
+            print(f"❌ Import file not found: {input_path}")
+            return None
+
+        count = 0
+        try:
+            lines = iter_ndjson(input_path)
+            header = next(lines, None)
+            if not isinstance(header, dict) or header.get("format") != NDJSON_FORMAT:
+                print(f"❌ Not an Eternia NDJSON dump: {input_path}")
+                return None
+            import_schema_version = header.get("schema_version")
+            if import_schema_version and import_schema_version > self.SCHEMA_VERSION:
+                print(
+                    f"⚠️ Warning: Import data schema version ({import_schema_version}) is newer than the current schema version ({self.SCHEMA_VERSION})"
+                )
+
+            for record in lines:
+                if record.pop("type", None) != "state":
+                    continue
+                record.pop("id", None)
+                self.save_state(record, timestamp=record.pop("timestamp", None))
+                count += 1
+
+            print(f"✅ Data imported from {input_path} ({count} states)")
+            return count
+        except Exception as e:
+            print(f"❌ Data import failed after {count} states: {e}")
+            return None
@@ -0,0 +1,170 @@
+"""
+SQLite connection management for EternaDatabase.
+
+One writer connection carries every INSERT/UPDATE/DDL statement and is shared
+by all threads under EternaDatabase's lock. Reads go through a pool of
+read-only connections, one per thread, opened with mode=ro and
+PRAGMA query_only. A thread's connection is closed when the thread ends, so
+short-lived threads (API thread pools, maintenance jobs) do not leak them. In WAL mode each read transaction sees a consistent snapshot
+of the last committed state and never waits for the writer, so lazy loads,
+exports and API reads do not serialize behind tick writes.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error:
+        # Still in use on another thread; it is discarded there
+        pass
+
+
+class _ThreadReader:
+    """A thread's read-only connection, closed once the thread drops it."""
+
+    __slots__ = ("conn", "generation", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection, generation: int):
+        self.conn = conn
+        self.generation = generation
+        # Runs when the thread-local storage of an exiting thread is cleared
+        weakref.finalize(self, _close_quietly, conn)
+
+
+class ConnectionManager:
+    """
+    Owns the writer connection and the per-thread read-only connections.
+
+    Attributes:
+        db_path: Path to the SQLite database file.
+        timeout: Seconds a connection waits on a locked database.
+        writer: The writer connection, or None while closed.
+    """
+
+    def __init__(self, db_path: str, writer_lock: threading.RLock, timeout: float = 30.0):
+        """
+        Initialize the manager without opening any connection.
+
+        Args:
+            db_path: Path to the SQLite database file.
+            writer_lock: Lock that serializes use of the writer connection.
+            timeout: Seconds a connection waits on a locked database. Defaults to 30.
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self._writer_lock = writer_lock
+        self.writer: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        # Only live threads keep their reader alive, through self._local
+        self._readers: "weakref.WeakSet[_ThreadReader]" = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+        # Bumped whenever the readers are closed so threads reopen theirs
+        self._generation = 0
+
+    def open_writer(self) -> sqlite3.Connection:
+        """Open the writer connection with the database's concurrency defaults."""
+        # Allow cross-thread usage; EternaDatabase serializes access with its lock
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        # Let state compaction return freed pages to the OS; this only takes
+        # effect when the database file is created
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        except sqlite3.Error:
+            pass
+        # Enable WAL mode so readers see snapshots instead of blocking on writes
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error:
+            pass
+        # Set reasonable sync level for performance tests while maintaining durability
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error:
+            pass
+        # Increase busy timeout at the SQLite engine level
+        try:
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        except sqlite3.Error:
+            pass
+        # Enable foreign keys
+        conn.execute("PRAGMA foreign_keys = ON")
+        # Use Row factory to get column names
+        conn.row_factory = sqlite3.Row
+        self.writer = conn
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """
+        Return this thread's read-only connection, opening it on first use.
+
+        Falls back to the writer if the file cannot be opened read-only
+        (for example an in-memory database).
+        """
+        cached = getattr(self._local, "reader", None)
+        if cached is not None and cached.generation == self._generation:
+            return cached.conn
+
+        try:
+            uri = f"{Path(os.path.abspath(self.db_path)).as_uri()}?mode=ro"
+            # Autocommit so snapshot() controls the read transaction; the
+            # connection is only used by this thread but may be closed by
+            # close_readers() from another one
+            conn = sqlite3.connect(
+                uri, uri=True, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            conn.execute("PRAGMA query_only = ON")
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error as e:
+            logger.warning("Read-only connection unavailable, reading through the writer: %s", e)
+            return self.writer
+
+        with self._readers_lock:
+            holder = _ThreadReader(conn, self._generation)
+            self._readers.add(holder)
+            self._local.reader = holder
+        return conn
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Run a block of reads in one read transaction on this thread's reader.
+
+        All statements inside the block see the same committed state.
+        """
+        conn = self.reader()
+        if conn is self.writer:
+            with self._writer_lock:
+                yield conn.cursor()
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn.cursor()
+        finally:
+            conn.execute("COMMIT")
+
+    def close_readers(self) -> None:
+        """Close every read-only connection; threads reopen theirs on next use."""
+        with self._readers_lock:
+            readers, self._readers = list(self._readers), weakref.WeakSet()
+            self._generation += 1
+        for holder in readers:
+            _close_quietly(holder.conn)
+
+    def close(self) -> None:
+        """Close the readers and the writer."""
+        self.close_readers()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
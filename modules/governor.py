@@ -1,14 +1,20 @@
 # modules/governor.py
 import asyncio
 import datetime
-import json
 import re
 import time
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, Callable, List, Optional, Union
 
+from modules.checkpoint_catalog import CheckpointCatalog
+from modules.checkpoint_writer import BackgroundCheckpointWriter, write_checkpoint_file
+from modules.governor_journal import GovernorJournal
 from modules.law_parser import load_laws
 from modules.logging_config import get_logger
+from modules.metric_stats import MetricStatistics
+from modules.snapshot_ring import SnapshotRing
+from modules.utilities.event_adapter import enqueue_event
 from modules.utilities.event_bus import event_bus
 from modules.governor_events import (
     PauseEvent, ResumeEvent, ShutdownEvent, RollbackEvent,
@@ -25,6 +31,39 @@ def _iso_from_timestamp(timestamp: float) -> str:
     return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+_rollback_histogram = None
+
+
+def _observe_rollback(source: str, seconds: float) -> None:
+    """Record a rollback's restore time in the governor_rollback_seconds metric."""
+    global _rollback_histogram
+    if _rollback_histogram is None:
+        try:
+            # Imported lazily so the governor works without the monitoring stack
+            from modules.monitoring import metrics
+            _rollback_histogram = metrics.governor_rollback_seconds
+        except Exception:
+            _rollback_histogram = False
+    if _rollback_histogram:
+        _rollback_histogram.labels(source=source).observe(seconds)
+
+
+_transition_counter = None
+
+
+def _count_transition(state: str) -> None:
+    """Count a pause/shutdown state transition in the governor_state_transitions_total metric."""
+    global _transition_counter
+    if _transition_counter is None:
+        try:
+            from modules.monitoring import metrics
+            _transition_counter = metrics.governor_state_transitions
+        except Exception:
+            _transition_counter = False
+    if _transition_counter:
+        _transition_counter.labels(state=state).inc()
+
+
 class AlignmentGovernor:
     """
     Hard‑safety layer that can pause, rollback, or kill the simulation.
@@ -38,6 +77,9 @@ class AlignmentGovernor:
         world: The EternaWorld instance being monitored.
         state_tracker: The EternaStateTracker for the world.
         continuity_threshold: Minimum identity continuity score allowed before rollback.
+        continuity_trend: Whether breaches are judged on the EWMA of identity
+            continuity rather than on single samples.
+        metric_stats: Streaming statistics of the metrics passed to tick().
         save_interval: Number of ticks between automatic checkpoints.
         event_queue: Optional asyncio queue for broadcasting events to WebSockets.
         laws: Dictionary of laws loaded from the law registry.
@@ -51,6 +93,9 @@ class AlignmentGovernor:
         threshold: float = 0.90,
         save_interval: int = 10000,
         event_queue: Optional[asyncio.Queue] = None,
+        snapshot_ring_size: int = 8,
+        continuity_trend: bool = False,
+        stats_window: int = 100,
     ):
         """
         Initialize the AlignmentGovernor.
@@ -64,12 +109,24 @@ class AlignmentGovernor:
                 Defaults to 10000.
             event_queue: Optional asyncio queue for broadcasting events to WebSockets.
                 Defaults to None.
+            snapshot_ring_size: Number of recent checkpoints also kept in memory
+                so rolling back to them skips the disk. Defaults to 8.
+            continuity_trend: Judge continuity breaches on the EWMA of identity
+                continuity instead of each sample, so a single outlier does not
+                trigger a rollback. Defaults to False.
+            stats_window: Number of ticks in the rolling windows of
+                metric_stats. Defaults to 100.
         """
         self.world = world
         self.state_tracker = state_tracker
         self.continuity_threshold = threshold
+        self.continuity_trend = continuity_trend
+        # O(1)-per-tick statistics shared with policy callbacks
+        self.metric_stats = MetricStatistics(window=stats_window)
         self._paused = False
         self._shutdown = False
+        # Called with (shutdown, paused) whenever either flag changes
+        self._run_state_listeners: List[Callable[[bool, bool], None]] = []
         self._rollback_active = False
         self.policy_callbacks: list[Callable[[Dict], bool]] = []
 
@@ -82,12 +139,32 @@ class AlignmentGovernor:
         self._tick_counter = 0
         self.laws = load_laws()
         self.event_queue = event_queue
+        # loop owning event_queue, set when ticking off the API event loop
+        self.event_loop: Optional[asyncio.AbstractEventLoop] = None
         # used by API WebSocket
         self.logger = get_logger("governor")
 
         CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
-
-    MAX_CKPTS = 10  # keep last 10
+        # Index of the checkpoint files, updated with each write
+        self.checkpoint_catalog = CheckpointCatalog.for_directory(CHECKPOINT_DIR)
+        # Serializes and fsyncs checkpoints off the simulation thread
+        self._checkpoint_writer = BackgroundCheckpointWriter(
+            partial(write_checkpoint_file, catalog=self.checkpoint_catalog)
+        )
+        # Last full checkpoint written, which differential checkpoints refer to
+        self._checkpoint_base: Optional[Dict[str, Any]] = None
+        self._pending_base: Optional[Dict[str, Any]] = None
+        self._checkpoints_since_base = 0
+        # Event log with one long-lived handle, written in batches
+        self.journal = GovernorJournal(CHECKPOINT_DIR / "governor_log.jsonl")
+        # Recent checkpoints kept in memory for fast rollback, and the one being written
+        self._snapshots = SnapshotRing(snapshot_ring_size)
+        self._inflight_snapshot: Optional[Dict[str, Any]] = None
+        # Set by close(); the control API keeps working, minus checkpoints and the journal
+        self._closed = False
+
+    MAX_CKPTS = 250  # keep last 250; most are differential
+    FULL_CHECKPOINT_EVERY = 25  # one full base per 25 checkpoints
 
     # -------- public control API -------- #
     def pause(self) -> None:
@@ -96,7 +173,7 @@ class AlignmentGovernor:
 
         Sets the internal pause flag and logs a pause event.
         """
-        self._paused = True
+        self.set_run_state(paused=True)
         self._log_event("pause")
 
     def resume(self) -> None:
@@ -105,7 +182,7 @@ class AlignmentGovernor:
 
         Clears the internal pause flag and logs a resume event.
         """
-        self._paused = False
+        self.set_run_state(paused=False)
         self._log_event("resume")
 
     def shutdown(self, reason: str) -> None:
@@ -116,14 +193,17 @@ class AlignmentGovernor:
             reason: The reason for shutting down the simulation.
         """
         self._log_event("shutdown", reason)
-        self._shutdown = True
+        self.set_run_state(shutdown=True)
 
     def rollback(self, target: Optional[Path] = None) -> None:
         """
         Roll back the simulation to a previous checkpoint.
 
         If no target checkpoint is specified, the latest checkpoint is used.
-        If no checkpoint is available, the simulation is shut down.
+        If no checkpoint is available, the simulation is shut down. Recent
+        checkpoints are restored from the in-memory snapshot ring; older ones
+        are read from disk. The restore time is recorded in the
+        governor_rollback_seconds metric, labelled by source.
 
         Args:
             target: Optional path to a specific checkpoint to roll back to.
@@ -131,11 +211,27 @@ class AlignmentGovernor:
         """
         self._rollback_active = True
         try:
+            # Make a checkpoint that just finished writing available in memory
+            self._drain_checkpoints()
             ckpt = target or self._latest_checkpoint()
             if not ckpt:
                 self.shutdown("No safe checkpoint available")
                 return
-            self.world.load_checkpoint(ckpt)
+            start = time.perf_counter()
+            snapshot = self._snapshots.get(ckpt)
+            if snapshot is not None:
+                self.world.restore_checkpoint(snapshot[1], ckpt)
+                source = "memory"
+            else:
+                # Only our own latest checkpoint may be a legacy pickle; explicit
+                # targets (e.g. from the /rollback command) must be containers
+                self.world.load_checkpoint(ckpt, allow_pickle=target is None)
+                source = "disk"
+            _observe_rollback(source, time.perf_counter() - start)
+            # The live state no longer descends from the last base, and its
+            # metric history no longer describes it
+            self._checkpoint_base = self._pending_base = None
+            self.metric_stats.reset()
             self.state_tracker.mark_rollback(ckpt)
             # reset counters visible in UI
             self.world.eterna.runtime.cycle_count = 0
@@ -145,6 +241,7 @@ class AlignmentGovernor:
                     "path": str(ckpt),
                     "kind": "rollback",
                     "target_path": str(ckpt),
+                    "source": source,
                     "created_at": _iso_from_timestamp(time.time()),
                 },
             )
@@ -158,7 +255,8 @@ class AlignmentGovernor:
 
         This method is called on each simulation step and performs several checks:
         1. If the simulation is paused or shut down, it returns False.
-        2. It checks if the identity continuity is below the threshold, and if so,
+        2. It updates metric_stats and checks if the identity continuity (or
+           its EWMA, with continuity_trend) is below the threshold, and if so,
            triggers a rollback and returns False.
         3. It runs all registered policy callbacks, and if any return False,
            triggers a rollback and returns False.
@@ -173,6 +271,9 @@ class AlignmentGovernor:
         Returns:
             bool: True if the world may continue this step, False otherwise.
         """
+        # Register checkpoints the background writer has finished since the last tick
+        self._drain_checkpoints()
+
         # First, check if the simulation is paused or shut down
         # These are the most basic conditions that prevent the simulation from continuing
         if self._paused:
@@ -184,9 +285,16 @@ class AlignmentGovernor:
         # Identity continuity measures how much the world's identity has changed
         # If it drops below the threshold, the world has changed too much and we need to roll back
         identity_continuity = metrics.get("identity_continuity", 1.0)
+        self.metric_stats.update(metrics)
+        if self.continuity_trend:
+            # Judge the trend, so one noisy sample does not force a rollback
+            series = self.metric_stats.get("identity_continuity")
+            continuity = series.ewma.value if series is not None else identity_continuity
+        else:
+            continuity = identity_continuity
 
         # If continuity is below threshold, log the breach, roll back, and halt the simulation
-        if identity_continuity < self.continuity_threshold:
+        if continuity < self.continuity_threshold:
             # Log the continuity breach event with the current metrics
             self._log_event("continuity_breach", metrics)
             # Roll back to the last safe checkpoint
@@ -248,17 +356,9 @@ class AlignmentGovernor:
         )
 
         if checkpoint_needed:
-            # Use a background thread for checkpoint creation if available
-            # This prevents the checkpoint creation from blocking the main simulation loop
-            if hasattr(self, '_checkpoint_thread') and getattr(self, '_checkpoint_thread', None) is not None:
-                # Only create a new checkpoint if the previous thread has finished
-                if not self._checkpoint_thread.is_alive():
-                    self._checkpoint_thread = None
-                    self._save_checkpoint()
-                    self._tick_counter = 0  # Reset the counter after creating a checkpoint
-            else:
-                # If no background thread is available, create the checkpoint directly
-                self._save_checkpoint()
+            # The checkpoint is written on a background thread; if the previous
+            # one is still being written, keep the counter so a later tick retries
+            if self._save_checkpoint():
                 self._tick_counter = 0  # Reset the counter after creating a checkpoint
 
         # If we've reached this point, all safety checks have passed
@@ -266,7 +366,7 @@ class AlignmentGovernor:
         return True
 
     # -------- helper methods -------- #
-    def register_policy(self, callback: Callable[[Dict[str, Any]], bool]) -> None:
+    def register_policy(self, callback: Callable[..., bool], with_stats: bool = False) -> None:
         """
         Register a policy callback function that will be called during tick().
 
@@ -275,21 +375,45 @@ class AlignmentGovernor:
 
         Args:
             callback: A function that takes a metrics dictionary and returns a boolean.
+            with_stats: Also pass the governor's MetricStatistics as a second
+                argument, so the callback can judge trends without keeping
+                its own history. Defaults to False.
         """
-        self.policy_callbacks.append(callback)
+        if with_stats:
+            stats = self.metric_stats
+
+            def policy(metrics: Dict[str, Any]) -> bool:
+                return callback(metrics, stats)
 
-    def _save_checkpoint(self) -> None:
+            self.policy_callbacks.append(policy)
+        else:
+            self.policy_callbacks.append(callback)
+
+    def _save_checkpoint(self) -> bool:
         """
-        Save a checkpoint of the current world state.
+        Capture a checkpoint of the current world state and write it in the background.
 
         This method:
-        1. Broadcasts a checkpoint_scheduled event
-        2. Creates a timestamped checkpoint file
-        3. Saves the world state to the file
-        4. Registers the checkpoint with the state tracker
-        5. Logs a checkpoint_saved event
-        6. Prunes old checkpoint files to keep only the most recent MAX_CKPTS
+        1. Defers if the previous checkpoint is still being written
+        2. Broadcasts a checkpoint_scheduled event
+        3. Captures the world state on the calling (simulation) thread
+        4. Hands it to the background writer, which compresses and fsyncs it
+
+        Every FULL_CHECKPOINT_EVERY-th checkpoint is a full base; the others
+        are differential and only hold what changed since the base. The
+        checkpoint is registered, logged and old files are pruned by
+        _drain_checkpoints() once the write has finished.
+
+        Returns:
+            bool: True if a checkpoint was started, False if it was deferred.
         """
+        if self._closed:
+            self.logger.debug("Governor is closed; not checkpointing")
+            return False
+        if self._checkpoint_writer.busy:
+            self.logger.debug("Previous checkpoint still being written; deferring")
+            return False
+
         # Broadcast checkpoint_scheduled event (legacy mechanism)
         self._broadcast({"event": "checkpoint_scheduled"})
 
@@ -298,32 +422,125 @@ class AlignmentGovernor:
 
         ts = time.time()
         path = CHECKPOINT_DIR / f"ckpt_{int(ts * 1000)}.bin"
-        self.world.save_checkpoint(path)
-        checkpoint_record = self.state_tracker.register_checkpoint({
+        base = self._checkpoint_base
+        if base is None or self._checkpoints_since_base >= self.FULL_CHECKPOINT_EVERY - 1:
+            checkpoint_data = self.world.capture_checkpoint()
+            policy = (checkpoint_data.get("companion_trainer_weights") or {}).get("policy")
+            self._pending_base = {
+                "name": path.name,
+                "tracker": checkpoint_data["state_tracker_data"],
+                "policy": policy,
+                "versions": checkpoint_data.get("versions"),
+            }
+            self._inflight_snapshot = checkpoint_data
+            base_name = None
+        else:
+            # Only what changed since the base is captured and written
+            checkpoint_data = self.world.capture_checkpoint(since=base["versions"])
+            policy = base["policy"]
+            changed_policy = (checkpoint_data.get("companion_trainer_weights") or {}).get("policy")
+            if changed_policy:
+                policy = {**(policy or {}), **changed_policy}
+            # The in-memory snapshot shares everything unchanged with the base
+            self._inflight_snapshot = {
+                "state_tracker_data": {**base["tracker"], **checkpoint_data["state_tracker_data"]},
+                "companion_trainer_weights": {"policy": policy},
+                "cycle_count": checkpoint_data.get("cycle_count", 0),
+            }
+            checkpoint_data = {**checkpoint_data, "base": {"name": base["name"], "tracker": base["tracker"]}}
+            base_name = base["name"]
+
+        state_version = getattr(self.state_tracker, "_state_version", None)
+        checkpoint_data = {**checkpoint_data, "state_version": state_version}
+        return self._checkpoint_writer.submit(path, checkpoint_data, {
             "path": str(path),
             "kind": "auto",
-            "state_version": getattr(self.state_tracker, "_state_version", None),
+            "base": base_name,
+            "state_version": state_version,
             "created_at": _iso_from_timestamp(ts),
         })
 
-        # Log checkpoint_saved event (this will also publish to the event bus)
-        self._log_event("checkpoint_saved", checkpoint_record)
+    def _drain_checkpoints(self) -> None:
+        """
+        Register the checkpoints the background writer has finished.
+
+        Runs on the simulation thread, so the state tracker is only ever
+        mutated from the thread that owns it. For each written checkpoint this
+        registers it with the state tracker, logs a checkpoint_saved event and
+        prunes old checkpoint files to keep only the most recent MAX_CKPTS.
+        The writer has already added it to the checkpoint catalog.
+        """
+        for done in self._checkpoint_writer.completed():
+            full = done.metadata.get("base") is None
+            snapshot, self._inflight_snapshot = self._inflight_snapshot, None
+            if not done.ok:
+                self.logger.error(f"Checkpoint {done.path} could not be written: {done.error}")
+                if full:
+                    self._pending_base = None
+                continue
+            if snapshot is not None:
+                self._snapshots.push(done.path, snapshot)
+            if full:
+                self._checkpoint_base, self._pending_base = self._pending_base, None
+                self._checkpoints_since_base = 0
+            else:
+                self._checkpoints_since_base += 1
+            checkpoint_record = self.state_tracker.register_checkpoint(done.metadata)
+
+            # Log checkpoint_saved event (this will also publish to the event bus)
+            self._log_event("checkpoint_saved", checkpoint_record)
+
+            # prune old files, keeping the bases of the differential ones kept
+            self.checkpoint_catalog.prune(self.MAX_CKPTS)
+
+    def flush_checkpoints(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the checkpoint being written, if any, and register it.
 
-        # prune old files
-        cks = sorted(CHECKPOINT_DIR.glob("ckpt_*.bin"))
-        for old in cks[: -self.MAX_CKPTS]:
-            old.unlink(missing_ok=True)
+        Call from the simulation thread, e.g. before shutting down.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            bool: True if no checkpoint is still being written.
+        """
+        idle = self._checkpoint_writer.flush(timeout)
+        self._drain_checkpoints()
+        return idle
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Register the checkpoint still being written and stop the background work.
+
+        Stops the checkpoint writer thread and closes the event journal and
+        the checkpoint catalog. Call from the simulation thread, or once it
+        has stopped. Afterwards the governor no longer checkpoints or journals
+        events, but pause(), resume(), shutdown() and rollback() still work.
+
+        Args:
+            timeout: Maximum seconds to wait for the checkpoint writer, or
+                None to wait indefinitely.
+        """
+        self._closed = True
+        self.flush_checkpoints(timeout)
+        self._checkpoint_writer.close(timeout)
+        self.journal.close()
+        self.checkpoint_catalog.close()
 
     def _latest_checkpoint(self) -> Optional[Path]:
         """
         Get the path to the most recent checkpoint file.
 
+        Looked up in the checkpoint catalog rather than by listing the
+        checkpoint directory.
+
         Returns:
             Optional[Path]: The path to the most recent checkpoint file,
                 or None if no checkpoints exist.
         """
-        cks = sorted(CHECKPOINT_DIR.glob("ckpt_*.bin"))
-        return cks[-1] if cks else None
+        latest = self.checkpoint_catalog.latest()
+        return latest.path if latest else None
 
     def _broadcast(self, payload: Dict[str, Any]) -> None:
         """
@@ -335,10 +552,7 @@ class AlignmentGovernor:
             payload: The event payload to broadcast.
         """
         if self.event_queue is not None:
-            try:
-                self.event_queue.put_nowait(payload)
-            except asyncio.QueueFull:
-                pass  # drop on overflow
+            enqueue_event(self.event_queue, payload, self.event_loop)
 
     def _determine_save_interval(self) -> int:
         """
@@ -433,10 +647,13 @@ class AlignmentGovernor:
         # Log to the governor logger
         self.logger.info(f"Event: {event}, Payload: {payload}")
 
-        # Also maintain the JSON log file for backward compatibility
-        (CHECKPOINT_DIR / "governor_log.jsonl").open("a").write(
-            json.dumps(entry) + "\n"
-        )
+        # Also maintain the JSON log file for backward compatibility; the
+        # journal buffers the entry and writes it in a batch
+        try:
+            self.journal.append(entry)
+        except RuntimeError:
+            # Closed along with the governor; still log and broadcast the event
+            self.logger.warning(f"Governor journal is closed; not journaling {event}")
 
         # Broadcast to WebSocket (legacy mechanism)
         self._broadcast(entry)
@@ -502,6 +719,48 @@ class AlignmentGovernor:
         """
         return self._shutdown
 
+    def set_run_state(self, shutdown: Optional[bool] = None, paused: Optional[bool] = None) -> bool:
+        """
+        Set the shutdown and pause flags, notifying listeners if either changed.
+
+        Unlike shutdown(), pause() and resume(), this logs no event; use it to
+        restore persisted state or to clear a shutdown.
+
+        Args:
+            shutdown: New shutdown flag, or None to leave it unchanged.
+            paused: New pause flag, or None to leave it unchanged.
+
+        Returns:
+            bool: True if the state changed.
+        """
+        before = (self._shutdown, self._paused)
+        if shutdown is not None:
+            self._shutdown = bool(shutdown)
+        if paused is not None:
+            self._paused = bool(paused)
+        if (self._shutdown, self._paused) == before:
+            return False
+
+        _count_transition("shutdown" if self._shutdown else "paused" if self._paused else "running")
+        for listener in list(self._run_state_listeners):
+            try:
+                listener(self._shutdown, self._paused)
+            except Exception as e:
+                self.logger.error(f"Run state listener failed: {e}")
+        return True
+
+    def add_run_state_listener(self, listener: Callable[[bool, bool], None]) -> None:
+        """
+        Register a callback for changes of the shutdown and pause flags.
+
+        The listener is called with (shutdown, paused) on the thread that made
+        the change, only when a flag actually changes, e.g. to persist them.
+
+        Args:
+            listener: Callable taking the new shutdown and pause flags.
+        """
+        self._run_state_listeners.append(listener)
+
     def is_rollback_active(self) -> bool:
         """Return True while a rollback operation is underway."""
         return self._rollback_active
@@ -0,0 +1,256 @@
+"""
+Buffered, rotating journal of governor events.
+
+The governor used to open ``governor_log.jsonl`` for every event it logged
+and never close the handle, which leaked file descriptors during rollback
+storms. GovernorJournal keeps one long-lived handle instead. append() only
+encodes the event and adds it to an in-memory buffer; a flusher thread writes
+the buffer out when it reaches ``flush_bytes`` or every ``flush_interval``
+seconds, whichever comes first, and fsyncs once per batch.
+
+When the current segment grows past ``max_bytes`` it is rotated like a
+logging.handlers.RotatingFileHandler: ``governor_log.jsonl`` becomes
+``governor_log.jsonl.1.gz``, older segments shift up by one and at most
+``backups`` of them are kept. Compression happens on the flusher thread.
+
+tail_journal() reads the newest events by scanning the current segment
+backwards from its end, so it stays cheap however long the segment is, and
+only opens rotated segments when the current one holds too few events.
+GovernorJournal.tail() adds the events still buffered, read from memory
+without flushing them.
+"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Union
+
+from modules.state_records import json_default
+
+logger = logging.getLogger(__name__)
+
+_TAIL_BLOCK = 64 * 1024
+
+
+def _segment(path: Path, index: int) -> Path:
+    """Return the path of the rotated segment ``index`` (1 is the newest)."""
+    return path.with_name(f"{path.name}.{index}.gz")
+
+
+def _tail_lines(path: Path, n: int) -> List[bytes]:
+    """Return the last ``n`` complete lines of a file, reading it backwards."""
+    lines: List[bytes] = []
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        remainder = b""
+        first = True
+        while end > 0 and len(lines) < n:
+            start = max(0, end - _TAIL_BLOCK)
+            f.seek(start)
+            chunk = f.read(end - start) + remainder
+            parts = chunk.split(b"\n")
+            if first:
+                # Empty after a trailing newline, else a line still being written
+                parts.pop()
+                if not parts:
+                    end = start
+                    continue
+                first = False
+            # The first part may be the end of a line that starts earlier
+            remainder = parts.pop(0) if start > 0 else b""
+            lines[:0] = [line for line in parts if line]
+            end = start
+    return lines[-n:]
+
+
+def _decode(lines: List[bytes]) -> List[Dict[str, Any]]:
+    events = []
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            # A line torn by a crash; skip it
+            continue
+    return events
+
+
+def tail_journal(path: Union[str, Path], n: int) -> List[Dict[str, Any]]:
+    """
+    Read the last events of a governor journal, including rotated segments.
+
+    Args:
+        path: Path of the current journal segment.
+        n: Maximum number of events to return.
+
+    Returns:
+        List[Dict[str, Any]]: Up to ``n`` events, oldest first.
+    """
+    path = Path(path)
+    if n <= 0:
+        return []
+    events: List[Dict[str, Any]] = []
+    if path.exists():
+        events = _decode(_tail_lines(path, n))
+    index = 1
+    while len(events) < n and _segment(path, index).exists():
+        # Rotated segments are compressed and cannot be read backwards
+        older: Deque[bytes] = deque(maxlen=n - len(events))
+        with gzip.open(_segment(path, index), "rb") as f:
+            older.extend(line.rstrip(b"\n") for line in f if line.strip())
+        events[:0] = _decode(list(older))
+        index += 1
+    return events[-n:]
+
+
+class GovernorJournal:
+    """
+    Appends governor events to a JSON-lines file with batched writes and rotation.
+
+    Attributes:
+        path: Path of the current journal segment.
+        max_bytes: Size after which the segment is rotated; 0 disables rotation.
+        backups: Number of compressed segments kept.
+        flush_interval: Maximum seconds an event stays buffered.
+        flush_bytes: Buffered size that triggers a flush before the interval.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 flush_interval: float = 1.0, flush_bytes: int = 64 * 1024):
+        """
+        Initialize the journal and start its flusher thread.
+
+        The file is opened on the first flush.
+
+        Args:
+            path: Path of the current journal segment.
+            max_bytes: Size after which the segment is rotated; 0 disables
+                rotation. Defaults to 10 MiB.
+            backups: Number of compressed segments kept. Defaults to 5.
+            flush_interval: Maximum seconds an event stays buffered. 0
+                writes every event as soon as it is appended. Defaults to 1.0.
+            flush_bytes: Buffered size that triggers an early flush.
+                Defaults to 64 KiB.
+        """
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.backups = max(0, int(backups))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.flush_bytes = int(flush_bytes) if self.flush_interval else 0
+
+        self._cond = threading.Condition()
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._closed = False
+        # Held while writing, so flush() from another thread never interleaves
+        self._io_lock = threading.Lock()
+        self._file = None
+
+        self._thread = threading.Thread(target=self._run, name="governor-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        Buffer one event; it is written by the flusher thread.
+
+        Args:
+            entry: JSON-serializable event, e.g. {"t": ..., "event": ..., "payload": ...}.
+        """
+        line = json.dumps(entry, default=json_default).encode("utf-8") + b"\n"
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Governor journal is closed")
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._flush_due():
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Write and fsync every buffered event now."""
+        with self._io_lock:
+            with self._cond:
+                batch, self._buffer, self._buffered = self._buffer, [], 0
+            if not batch:
+                return
+            try:
+                self._write(batch)
+            except OSError:
+                logger.exception("Could not write %d governor events to %s", len(batch), self.path)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """
+        Return the last events, including those still buffered.
+
+        Buffered events are read from memory, so this never writes or fsyncs.
+
+        Args:
+            n: Maximum number of events to return.
+
+        Returns:
+            List[Dict[str, Any]]: Up to ``n`` events, oldest first.
+        """
+        if n <= 0:
+            return []
+        # No flush is in progress while the lock is held, so the file and the
+        # buffer together hold every event exactly once
+        with self._io_lock:
+            with self._cond:
+                buffered = self._buffer[-n:]
+            events = _decode(buffered)
+            if len(events) < n:
+                events[:0] = tail_journal(self.path, n - len(events))
+        return events
+
+    def close(self) -> None:
+        """Flush the buffered events, stop the flusher and close the file."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, batch: List[bytes]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+        self._file.write(b"".join(batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Compress the current segment into ``.1.gz`` and shift the older ones."""
+        self._file.close()
+        self._file = None
+        if self.backups == 0:
+            self.path.unlink(missing_ok=True)
+            return
+        _segment(self.path, self.backups).unlink(missing_ok=True)
+        for index in range(self.backups - 1, 0, -1):
+            if _segment(self.path, index).exists():
+                os.replace(_segment(self.path, index), _segment(self.path, index + 1))
+        rotated = self.path.with_name(self.path.name + ".1")
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(_segment(self.path, 1), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        rotated.unlink()
+
+    def _flush_due(self) -> bool:
+        return self._buffered > 0 and self._buffered >= self.flush_bytes
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._flush_due(), self.flush_interval or None)
+                if self._closed:
+                    return
+            self.flush()
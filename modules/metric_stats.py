@@ -0,0 +1,336 @@
+"""
+Streaming statistics over the per-tick world metrics.
+
+The governor used to compare identity continuity against a fixed threshold
+one sample at a time, and a policy callback that wanted a trend had to keep
+and rescan its own history on every tick. MetricStatistics keeps, for every
+numeric metric, an exponentially weighted moving average, the mean and
+variance over the last ``window`` ticks, and quantile estimates. Each update
+costs O(1) per metric, independent of the window size:
+
+- EWMA: one multiply-add per sample;
+- RollingWindow: Welford's running mean and variance, with the sample that
+  leaves the window removed the same way it was added;
+- P2Quantile: the P² algorithm (Jain and Chlamtac, 1985), which tracks a
+  quantile with five markers instead of storing the samples.
+
+Quantiles cover every sample since the last reset, not just the window.
+"""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional, Sequence
+
+
+class EWMA:
+    """
+    Exponentially weighted moving average.
+
+    Attributes:
+        alpha: Weight of the newest sample, in (0, 1].
+        value: Current average, or None before the first sample.
+    """
+
+    def __init__(self, alpha: float = 0.1):
+        """
+        Initialize an empty average.
+
+        Args:
+            alpha: Weight of the newest sample, in (0, 1]. Defaults to 0.1.
+
+        Raises:
+            ValueError: If alpha is outside (0, 1].
+        """
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        """Add a sample and return the new average."""
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingWindow:
+    """
+    Mean and variance of the last ``size`` samples.
+
+    Attributes:
+        size: Number of samples in the window.
+    """
+
+    def __init__(self, size: int = 100):
+        """
+        Initialize an empty window.
+
+        Args:
+            size: Number of samples in the window. Defaults to 100.
+
+        Raises:
+            ValueError: If size is not positive.
+        """
+        if size <= 0:
+            raise ValueError(f"size must be positive, got {size}")
+        self.size = size
+        self._samples: Deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float) -> None:
+        """Add a sample, dropping the oldest one once the window is full."""
+        if len(self._samples) == self.size:
+            self._remove(self._samples.popleft())
+        self._samples.append(x)
+        delta = x - self._mean
+        self._mean += delta / len(self._samples)
+        self._m2 += delta * (x - self._mean)
+
+    def _remove(self, x: float) -> None:
+        n = len(self._samples)
+        if n == 0:
+            self._mean = self._m2 = 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / n
+        # Rounding can leave a tiny negative sum of squares
+        self._m2 = max(0.0, self._m2 - delta * (x - self._mean))
+
+    @property
+    def count(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Return the mean of the window, or None if it is empty."""
+        return self._mean if self._samples else None
+
+    @property
+    def variance(self) -> float:
+        """Return the sample variance of the window, 0.0 with fewer than two samples."""
+        n = len(self._samples)
+        return self._m2 / (n - 1) if n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        """Return the sample standard deviation of the window."""
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P² algorithm.
+
+    Attributes:
+        q: The quantile estimated, in (0, 1).
+        count: Number of samples seen.
+    """
+
+    def __init__(self, q: float = 0.5):
+        """
+        Initialize an empty estimator.
+
+        Args:
+            q: The quantile to estimate, in (0, 1). Defaults to 0.5 (the median).
+
+        Raises:
+            ValueError: If q is outside (0, 1).
+        """
+        if not 0.0 < q < 1.0:
+            raise ValueError(f"q must be in (0, 1), got {q}")
+        self.q = q
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1.0 + 2 * q, 1.0 + 4 * q, 3.0 + 2 * q, 5.0]
+        self._increments = [0.0, q / 2, q, (1.0 + q) / 2, 1.0]
+
+    def update(self, x: float) -> None:
+        """Add a sample."""
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+        positions = self._positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> Optional[float]:
+        """Return the estimate, exact for the first five samples, or None if empty."""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            # Nearest rank on the few samples held
+            return self._heights[min(len(self._heights) - 1, max(0, math.ceil(self.q * self.count) - 1))]
+        return self._heights[2]
+
+
+class MetricSeries:
+    """
+    Streaming statistics of one metric.
+
+    Attributes:
+        last: The most recent sample, or None.
+        ewma: Exponentially weighted moving average.
+        window: Mean and variance over the last ticks.
+    """
+
+    def __init__(self, window: int = 100, alpha: float = 0.1, quantiles: Sequence[float] = (0.5, 0.95)):
+        """
+        Initialize empty statistics.
+
+        Args:
+            window: Number of ticks in the rolling window. Defaults to 100.
+            alpha: EWMA weight of the newest sample. Defaults to 0.1.
+            quantiles: Quantiles to estimate. Defaults to (0.5, 0.95).
+        """
+        self.last: Optional[float] = None
+        self.ewma = EWMA(alpha)
+        self.window = RollingWindow(window)
+        self._quantiles = {q: P2Quantile(q) for q in quantiles}
+
+    def update(self, x: float) -> None:
+        """Add a sample to every statistic."""
+        self.last = x
+        self.ewma.update(x)
+        self.window.update(x)
+        for estimator in self._quantiles.values():
+            estimator.update(x)
+
+    @property
+    def count(self) -> int:
+        """Return the number of samples in the rolling window."""
+        return self.window.count
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Return the mean over the rolling window."""
+        return self.window.mean
+
+    @property
+    def variance(self) -> float:
+        """Return the variance over the rolling window."""
+        return self.window.variance
+
+    @property
+    def std(self) -> float:
+        """Return the standard deviation over the rolling window."""
+        return self.window.std
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return the estimate of a tracked quantile.
+
+        Args:
+            q: One of the quantiles the series was created with.
+
+        Raises:
+            KeyError: If the quantile is not tracked.
+        """
+        return self._quantiles[q].value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as plain JSON types."""
+        return {
+            "last": self.last,
+            "ewma": self.ewma.value,
+            "mean": self.mean,
+            "std": self.std,
+            "count": self.count,
+            "quantiles": {str(q): estimator.value for q, estimator in self._quantiles.items()},
+        }
+
+
+class MetricStatistics:
+    """
+    Streaming statistics of every numeric metric, updated once per tick.
+
+    Attributes:
+        window: Number of ticks in each rolling window.
+        alpha: EWMA weight of the newest sample.
+        quantiles: Quantiles estimated for each metric.
+    """
+
+    def __init__(self, window: int = 100, alpha: float = 0.1, quantiles: Sequence[float] = (0.5, 0.95)):
+        """
+        Initialize without any series; one is created per metric name.
+
+        Args:
+            window: Number of ticks in each rolling window. Defaults to 100.
+            alpha: EWMA weight of the newest sample. Defaults to 0.1.
+            quantiles: Quantiles to estimate for each metric. Defaults to (0.5, 0.95).
+        """
+        self.window = window
+        self.alpha = alpha
+        self.quantiles = tuple(quantiles)
+        self._series: Dict[str, MetricSeries] = {}
+
+    def update(self, metrics: Mapping[str, Any]) -> None:
+        """
+        Add one tick of metrics; values that are not numbers are ignored.
+
+        Args:
+            metrics: Metric name to value, e.g. a MetricsFrame.
+        """
+        for name, value in metrics.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+                continue
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = MetricSeries(self.window, self.alpha, self.quantiles)
+            series.update(float(value))
+
+    def get(self, name: str) -> Optional[MetricSeries]:
+        """Return the statistics of a metric, or None if it has no samples."""
+        return self._series.get(name)
+
+    def __getitem__(self, name: str) -> MetricSeries:
+        return self._series[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._series
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._series)
+
+    def reset(self) -> None:
+        """Forget every sample, e.g. after the world was rolled back."""
+        self._series.clear()
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the statistics of every metric as plain JSON types."""
+        return {name: series.to_dict() for name, series in self._series.items()}
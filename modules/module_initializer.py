@@ -42,6 +42,25 @@ from modules.time_dilation import TimeSynchronizer
 from modules.zone_modifiers import SymbolicModifierRegistry
 
 
+def _state_tracker_options() -> dict:
+    """Read the state tracker persistence options from the configuration."""
+    try:
+        from config.config_manager import config  # local import to avoid global dependency
+        async_writes = config.get('persistence.async_writes', False)
+        if isinstance(async_writes, str):
+            async_writes = async_writes.strip().lower() in ("1", "true", "yes", "on")
+        return {
+            "async_persistence": bool(async_writes),
+            "flush_interval_ms": int(config.get('persistence.flush_interval_ms', 1000)),
+            "flush_every_ticks": int(config.get('persistence.flush_every_ticks', 100)),
+            "journal_dir": config.get('persistence.journal_dir') or None,
+            "journal_snapshot_every": int(config.get('persistence.journal_snapshot_every', 1000)),
+            "journal_fsync_interval": float(config.get('persistence.journal_fsync_interval', 1.0)),
+        }
+    except Exception:
+        return {}
+
+
 def initialize_modules(container: DependencyContainer = None) -> DependencyContainer:
     """
     Initialize all modules and register them with the dependency injection container.
@@ -73,7 +92,7 @@ def initialize_modules(container: DependencyContainer = None) -> DependencyConta
     container.register_singleton("vitals", lambda: ShellVitals())
     container.register_singleton("threats", lambda: ThreatAnalyzer())
     container.register_singleton("companions", lambda: CompanionManager())
-    container.register_singleton("state_tracker", lambda: EternaStateTracker())
+    container.register_singleton("state_tracker", lambda: EternaStateTracker(**_state_tracker_options()))
     container.register_singleton("modifiers", lambda: SymbolicModifierRegistry())
     container.register_singleton("law_registry", lambda: load_laws())
     
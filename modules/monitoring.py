@@ -71,6 +71,11 @@ class EterniaMetrics:
             ['type']
         )
         
+        self.simulation_identity_continuity = Gauge(
+            'simulation_identity_continuity',
+            'Identity continuity of the latest per-tick metrics frame'
+        )
+
         # Governor metrics
         self.governor_interventions_total = Counter(
             'governor_interventions_total',
@@ -83,6 +88,19 @@ class EterniaMetrics:
             'Current state of the governor',
             ['state']
         )
+
+        self.governor_state_transitions = Counter(
+            'governor_state_transitions_total',
+            'Governor pause/shutdown state transitions, by the state entered',
+            ['state']
+        )
+
+        self.governor_rollback_seconds = Histogram(
+            'governor_rollback_seconds',
+            'Time to restore the world during a governor rollback, by snapshot source',
+            ['source'],
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float('inf'))
+        )
         
         # System metrics
         self.system_memory_usage_bytes = Gauge(
@@ -102,6 +120,13 @@ class EterniaMetrics:
             ['method', 'endpoint']
         )
         
+        # State tracker metrics
+        self.state_cache_lookups_total = Counter(
+            'state_cache_lookups_total',
+            'Total number of state tracker query cache lookups',
+            ['collection', 'result']
+        )
+        
         # Quantum metrics (Sprint 3)
         self.quantum_requests_total = Counter(
             'quantum_requests_total',
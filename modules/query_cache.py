@@ -0,0 +1,82 @@
+"""
+Generation-tagged LRU cache for EternaStateTracker queries.
+
+Every cached result remembers the collection it was derived from and that
+collection's mutation counter at the time. A lookup only hits if the tracker
+still holds the same collection object with the same counter, so any mutation
+or replacement invalidates the result exactly, without TTLs or sweeps. The
+cache is bounded and evicts the least recently used entry. Callers get a
+shallow copy of the cached result, so mutating it cannot corrupt the cache.
+"""
+
+import copy
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Bounded LRU cache whose entries are invalidated by collection generation.
+
+    Attributes:
+        maxsize: Maximum number of cached results.
+        hits: Number of lookups served from the cache.
+        misses: Number of lookups that had to compute the result.
+    """
+
+    def __init__(self, maxsize: int = 256, on_lookup: Optional[Callable[[str, bool], None]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached results. Defaults to 256.
+            on_lookup: Optional callback receiving the collection name and
+                whether the lookup was a hit, e.g. to update metrics.
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._on_lookup = on_lookup
+        # key -> (source collection, generation, value); holding the source
+        # keeps its id from being reused while the entry exists
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, int, Any]]" = OrderedDict()
+
+    def get(self, collection: str, key: Hashable, source: Any, generation: int, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for a query, computing it on a miss.
+
+        Args:
+            collection: Name of the collection the query reads.
+            key: Query argument, e.g. the emotional quality looked up.
+            source: The collection object the result is derived from.
+            generation: The collection's current mutation counter.
+            compute: Callable producing the result on a miss.
+
+        Returns:
+            A shallow copy of the query result.
+        """
+        cache_key = (collection, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry[0] is source and entry[1] == generation:
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            if self._on_lookup is not None:
+                self._on_lookup(collection, True)
+            return copy.copy(entry[2])
+
+        value = compute()
+        self._entries[cache_key] = (source, generation, value)
+        self._entries.move_to_end(cache_key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self.misses += 1
+        if self._on_lookup is not None:
+            self._on_lookup(collection, False)
+        return copy.copy(value)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
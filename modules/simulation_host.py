@@ -0,0 +1,260 @@
+"""
+Dedicated simulation thread for the Eternia API server.
+
+The simulation loop (collect metrics, governor tick, world step) is CPU bound
+and used to run as an asyncio task inside the API event loop, which starved
+REST and WebSocket handlers. SimulationHost runs that loop on its own thread.
+Commands from the API are handed over through a thread-safe queue and are
+executed between ticks, and results are published back to the API event
+queue with loop.call_soon_threadsafe.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from modules.logging_config import get_logger
+from modules.utilities.event_adapter import enqueue_event
+
+logger = get_logger("simulation_host")
+
+
+class SimulationHost:
+    """
+    Runs the world/governor loop on a dedicated thread.
+
+    Attributes:
+        world: The EternaWorld instance being stepped.
+        governor: The AlignmentGovernor gating each step.
+        event_queue: Optional asyncio queue used to publish results to the API.
+        publish_every: Number of ticks between published "tick" events.
+    """
+
+    def __init__(
+        self,
+        world: Any,
+        governor: Any,
+        event_queue: Optional[asyncio.Queue] = None,
+        paused_delay: float = 0.5,
+        shutdown_delay: float = 10.0,
+        publish_every: int = 10,
+        on_iteration: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initialize the simulation host.
+
+        Args:
+            world: The EternaWorld instance to step.
+            governor: The AlignmentGovernor deciding whether each step may run.
+            event_queue: Optional asyncio queue for publishing tick results.
+                Defaults to None.
+            paused_delay: Seconds to wait between checks while paused.
+                Defaults to 0.5.
+            shutdown_delay: Seconds to wait between checks while shut down.
+                Defaults to 10.0.
+            publish_every: Publish a "tick" event every N completed steps.
+                Defaults to 10.
+            on_iteration: Optional hook called at the start of every loop
+                iteration on the simulation thread. Defaults to None.
+        """
+        self.world = world
+        self.governor = governor
+        self.event_queue = event_queue
+        self.paused_delay = paused_delay
+        self.shutdown_delay = shutdown_delay
+        self.publish_every = max(1, int(publish_every))
+        self.on_iteration = on_iteration
+
+        self._commands: "queue.Queue[tuple]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._steps = 0
+
+    # -------- lifecycle -------- #
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Start the simulation thread.
+
+        Args:
+            loop: The event loop that owns event_queue. Events are scheduled on
+                it thread-safely. Defaults to None.
+        """
+        if self.is_running():
+            return
+        self._loop = loop
+        if hasattr(self.governor, "event_loop"):
+            self.governor.event_loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="simulation-host", daemon=True)
+        self._thread.start()
+        logger.info("Simulation host started")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Stop the simulation thread and wait for the current tick to finish.
+
+        The simulation thread closes the governor on its way out, so the host
+        cannot be started again with the same governor.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread. Defaults to 5.0.
+        """
+        self._stop.set()
+        self._commands.put((None, (), {}, None))  # wake the thread if it is waiting
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("Simulation host stopped")
+
+    def is_running(self) -> bool:
+        """Return True if the simulation thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    # -------- commands -------- #
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue a command to run on the simulation thread between ticks.
+
+        If the host is not running the command is executed immediately on the
+        calling thread.
+
+        Args:
+            fn: The callable to run.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            Future: Resolves with the command's return value or exception.
+        """
+        future: Future = Future()
+        if not self.is_running() or threading.current_thread() is self._thread:
+            self._execute(fn, args, kwargs, future)
+        else:
+            self._commands.put((fn, args, kwargs, future))
+        return future
+
+    def post(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
+        """
+        Queue a command for the simulation thread without ever running it inline.
+
+        Unlike submit(), nothing runs on the calling thread: if the host is not
+        running the command is dropped. Meant for background threads whose
+        work is only safe on the simulation thread.
+
+        Args:
+            fn: The callable to run.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            bool: True if the command was queued, False if it was dropped.
+        """
+        if not self.is_running():
+            return False
+        self._commands.put((fn, args, kwargs, None))
+        return True
+
+    async def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a command on the simulation thread and await its result.
+
+        Args:
+            fn: The callable to run.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            The command's return value.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        """
+        Publish an event to the API event queue from the simulation thread.
+
+        Args:
+            payload: The event payload. Dropped if the queue is full.
+        """
+        if self.event_queue is not None:
+            enqueue_event(self.event_queue, payload, self._loop)
+
+    # -------- simulation thread -------- #
+    @staticmethod
+    def _execute(fn, args, kwargs, future: Optional[Future]) -> None:
+        if future is not None and not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            if future is not None:
+                future.set_exception(e)
+            else:
+                logger.exception("Simulation command failed")
+        else:
+            if future is not None:
+                future.set_result(result)
+
+    def _drain_commands(self, timeout: float = 0.0) -> None:
+        """Run queued commands, waiting up to timeout for the first one."""
+        try:
+            item = self._commands.get(timeout=timeout) if timeout > 0 else self._commands.get_nowait()
+        except queue.Empty:
+            return
+        while True:
+            fn, args, kwargs, future = item
+            if fn is not None:
+                self._execute(fn, args, kwargs, future)
+            try:
+                item = self._commands.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._iterate()
+            except Exception:
+                logger.exception("Simulation step failed")
+                self._drain_commands(self.paused_delay)
+        self._drain_commands()
+        # Register the checkpoint still being written, on this thread, and
+        # stop the governor's writer and journal threads
+        self.governor.close(timeout=5.0)
+
+    def _iterate(self) -> None:
+        """Run one loop iteration: commands, governor gate, then a step."""
+        self._drain_commands()
+        if self.on_iteration is not None:
+            self.on_iteration()
+
+        if self.governor.is_shutdown():
+            self._drain_commands(self.shutdown_delay)
+            return
+        if self.governor.is_paused():
+            self._drain_commands(self.paused_delay)
+            return
+
+        metrics = self.world.collect_metrics()
+        if not self.governor.tick(metrics):
+            self._drain_commands(self.paused_delay)
+            return
+
+        start = time.perf_counter()
+        # step() advances the runtime cycle; metrics for the new cycle are
+        # computed there and reused by the next collect_metrics()
+        self.world.step()
+        self._steps += 1
+
+        if self._steps % self.publish_every == 0:
+            self.publish({
+                "event": "tick",
+                "payload": {
+                    "cycle": self.world.eterna.runtime.cycle_count,
+                    "step_seconds": time.perf_counter() - start,
+                    "metrics": dict(metrics),
+                },
+            })
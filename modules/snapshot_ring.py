@@ -0,0 +1,81 @@
+"""
+Bounded in-memory ring of recent world snapshots for fast rollback.
+
+A rollback after a continuity breach or policy violation used to read the
+latest checkpoint back from disk. The governor now also keeps the last few
+checkpoints it wrote as in-memory snapshots, so rolling back to one of them
+skips the disk entirely; older targets still fall back to the files.
+
+Snapshots share structure: a snapshot taken as a differential checkpoint
+reuses the tracker lists and policy tensors of its base for everything that
+did not change, so each extra entry costs roughly what changed since the
+base. Entries must be treated as immutable; restoring one copies whatever
+the live world would mutate.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+def _key(path: Union[str, Path]) -> str:
+    return str(Path(path).resolve())
+
+
+class SnapshotRing:
+    """
+    Most recent world snapshots, keyed by their checkpoint path.
+
+    Attributes:
+        capacity: Maximum number of snapshots kept; the oldest is evicted.
+    """
+
+    def __init__(self, capacity: int = 8):
+        """
+        Initialize an empty ring.
+
+        Args:
+            capacity: Maximum number of snapshots kept. 0 disables the ring.
+                Defaults to 8.
+        """
+        self.capacity = max(0, int(capacity))
+        self._entries: "OrderedDict[str, Tuple[Path, Dict[str, Any]]]" = OrderedDict()
+
+    def push(self, path: Union[str, Path], snapshot: Dict[str, Any]) -> None:
+        """
+        Add the snapshot written to a checkpoint path, evicting the oldest.
+
+        Args:
+            path: The checkpoint file the snapshot was written to.
+            snapshot: Checkpoint data shaped like EternaWorld.capture_checkpoint().
+        """
+        if self.capacity == 0:
+            return
+        key = _key(path)
+        self._entries.pop(key, None)
+        self._entries[key] = (Path(path), snapshot)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, path: Optional[Union[str, Path]] = None) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """
+        Return the snapshot of a checkpoint, or the newest one.
+
+        Args:
+            path: The checkpoint path, or None for the most recent snapshot.
+
+        Returns:
+            The checkpoint path and its snapshot, or None if it is not held.
+        """
+        if not self._entries:
+            return None
+        if path is None:
+            return next(reversed(self._entries.values()))
+        return self._entries.get(_key(path))
+
+    def clear(self) -> None:
+        """Drop every snapshot."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
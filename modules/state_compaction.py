@@ -0,0 +1,263 @@
+"""
+Retention and compaction for the SQLite state history.
+
+The tracker saves a state row per tick, so the state table and its child
+tables grow without bound. StateCompactor thins that history with a tiered
+policy: every version from the last few minutes is kept, then one version per
+minute for a day, then one per hour. States that a kept state still points at
+for one of its collections (see the delta columns of migration 002) are kept
+as well.
+
+Compaction runs online on its own connection. Deletes are issued in small
+batches, each in its own short transaction, so the simulation writer is never
+locked out for long. Afterwards the WAL is checkpointed passively and, if the
+database uses incremental auto-vacuum, free pages are returned to the OS.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from modules.database import STATE_COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class CompactionPolicy:
+    """
+    Tiered retention policy for state versions.
+
+    Attributes:
+        keep_all_minutes: Keep every version newer than this many minutes.
+        per_minute_hours: Keep one version per minute up to this many hours;
+            older versions are kept one per hour.
+        batch_size: Number of states deleted per transaction.
+    """
+
+    keep_all_minutes: float = 10.0
+    per_minute_hours: float = 24.0
+    batch_size: int = 500
+
+
+@dataclass
+class CompactionReport:
+    """
+    Result of a compaction run.
+
+    Attributes:
+        states_scanned: Number of state rows examined.
+        states_deleted: Number of state rows deleted.
+        rows_deleted: Child rows deleted per table.
+        pages_before: Database page count before compaction.
+        pages_after: Database page count after compaction.
+        freelist_pages: Free pages left in the file after compaction.
+        duration: Wall-clock seconds the run took.
+    """
+
+    states_scanned: int = 0
+    states_deleted: int = 0
+    rows_deleted: Dict[str, int] = field(default_factory=dict)
+    pages_before: int = 0
+    pages_after: int = 0
+    freelist_pages: int = 0
+    duration: float = 0.0
+
+    @property
+    def reclaimed_pages(self) -> int:
+        """Pages returned to the filesystem by this run."""
+        return max(0, self.pages_before - self.pages_after)
+
+
+def select_states_to_keep(
+    states: Iterable[Tuple[int, float]],
+    policy: CompactionPolicy,
+    now: Optional[float] = None,
+) -> Set[int]:
+    """
+    Apply the tiered policy to (id, timestamp) pairs.
+
+    The newest state in every minute (or hour) bucket is kept, as is the
+    newest state overall.
+
+    Args:
+        states: (state id, unix timestamp) pairs.
+        policy: The retention policy.
+        now: Reference time; defaults to the current time.
+
+    Returns:
+        Set[int]: Ids of the states to keep.
+    """
+    now = time.time() if now is None else now
+    keep_all_after = now - policy.keep_all_minutes * 60
+    per_minute_after = now - policy.per_minute_hours * 3600
+
+    keep: Set[int] = set()
+    buckets: Dict[Tuple[str, int], Tuple[float, int]] = {}
+    newest: Optional[Tuple[float, int]] = None
+    for state_id, timestamp in states:
+        if newest is None or (timestamp, state_id) > newest:
+            newest = (timestamp, state_id)
+        if timestamp >= keep_all_after:
+            keep.add(state_id)
+            continue
+        bucket = ("minute", int(timestamp // 60)) if timestamp >= per_minute_after else ("hour", int(timestamp // 3600))
+        current = buckets.get(bucket)
+        if current is None or (timestamp, state_id) > current:
+            buckets[bucket] = (timestamp, state_id)
+
+    keep.update(state_id for _, state_id in buckets.values())
+    if newest is not None:
+        keep.add(newest[1])
+    return keep
+
+
+class StateCompactor:
+    """
+    Prunes old state versions from an Eterna database without stopping writers.
+
+    Attributes:
+        db_path: Path to the SQLite database file.
+        policy: The retention policy applied by run().
+    """
+
+    def __init__(self, db_path: str = "data/eternia.db", policy: Optional[CompactionPolicy] = None):
+        """
+        Initialize the compactor.
+
+        Args:
+            db_path: Path to the SQLite database file. Defaults to "data/eternia.db".
+            policy: Retention policy. Defaults to CompactionPolicy().
+        """
+        self.db_path = db_path
+        self.policy = policy or CompactionPolicy()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: every batch below manages its own short transaction
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def run(self, now: Optional[float] = None) -> CompactionReport:
+        """
+        Delete the state versions the policy does not keep and reclaim space.
+
+        Args:
+            now: Reference time for the policy; defaults to the current time.
+
+        Returns:
+            CompactionReport: What was deleted and how many pages were reclaimed.
+        """
+        started = time.monotonic()
+        report = CompactionReport(rows_deleted={table: 0 for table in STATE_COLLECTIONS})
+        conn = self._connect()
+        try:
+            report.pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+
+            states = conn.execute("SELECT id, timestamp FROM state").fetchall()
+            report.states_scanned = len(states)
+            keep = select_states_to_keep(states, self.policy, now)
+            keep |= self._referenced_states(conn, keep)
+            doomed = sorted(state_id for state_id, _ in states if state_id not in keep)
+
+            batch_size = max(1, int(self.policy.batch_size))
+            for start in range(0, len(doomed), batch_size):
+                self._delete_batch(conn, doomed[start:start + batch_size], report)
+
+            self._reclaim(conn)
+            report.pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+            report.freelist_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+
+        report.duration = time.monotonic() - started
+        logger.info(
+            "State compaction: deleted %d of %d states, reclaimed %d pages (%d free) in %.2fs",
+            report.states_deleted,
+            report.states_scanned,
+            report.reclaimed_pages,
+            report.freelist_pages,
+            report.duration,
+        )
+        return report
+
+    @staticmethod
+    def _referenced_states(conn: sqlite3.Connection, keep: Set[int]) -> Set[int]:
+        """Return the states whose collection rows a kept delta state points at."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(state)")}
+        pointers = [f"{name}_state_id" for name in STATE_COLLECTIONS if f"{name}_state_id" in columns]
+        if not pointers or not keep:
+            return set()
+        referenced: Set[int] = set()
+        for state_id, *targets in conn.execute(f"SELECT id, {', '.join(pointers)} FROM state"):
+            if state_id in keep:
+                referenced.update(target for target in targets if target is not None)
+        return referenced
+
+    @staticmethod
+    def _delete_batch(conn: sqlite3.Connection, state_ids: Sequence[int], report: CompactionReport) -> None:
+        """Delete one batch of states and their child rows in a single short transaction."""
+        placeholders = ", ".join("?" * len(state_ids))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in STATE_COLLECTIONS:
+                cursor = conn.execute(f"DELETE FROM {table} WHERE state_id IN ({placeholders})", state_ids)
+                report.rows_deleted[table] += cursor.rowcount
+            cursor = conn.execute(f"DELETE FROM state WHERE id IN ({placeholders})", state_ids)
+            report.states_deleted += cursor.rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _reclaim(conn: sqlite3.Connection) -> None:
+        """Checkpoint the WAL and release free pages without blocking writers."""
+        try:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        except sqlite3.Error as e:
+            logger.warning("State compaction: WAL checkpoint failed: %s", e)
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == _AUTO_VACUUM_INCREMENTAL:
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+            # Move the truncated pages out of the WAL so the file can shrink
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        else:
+            logger.info(
+                "State compaction: auto_vacuum is not INCREMENTAL; freed pages stay in the file "
+                "until enable_incremental_vacuum() is run"
+            )
+
+    def enable_incremental_vacuum(self) -> None:
+        """
+        Switch the database to incremental auto-vacuum.
+
+        This rewrites the whole file with VACUUM and blocks writers while it
+        runs, so it should be done once, offline.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+
+def compact_state_history(db_path: str = "data/eternia.db", policy: Optional[CompactionPolicy] = None) -> CompactionReport:
+    """
+    Run one compaction pass over a state database.
+
+    Args:
+        db_path: Path to the SQLite database file.
+        policy: Retention policy. Defaults to CompactionPolicy().
+
+    Returns:
+        CompactionReport: The result of the run.
+    """
+    return StateCompactor(db_path, policy).run()
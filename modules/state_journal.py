@@ -0,0 +1,297 @@
+"""
+Append-only mutation journal for EternaStateTracker.
+
+Instead of rewriting the whole state on every tick, the tracker appends one
+small binary record per mutation (add_memory, add_modifier, mark_zone, ...)
+to the current journal segment, and every so often writes a compact snapshot
+of the full state. Recovery loads the newest snapshot and replays the records
+written after it, so per-tick persistence cost is proportional to what
+changed rather than to the size of the state.
+
+On disk the journal directory holds:
+
+- ``journal-<seq>.log`` segments of records, each record being a header
+  (payload length, CRC32, op code) followed by a JSON-encoded argument list;
+- ``snapshot-<seq>.json`` snapshots, covering every segment numbered below
+  ``<seq>``.
+
+Records are written to the OS on every append and fsynced at most every
+``fsync_interval`` seconds, so a process crash loses nothing and a machine
+crash loses at most one fsync interval. A torn record at the end of a segment
+is detected by its length or checksum and truncated during recovery.
+"""
+
+import json
+import logging
+import os
+import re
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.state_records import json_default
+
+logger = logging.getLogger(__name__)
+
+# Payload length, CRC32 of op code + payload, op code
+_RECORD_HEADER = struct.Struct("<IIB")
+
+# Journaled operations and their on-disk codes; codes must never be reused
+OPS: Dict[str, int] = {
+    "add_memory": 1,
+    "record_discovery": 2,
+    "track_discovery": 3,
+    "mark_zone": 4,
+    "mark_zone_explored": 5,
+    "add_modifier": 6,
+    "update_evolution": 7,
+    "update_emotion": 8,
+    "register_checkpoint": 9,
+    "set_emotion_levels": 10,
+}
+_OP_NAMES = {code: name for name, code in OPS.items()}
+
+_SEGMENT_RE = re.compile(r"^journal-(\d+)\.log$")
+_SNAPSHOT_RE = re.compile(r"^snapshot-(\d+)\.json$")
+
+SNAPSHOT_FORMAT = 1
+
+
+def encode_record(op: str, args: List[Any]) -> bytes:
+    """
+    Encode one journal record.
+
+    Args:
+        op: Operation name, a key of OPS.
+        args: JSON-serializable arguments of the operation.
+
+    Returns:
+        bytes: The header followed by the payload.
+    """
+    code = OPS[op]
+    payload = json.dumps(args, separators=(",", ":"), default=json_default).encode("utf-8")
+    crc = zlib.crc32(payload, zlib.crc32(bytes((code,))))
+    return _RECORD_HEADER.pack(len(payload), crc, code) + payload
+
+
+def read_records(path: Path) -> Tuple[List[Tuple[str, List[Any]]], int]:
+    """
+    Read the valid records of a segment.
+
+    Reading stops at the first truncated or corrupt record.
+
+    Args:
+        path: Path of the segment.
+
+    Returns:
+        The decoded (op, args) records and the byte offset where the valid
+        prefix of the segment ends.
+    """
+    data = path.read_bytes()
+    records: List[Tuple[str, List[Any]]] = []
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        length, crc, code = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload, zlib.crc32(bytes((code,)))) != crc:
+            break
+        op = _OP_NAMES.get(code)
+        if op is None:
+            break
+        records.append((op, json.loads(payload)))
+        offset = start + length
+    return records, offset
+
+
+class StateJournal:
+    """
+    Segmented append-only journal with periodic snapshots.
+
+    Attributes:
+        directory: Directory holding the segments and snapshots.
+        fsync_interval: Maximum seconds between fsyncs of the current segment.
+        segment_max_bytes: Size after which appends roll over to a new segment.
+        records_since_snapshot: Number of records appended since the last snapshot.
+    """
+
+    def __init__(self, directory: str, fsync_interval: float = 1.0, segment_max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the journal without opening a segment.
+
+        Args:
+            directory: Directory holding the journal; created if missing.
+            fsync_interval: Maximum seconds between fsyncs. 0 fsyncs every
+                record. Defaults to 1.0.
+            segment_max_bytes: Size after which a new segment is started.
+                Defaults to 8 MiB.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = max(0.0, float(fsync_interval))
+        self.segment_max_bytes = int(segment_max_bytes)
+        self.records_since_snapshot = 0
+        self._file = None
+        self._file_size = 0
+        self._last_fsync = time.monotonic()
+        # Always write to a fresh segment, never after a possibly torn tail
+        segments = self._list(_SEGMENT_RE)
+        snapshots = self._list(_SNAPSHOT_RE)
+        self._next_seq = max([seq for seq, _ in segments + snapshots], default=-1) + 1
+
+    def _list(self, pattern: "re.Pattern") -> List[Tuple[int, Path]]:
+        """Return the (seq, path) pairs of files matching a pattern, oldest first."""
+        found = []
+        for path in self.directory.iterdir():
+            match = pattern.match(path.name)
+            if match:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def _open_segment(self) -> None:
+        """Start the next segment."""
+        path = self.directory / f"journal-{self._next_seq:08d}.log"
+        self._next_seq += 1
+        self._file = open(path, "ab")
+        self._file_size = 0
+
+    def _close_segment(self) -> None:
+        """Fsync and close the current segment, if any."""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def append(self, op: str, *args: Any) -> None:
+        """
+        Append a record for one tracker mutation.
+
+        Args:
+            op: Operation name, a key of OPS.
+            *args: JSON-serializable arguments of the operation.
+        """
+        record = encode_record(op, list(args))
+        if self._file is None or self._file_size >= self.segment_max_bytes:
+            self._close_segment()
+            self._open_segment()
+        self._file.write(record)
+        # Hand the record to the OS so a process crash cannot lose it
+        self._file.flush()
+        self._file_size += len(record)
+        self.records_since_snapshot += 1
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Fsync the current segment."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def start_snapshot(self) -> int:
+        """
+        Close the current segment, so a snapshot taken now covers every record so far.
+
+        Later records go to a new segment.
+
+        Returns:
+            int: The sequence number to pass to write_snapshot().
+        """
+        self._close_segment()
+        self.records_since_snapshot = 0
+        self._last_fsync = time.monotonic()
+        return self._next_seq
+
+    def write_snapshot(self, state: Dict[str, Any], seq: Optional[int] = None) -> Path:
+        """
+        Write a snapshot of the full state and drop the journal it supersedes.
+
+        Given the sequence number returned by start_snapshot() when the state
+        was captured, only the snapshot and the files it supersedes are
+        touched, so the write may run on another thread while records are
+        appended.
+
+        Args:
+            state: JSON-serializable full tracker state.
+            seq: Sequence number from start_snapshot(). If None, the snapshot
+                is started now.
+
+        Returns:
+            Path: The snapshot file.
+        """
+        if seq is None:
+            seq = self.start_snapshot()
+        path = self.directory / f"snapshot-{seq:08d}.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        document = {"format": SNAPSHOT_FORMAT, "segment": seq, "created_at": time.time(), "state": state}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, separators=(",", ":"), default=json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._fsync_directory()
+
+        # Everything below the snapshot's sequence number is now redundant
+        for old_seq, old_path in self._list(_SEGMENT_RE) + self._list(_SNAPSHOT_RE):
+            if old_seq < seq:
+                try:
+                    old_path.unlink()
+                except OSError as e:
+                    logger.warning("Could not remove journal file %s: %s", old_path, e)
+        return path
+
+    def _fsync_directory(self) -> None:
+        """Persist the directory entry of a renamed snapshot where supported."""
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def recover(self) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, List[Any]]]]:
+        """
+        Load the newest readable snapshot and the records written after it.
+
+        Torn records at the end of a segment are truncated away.
+
+        Returns:
+            The snapshot state (None if there is no snapshot) and the
+            (op, args) records to replay on top of it, oldest first.
+        """
+        state = None
+        covered = 0
+        for seq, path in reversed(self._list(_SNAPSHOT_RE)):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    document = json.load(f)
+                state = document["state"]
+                covered = seq
+                break
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Skipping unreadable journal snapshot %s: %s", path, e)
+
+        records: List[Tuple[str, List[Any]]] = []
+        for seq, path in self._list(_SEGMENT_RE):
+            if seq < covered:
+                continue
+            segment_records, valid_bytes = read_records(path)
+            records.extend(segment_records)
+            if valid_bytes < path.stat().st_size:
+                logger.warning("Truncating torn journal segment %s at byte %d", path, valid_bytes)
+                os.truncate(path, valid_bytes)
+        self.records_since_snapshot = len(records)
+        return state, records
+
+    def close(self) -> None:
+        """Fsync and close the current segment."""
+        self._close_segment()
@@ -5,14 +5,123 @@ import math
 import os
 import random
 import re
+import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union, Deque
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, Deque
 from collections import deque
+from collections.abc import Mapping
 
 from modules.interfaces import StateTrackerInterface
-from modules.utilities.file_utils import save_json, load_json
-from modules.database import EternaDatabase
+from modules.utilities.file_utils import save_json, load_json, iter_ndjson, write_ndjson
+from modules.database import EternaDatabase, NDJSON_FORMAT
+from modules.query_cache import QueryCache
+from modules.state_journal import StateJournal
+from modules.state_records import ModifierEntry, as_discovery, as_memory, as_modifier_entry, to_builtin
+from modules.state_writer import BackgroundStateWriter, detach_snapshot
+
+
+# Key returned for entries that are not indexed
+_UNINDEXED = object()
+
+# Snapshot fields whose changes are tracked with mutation counters, mapped to
+# the tracker attribute holding them
+_VERSIONED_FIELDS = {
+    "memories": "memories",
+    "discoveries": "discoveries",
+    "explored_zones": "explored_zones",
+    "modifiers": "applied_modifiers",
+    "checkpoints": "checkpoints",
+}
+
+# Marks a field that has never been saved
+_UNSAVED = object()
+
+
+def _shallow_copy(value: Any) -> Any:
+    return dict(value) if isinstance(value, dict) else value
+
+
+def _memory_key(memory: Any) -> Any:
+    if isinstance(memory, Mapping) and 'emotional_quality' in memory:
+        return memory['emotional_quality']
+    return _UNINDEXED
+
+
+def _discovery_key(discovery: Any) -> Any:
+    if isinstance(discovery, Mapping) and 'category' in discovery:
+        return discovery['category']
+    return _UNINDEXED
+
+
+def _modifier_entry_key(entry: Any) -> Any:
+    modifier = entry.get("modifier") if isinstance(entry, Mapping) else None
+    if isinstance(modifier, dict) and modifier.get('type'):
+        return modifier['type']
+    if isinstance(modifier, str) and modifier:
+        return modifier
+    return _UNINDEXED
+
+
+def _append_indexed(ring: Deque, index: Dict[Any, Deque], item: Any, key_fn) -> None:
+    """
+    Append to a bounded deque and keep its per-key index in sync in O(1).
+
+    Each index bucket holds its entries in ring order, so an entry evicted
+    from the front of the ring is always at the front of its bucket.
+    """
+    if ring.maxlen == 0:
+        return
+    evicted = ring[0] if ring.maxlen is not None and len(ring) == ring.maxlen else _UNINDEXED
+    ring.append(item)
+
+    key = key_fn(item)
+    if key is not _UNINDEXED:
+        index.setdefault(key, deque()).append(item)
+
+    if evicted is _UNINDEXED:
+        return
+    evicted_key = key_fn(evicted)
+    if evicted_key is _UNINDEXED:
+        return
+    bucket = index.get(evicted_key)
+    if bucket and bucket[0] is evicted:
+        bucket.popleft()
+        if not bucket:
+            del index[evicted_key]
+    else:
+        # The ring was modified behind the index's back; resynchronize
+        index.clear()
+        for entry in ring:
+            entry_key = key_fn(entry)
+            if entry_key is not _UNINDEXED:
+                index.setdefault(entry_key, deque()).append(entry)
+
+
+def _build_index(ring: Deque, key_fn) -> Dict[Any, Deque]:
+    index: Dict[Any, Deque] = {}
+    for entry in ring:
+        key = key_fn(entry)
+        if key is not _UNINDEXED:
+            index.setdefault(key, deque()).append(entry)
+    return index
+
+
+_lookup_counter = None
+
+
+def _record_cache_lookup(collection: str, hit: bool) -> None:
+    """Count a query cache lookup in the state_cache_lookups_total metric."""
+    global _lookup_counter
+    if _lookup_counter is None:
+        try:
+            # Imported lazily so the tracker works without the monitoring stack
+            from modules.monitoring import metrics
+            _lookup_counter = metrics.state_cache_lookups_total
+        except Exception:
+            _lookup_counter = False
+    if _lookup_counter:
+        _lookup_counter.labels(collection=collection, result="hit" if hit else "miss").inc()
 
 
 def _utc_now_iso() -> str:
@@ -79,7 +188,14 @@ class EternaStateTracker(StateTrackerInterface):
                  max_checkpoints=10,
                  db_path="data/eternia.db",
                  use_database=True,
-                 use_lazy_loading=True):
+                 use_lazy_loading=True,
+                 async_persistence=False,
+                 flush_interval_ms=1000,
+                 flush_every_ticks=100,
+                 query_cache_size=256,
+                 journal_dir=None,
+                 journal_snapshot_every=1000,
+                 journal_fsync_interval=1.0):
         """
         Initialize the EternaStateTracker with memory optimization.
 
@@ -96,6 +212,22 @@ class EternaStateTracker(StateTrackerInterface):
                 If False, will fall back to JSON-based persistence.
             use_lazy_loading: Whether to use lazy loading for collections. Defaults to True.
                 This can significantly reduce memory usage for large states.
+            async_persistence: Whether save() only marks the state dirty and a
+                background writer persists it. Defaults to False.
+            flush_interval_ms: In async mode, maximum milliseconds between writes
+                while the state is dirty. Defaults to 1000.
+            flush_every_ticks: In async mode, maximum number of save() calls
+                merged into one write. Defaults to 100.
+            query_cache_size: Maximum number of cached query results.
+                Defaults to 256.
+            journal_dir: Directory of an append-only mutation journal. If set,
+                every mutation is journaled and save() only hands a full
+                snapshot to a background writer every journal_snapshot_every
+                records. Defaults to None.
+            journal_snapshot_every: Number of journaled mutations between
+                snapshots. Defaults to 1000.
+            journal_fsync_interval: Maximum seconds between journal fsyncs,
+                i.e. what a machine crash can lose. Defaults to 1.0.
         """
         self.save_path = save_path
         self.db_path = db_path
@@ -128,26 +260,55 @@ class EternaStateTracker(StateTrackerInterface):
         self._discovery_index = {}  # Index discoveries by category
         self._modifier_index = {}   # Index modifiers by type
 
-        # Initialize cache for frequently accessed data
-        self._cache = {}
-        self._cache_ttl = {}  # Time-to-live for cached items
-        self._cache_default_ttl = 100  # Default TTL in ticks
+        # Cache for query results, invalidated by collection mutation counters
+        self._query_cache = QueryCache(query_cache_size, on_lookup=_record_cache_lookup)
 
         # Versioning for snapshot alignment
         self._state_version = 0
-        self._last_saved_state: Dict[str, Any] = {}
+        # Dirty tracking: every mutation of a versioned collection bumps its
+        # counter; _saved_versions holds (collection, counter) as of the last
+        # save, plus shallow copies of the small scalar fields
+        self._mutations: Dict[str, int] = dict.fromkeys(_VERSIONED_FIELDS, 0)
+        self._saved_versions: Dict[str, Any] = {}
+        # Bumped whenever a versioned collection is replaced by another object;
+        # _generation_objects holds the object each generation refers to
+        self._generations: Dict[str, int] = dict.fromkeys(_VERSIONED_FIELDS, 0)
+        self._generation_objects: Dict[str, Any] = {}
 
         # Lazy loading state
         self._lazy_state = None
         self._collections_accessed = set()
 
+        # Write-coalescing background persistence
+        self._writer: Optional[BackgroundStateWriter] = None
+        self._dirty_ticks = 0
+        self._dirty_full = False
+        self._flush_dispatcher: Optional[Callable[[Callable[[], None]], Any]] = None
+        if async_persistence:
+            self._writer = BackgroundStateWriter(
+                self._persist_snapshot,
+                flush_interval_ms=flush_interval_ms,
+                flush_every_ticks=flush_every_ticks,
+            )
+
+        # Append-only mutation journal; _replaying suppresses journaling and
+        # events while recovery re-applies journaled mutations
+        self._journal: Optional[StateJournal] = None
+        self._journal_writer: Optional[BackgroundStateWriter] = None
+        self._journal_snapshot_every = max(1, int(journal_snapshot_every))
+        self._replaying = False
+        if journal_dir:
+            self._journal = StateJournal(journal_dir, fsync_interval=journal_fsync_interval)
+            # Snapshots are serialized and fsynced off the tick thread
+            self._journal_writer = BackgroundStateWriter(self._persist_journal_snapshot)
+
         self.evolution_stats = {"intellect": 100, "senses": 100}
         # initialize previous intellect for identity_continuity()
         self._prev_intellect = self.evolution_stats["intellect"]
         self.last_zone = None
         self.last_emotion: str | None = None
-        self.last_intensity: float = 0.0
-        self.last_dominance: float = 0.0
+        self._last_intensity: float = 0.0
+        self._last_dominance: float = 0.0
 
     def initialize(self) -> None:
         """Initialize the state tracker module."""
@@ -155,72 +316,28 @@ class EternaStateTracker(StateTrackerInterface):
         # Load the state from disk if it exists
         self.load()
 
-        # Initialize cache maintenance counters
-        self._cache_maintenance_counter = 0
-        self._cache_maintenance_interval = 1000  # Check cache every 1000 operations
-
     def shutdown(self) -> None:
         """Perform any cleanup operations when shutting down."""
         print("🛑 Shutting down EternaStateTracker")
-        # Clear the cache before saving to reduce file size
-        self._clear_cache()
+        # Drop cached query results
+        self._query_cache.clear()
         # Save the current state to disk or database
         self.save()
+        # Wait for the background writer before closing the database
+        if self._writer is not None:
+            self.flush()
+            self._writer.close()
+            self._writer = None
+        # Snapshot and close the journal so the next start replays nothing
+        if self._journal is not None:
+            self._write_journal_snapshot()
+            self._journal_writer.close()
+            self._journal.close()
         # Close the database connection if it exists
         if self.use_database and self.db:
             self.db.close()
             print("🔌 Closed database connection")
 
-    def _maintain_cache(self):
-        """
-        Perform cache maintenance operations.
-
-        This method:
-        1. Increments the maintenance counter
-        2. Checks if maintenance is due
-        3. Clears expired cache entries
-        4. Limits the cache size
-
-        Should be called by methods that use the cache.
-        """
-        # Increment the counter
-        self._cache_maintenance_counter += 1
-
-        # Check if maintenance is due
-        if self._cache_maintenance_counter >= self._cache_maintenance_interval:
-            # Clear expired cache entries
-            expired_keys = [k for k, ttl in self._cache_ttl.items() if ttl <= 0]
-            for key in expired_keys:
-                if key in self._cache:
-                    del self._cache[key]
-                if key in self._cache_ttl:
-                    del self._cache_ttl[key]
-
-            # Limit cache size (keep only the most recently used entries)
-            if len(self._cache) > 100:  # Arbitrary limit
-                # Sort by TTL (higher TTL means more recently used)
-                sorted_keys = sorted(self._cache_ttl.keys(), key=lambda k: self._cache_ttl.get(k, 0), reverse=True)
-                # Keep only the top 100
-                keys_to_remove = sorted_keys[100:]
-                for key in keys_to_remove:
-                    if key in self._cache:
-                        del self._cache[key]
-                    if key in self._cache_ttl:
-                        del self._cache_ttl[key]
-
-            # Reset the counter
-            self._cache_maintenance_counter = 0
-
-    def _clear_cache(self):
-        """
-        Clear the entire cache.
-
-        This method completely empties the cache and TTL dictionaries.
-        Should be called during shutdown or when a major state change occurs.
-        """
-        self._cache = {}
-        self._cache_ttl = {}
-
     def log_emotional_impact(self, emotion_name, score):
         """
         Log the impact of an emotion on the world.
@@ -250,16 +367,22 @@ class EternaStateTracker(StateTrackerInterface):
 
         logger = get_logger("zone_changes")
 
-        is_new = zone_name not in self.explored_zones
+        self._journal_record("mark_zone", zone_name)
+        is_new = zone_name not in self._zone_index
         previous_zone = self.last_zone
         self.last_zone = zone_name
 
+        if self._replaying:
+            if is_new:
+                self._append_explored_zone(zone_name)
+            return
+
         # Log zone change
         if previous_zone != zone_name:
             logger.info(f"🌍 Zone changed from '{previous_zone}' to '{zone_name}'")
 
         if is_new:
-            self.explored_zones.append(zone_name)
+            self._append_explored_zone(zone_name)
             logger.info(f"🆕 New zone discovered: '{zone_name}'")
 
         # Publish event to notify other components
@@ -285,7 +408,9 @@ class EternaStateTracker(StateTrackerInterface):
         Args:
             discovery: The discovery to track.
         """
-        self.discoveries.append(discovery)
+        self._journal_record("track_discovery", discovery)
+        self.discoveries.append(as_discovery(discovery))
+        self._mutations["discoveries"] += 1
 
     def update_emotion(self, emotion):
         """
@@ -309,6 +434,39 @@ class EternaStateTracker(StateTrackerInterface):
                 "intensity": emotion.intensity,
                 "direction": emotion.direction,
             }
+        self._journal_record("update_emotion", self.last_emotion)
+
+    @property
+    def last_intensity(self) -> float:
+        """The intensity of the last emotion."""
+        return self._last_intensity
+
+    @last_intensity.setter
+    def last_intensity(self, value: float) -> None:
+        self.set_emotion_levels(value, self._last_dominance)
+
+    @property
+    def last_dominance(self) -> float:
+        """The dominance of the last emotion."""
+        return self._last_dominance
+
+    @last_dominance.setter
+    def last_dominance(self, value: float) -> None:
+        self.set_emotion_levels(self._last_intensity, value)
+
+    def set_emotion_levels(self, intensity: float, dominance: float) -> None:
+        """
+        Set the intensity and dominance of the last emotion.
+
+        Args:
+            intensity: The intensity of the last emotion.
+            dominance: The dominance of the last emotion.
+        """
+        if (intensity, dominance) == (self._last_intensity, self._last_dominance):
+            return
+        self._last_intensity = intensity
+        self._last_dominance = dominance
+        self._journal_record("set_emotion_levels", intensity, dominance)
 
     def add_modifier(self, zone, modifier):
         """
@@ -330,38 +488,24 @@ class EternaStateTracker(StateTrackerInterface):
 
         logger = get_logger("zone_modifiers")
 
-        # Log the modifier being added
-        modifier_str = modifier if isinstance(modifier, str) else str(modifier)
-        logger.info(f"🔄 Adding modifier '{modifier_str}' to zone '{zone}'")
+        self._journal_record("add_modifier", zone, modifier)
+        if not self._replaying:
+            # Log the modifier being added
+            modifier_str = modifier if isinstance(modifier, str) else str(modifier)
+            logger.info(f"🔄 Adding modifier '{modifier_str}' to zone '{zone}'")
 
         # Add to the applied_modifiers dictionary
-        self.applied_modifiers.setdefault(zone, []).append(modifier)
-
-        # Add to the modifiers deque for tracking all modifiers
-        modifier_entry = {"zone": zone, "modifier": modifier}
-        self.modifiers.append(modifier_entry)
-
-        # Update the modifier index for efficient lookups
-        modifier_type = None
-        if isinstance(modifier, dict) and 'type' in modifier:
-            modifier_type = modifier['type']
-        elif isinstance(modifier, str):
-            modifier_type = modifier
-
-        if modifier_type:
-            if modifier_type not in self._modifier_index:
-                self._modifier_index[modifier_type] = []
-            self._modifier_index[modifier_type].append(modifier_entry)
-
-            # If the deque is at capacity and removed an item, we need to update the index
-            if len(self.modifiers) == self.max_modifiers:
-                # Rebuild the entire index to ensure consistency
-                self._rebuild_modifier_index()
-                logger.debug(f"Rebuilt modifier index due to capacity limit ({self.max_modifiers})")
-
-        # Get current modifiers for the zone for logging
-        zone_modifiers = self.applied_modifiers.get(zone, [])
-        logger.info(f"🔍 Zone '{zone}' now has {len(zone_modifiers)} modifiers: {zone_modifiers}")
+        modifier_entry = ModifierEntry(zone, modifier)
+        self.applied_modifiers.setdefault(modifier_entry.zone, []).append(modifier)
+
+        # Add to the modifiers deque and the type index; an entry evicted
+        # at capacity is dropped from the index in O(1)
+        _append_indexed(self.modifiers, self._modifier_index, modifier_entry, _modifier_entry_key)
+        self._mutations["modifiers"] += 1
+
+        if self._replaying:
+            return
+        logger.info(f"🔍 Zone '{zone}' now has {len(self.applied_modifiers[zone])} modifiers")
 
         # Publish event to notify other components
         event_bus.publish(ZoneModifierAddedEvent(zone, modifier))
@@ -373,26 +517,15 @@ class EternaStateTracker(StateTrackerInterface):
         This ensures the index stays consistent with the modifiers deque,
         especially after items are removed due to capacity limits.
         """
-        self._modifier_index = {}
-        for entry in self.modifiers:
-            modifier = entry.get("modifier")
-            modifier_type = None
-            if isinstance(modifier, dict) and 'type' in modifier:
-                modifier_type = modifier['type']
-            elif isinstance(modifier, str):
-                modifier_type = modifier
-
-            if modifier_type:
-                if modifier_type not in self._modifier_index:
-                    self._modifier_index[modifier_type] = []
-                self._modifier_index[modifier_type].append(entry)
+        self._modifier_index = _build_index(self.modifiers, _modifier_entry_key)
 
     def get_modifiers_by_type(self, modifier_type):
         """
         Get all modifiers of the specified type.
 
         Uses the modifier index for efficient O(1) lookups instead of
-        scanning all zones and their modifiers.
+        scanning all zones and their modifiers. Results are cached until the
+        next modifier is added.
 
         Args:
             modifier_type: The type of modifier to search for.
@@ -403,28 +536,20 @@ class EternaStateTracker(StateTrackerInterface):
         # Ensure modifiers are loaded if using lazy loading
         self._ensure_collection_loaded("modifiers")
 
-        # Perform cache maintenance
-        self._maintain_cache()
-
-        # Check the cache first
-        cache_key = f"modifiers_{modifier_type}"
-        if cache_key in self._cache and self._cache_ttl.get(cache_key, 0) > 0:
-            self._cache_ttl[cache_key] -= 1
-            return self._cache[cache_key]
-
-        # Use the index for efficient lookup
-        result = self._modifier_index.get(modifier_type, [])
-
-        # Cache the result for future queries
-        self._cache[cache_key] = result
-        self._cache_ttl[cache_key] = self._cache_default_ttl
-
-        return result
+        return self._query_cache.get(
+            "modifiers",
+            ("type", modifier_type),
+            self.modifiers,
+            self._mutations["modifiers"],
+            lambda: list(self._modifier_index.get(modifier_type, ())),
+        )
 
     def get_modifiers_by_zone(self, zone_name):
         """
         Get all modifiers for the specified zone.
 
+        Results are cached until the next modifier is added.
+
         Args:
             zone_name: The name of the zone to get modifiers for.
 
@@ -432,43 +557,15 @@ class EternaStateTracker(StateTrackerInterface):
             A list of modifiers for the specified zone.
         """
         # Ensure modifiers are loaded if using lazy loading
-        try:
-            self._ensure_collection_loaded("modifiers")
-        except (AttributeError, Exception):
-            # If the method doesn't exist or fails, continue anyway
-            pass
-
-        # Perform cache maintenance if the method exists
-        try:
-            if hasattr(self, '_maintain_cache'):
-                self._maintain_cache()
-        except (AttributeError, Exception):
-            # If the method doesn't exist or fails, continue anyway
-            pass
-
-        # Check the cache first if it exists
-        try:
-            cache_key = f"zone_modifiers_{zone_name}"
-            if hasattr(self, '_cache') and hasattr(self, '_cache_ttl') and cache_key in self._cache and self._cache_ttl.get(cache_key, 0) > 0:
-                self._cache_ttl[cache_key] -= 1
-                return self._cache[cache_key]
-        except (AttributeError, Exception):
-            # If the cache doesn't exist or fails, continue anyway
-            pass
-
-        # Get modifiers for the zone from the applied_modifiers dictionary
-        result = self.applied_modifiers.get(zone_name, [])
-
-        # Cache the result for future queries if the cache exists
-        try:
-            if hasattr(self, '_cache') and hasattr(self, '_cache_ttl') and hasattr(self, '_cache_default_ttl'):
-                self._cache[cache_key] = result
-                self._cache_ttl[cache_key] = self._cache_default_ttl
-        except (AttributeError, Exception):
-            # If the cache doesn't exist or fails, continue anyway
-            pass
+        self._ensure_collection_loaded("modifiers")
 
-        return result
+        return self._query_cache.get(
+            "modifiers",
+            ("zone", zone_name),
+            self.applied_modifiers,
+            self._mutations["modifiers"],
+            lambda: list(self.applied_modifiers.get(zone_name, ())),
+        )
 
     def add_memory(self, memory):
         """
@@ -483,20 +580,10 @@ class EternaStateTracker(StateTrackerInterface):
             memory: The memory to add. Expected to be a dictionary with at least
                    'description' and 'emotional_quality' keys.
         """
-        # The deque will automatically handle removing old items when maxlen is reached
-        self.memories.append(memory)
-
-        # Update the memory index for efficient lookups
-        if isinstance(memory, dict) and 'emotional_quality' in memory:
-            emotional_quality = memory['emotional_quality']
-            if emotional_quality not in self._memory_index:
-                self._memory_index[emotional_quality] = []
-            self._memory_index[emotional_quality].append(memory)
-
-            # If the deque is at capacity and removed an item, we need to update the index
-            if len(self.memories) == self.max_memories:
-                # Rebuild the entire index to ensure consistency
-                self._rebuild_memory_index()
+        self._journal_record("add_memory", memory)
+        # The deque drops the oldest memory at maxlen; the index drops it too
+        _append_indexed(self.memories, self._memory_index, as_memory(memory), _memory_key)
+        self._mutations["memories"] += 1
 
     def _rebuild_memory_index(self):
         """
@@ -505,13 +592,7 @@ class EternaStateTracker(StateTrackerInterface):
         This ensures the index stays consistent with the memories deque,
         especially after items are removed due to capacity limits.
         """
-        self._memory_index = {}
-        for memory in self.memories:
-            if isinstance(memory, dict) and 'emotional_quality' in memory:
-                emotional_quality = memory['emotional_quality']
-                if emotional_quality not in self._memory_index:
-                    self._memory_index[emotional_quality] = []
-                self._memory_index[emotional_quality].append(memory)
+        self._memory_index = _build_index(self.memories, _memory_key)
 
     def _ensure_collection_loaded(self, collection_name):
         """
@@ -534,22 +615,22 @@ class EternaStateTracker(StateTrackerInterface):
         # Load the collection
         if collection_name == "memories":
             memories = self.db.lazy_load_collection(self._lazy_state, "memories")
-            self.memories = deque(memories, maxlen=self.max_memories)
+            self.memories = deque(map(as_memory, memories), maxlen=self.max_memories)
             self._rebuild_memory_index()
-            # Update last_saved_state
-            self._last_saved_state["memories"] = list(self.memories)
+            # Freshly loaded from the database, so not dirty
+            self._mark_field_saved("memories")
         elif collection_name == "discoveries":
             discoveries = self.db.lazy_load_collection(self._lazy_state, "discoveries")
-            self.discoveries = deque(discoveries, maxlen=self.max_discoveries)
+            self.discoveries = deque(map(as_discovery, discoveries), maxlen=self.max_discoveries)
             self._rebuild_discovery_index()
-            # Update last_saved_state
-            self._last_saved_state["discoveries"] = list(self.discoveries)
+            # Freshly loaded from the database, so not dirty
+            self._mark_field_saved("discoveries")
         elif collection_name == "explored_zones":
             explored_zones = self.db.lazy_load_collection(self._lazy_state, "explored_zones")
             self.explored_zones = deque(explored_zones, maxlen=self.max_explored_zones)
             self._zone_index = set(self.explored_zones)
-            # Update last_saved_state
-            self._last_saved_state["explored_zones"] = list(self.explored_zones)
+            # Freshly loaded from the database, so not dirty
+            self._mark_field_saved("explored_zones")
         elif collection_name == "modifiers":
             modifiers_dict = self.db.lazy_load_collection(self._lazy_state, "modifiers")
             # Update applied_modifiers
@@ -558,13 +639,16 @@ class EternaStateTracker(StateTrackerInterface):
             self.modifiers = deque(maxlen=self.max_modifiers)
             for zone, mods in modifiers_dict.items():
                 for mod in mods:
-                    self.modifiers.append({"zone": zone, "modifier": mod})
+                    self.modifiers.append(ModifierEntry(zone, mod))
             self._rebuild_modifier_index()
+            # Freshly loaded from the database, so not dirty
+            self._mark_field_saved("modifiers")
         elif collection_name == "checkpoints":
             checkpoints = self.db.lazy_load_collection(self._lazy_state, "checkpoints")
             normalized = [self._normalize_checkpoint_entry(entry) for entry in checkpoints]
             self.checkpoints = deque(normalized, maxlen=self.max_checkpoints)
-            self._last_saved_state["checkpoints"] = [copy.deepcopy(entry) for entry in self.checkpoints]
+            # Freshly loaded from the database, so not dirty
+            self._mark_field_saved("checkpoints")
 
     def get_memories_by_emotion(self, emotional_quality):
         """
@@ -582,23 +666,13 @@ class EternaStateTracker(StateTrackerInterface):
         # Ensure memories are loaded if using lazy loading
         self._ensure_collection_loaded("memories")
 
-        # Perform cache maintenance
-        self._maintain_cache()
-
-        # Check the cache first
-        cache_key = f"memories_{emotional_quality}"
-        if cache_key in self._cache and self._cache_ttl.get(cache_key, 0) > 0:
-            self._cache_ttl[cache_key] -= 1
-            return self._cache[cache_key]
-
-        # Use the index for efficient lookup
-        result = self._memory_index.get(emotional_quality, [])
-
-        # Cache the result for future queries
-        self._cache[cache_key] = result
-        self._cache_ttl[cache_key] = self._cache_default_ttl
-
-        return result
+        return self._query_cache.get(
+            "memories",
+            emotional_quality,
+            self.memories,
+            self._mutations["memories"],
+            lambda: list(self._memory_index.get(emotional_quality, ())),
+        )
 
     def record_discovery(self, discovery):
         """
@@ -613,20 +687,10 @@ class EternaStateTracker(StateTrackerInterface):
             discovery: The discovery to record. Expected to be a dictionary with at least
                       'name' and 'category' keys.
         """
-        # The deque will automatically handle removing old items when maxlen is reached
-        self.discoveries.append(discovery)
-
-        # Update the discovery index for efficient lookups
-        if isinstance(discovery, dict) and 'category' in discovery:
-            category = discovery['category']
-            if category not in self._discovery_index:
-                self._discovery_index[category] = []
-            self._discovery_index[category].append(discovery)
-
-            # If the deque is at capacity and removed an item, we need to update the index
-            if len(self.discoveries) == self.max_discoveries:
-                # Rebuild the entire index to ensure consistency
-                self._rebuild_discovery_index()
+        self._journal_record("record_discovery", discovery)
+        # The deque drops the oldest discovery at maxlen; the index drops it too
+        _append_indexed(self.discoveries, self._discovery_index, as_discovery(discovery), _discovery_key)
+        self._mutations["discoveries"] += 1
 
     def _rebuild_discovery_index(self):
         """
@@ -635,13 +699,7 @@ class EternaStateTracker(StateTrackerInterface):
         This ensures the index stays consistent with the discoveries deque,
         especially after items are removed due to capacity limits.
         """
-        self._discovery_index = {}
-        for discovery in self.discoveries:
-            if isinstance(discovery, dict) and 'category' in discovery:
-                category = discovery['category']
-                if category not in self._discovery_index:
-                    self._discovery_index[category] = []
-                self._discovery_index[category].append(discovery)
+        self._discovery_index = _build_index(self.discoveries, _discovery_key)
 
     def get_discoveries_by_category(self, category):
         """
@@ -659,23 +717,13 @@ class EternaStateTracker(StateTrackerInterface):
         # Ensure discoveries are loaded if using lazy loading
         self._ensure_collection_loaded("discoveries")
 
-        # Perform cache maintenance
-        self._maintain_cache()
-
-        # Check the cache first
-        cache_key = f"discoveries_{category}"
-        if cache_key in self._cache and self._cache_ttl.get(cache_key, 0) > 0:
-            self._cache_ttl[cache_key] -= 1
-            return self._cache[cache_key]
-
-        # Use the index for efficient lookup
-        result = self._discovery_index.get(category, [])
-
-        # Cache the result for future queries
-        self._cache[cache_key] = result
-        self._cache_ttl[cache_key] = self._cache_default_ttl
-
-        return result
+        return self._query_cache.get(
+            "discoveries",
+            category,
+            self.discoveries,
+            self._mutations["discoveries"],
+            lambda: list(self._discovery_index.get(category, ())),
+        )
 
     def mark_zone_explored(self, zone_name):
         """
@@ -695,18 +743,24 @@ class EternaStateTracker(StateTrackerInterface):
 
         # Check if zone is already in the index (O(1) operation)
         if zone_name not in self._zone_index:
-            # Add to the deque (which will automatically handle removing old items when maxlen is reached)
-            self.explored_zones.append(zone_name)
-            # Add to the index for fast lookups
-            self._zone_index.add(zone_name)
-
-            # If the deque is at capacity and removed an item, we need to update the index
-            if len(self.explored_zones) == self.max_explored_zones:
-                # Rebuild the index to match the current deque contents
-                self._zone_index = set(self.explored_zones)
+            self._journal_record("mark_zone_explored", zone_name)
+            self._append_explored_zone(zone_name)
 
             # Publish event to notify other components
-            event_bus.publish(ZoneExploredEvent(zone_name))
+            if not self._replaying:
+                event_bus.publish(ZoneExploredEvent(zone_name))
+
+    def _append_explored_zone(self, zone_name):
+        """Append a new zone to the bounded deque and the set index in O(1)."""
+        zones = self.explored_zones
+        evicted = zones[0] if zones.maxlen is not None and zones and len(zones) == zones.maxlen else None
+        if type(zone_name) is str:
+            zone_name = sys.intern(zone_name)
+        zones.append(zone_name)
+        self._zone_index.add(zone_name)
+        self._mutations["explored_zones"] += 1
+        if evicted is not None and evicted != zone_name:
+            self._zone_index.discard(evicted)
 
     def update_evolution(self, intellect, senses):
         """
@@ -716,6 +770,7 @@ class EternaStateTracker(StateTrackerInterface):
             intellect: The new intellect value.
             senses: The new senses value.
         """
+        self._journal_record("update_evolution", intellect, senses)
         self.evolution_stats["intellect"] = intellect
         self.evolution_stats["senses"] = senses
 
@@ -733,18 +788,218 @@ class EternaStateTracker(StateTrackerInterface):
         - Supports incremental updates to avoid saving unchanged data
         - Uses a more compact JSON representation
 
+        In asynchronous persistence mode this only marks the state dirty; the
+        snapshot is captured and handed to the background writer once
+        flush_every_ticks saves or flush_interval_ms have accumulated.
+
+        With a journal, mutations are already persisted as they happen, so an
+        incremental save is a no-op until journal_snapshot_every records have
+        accumulated; then a journal snapshot is handed to the journal's
+        background writer and the state is also saved to the database or JSON
+        file as usual.
+
         Args:
             incremental: If True, only save data that has changed since the last save.
                          If False, save the entire state. Defaults to True.
         """
+        if self._journal is not None:
+            if incremental and self._journal.records_since_snapshot < self._journal_snapshot_every:
+                return
+            self._write_journal_snapshot(background=True)
+
+        if self._writer is not None:
+            self._dirty_ticks += 1
+            self._dirty_full = self._dirty_full or not incremental
+            if self._writer.due(self._dirty_ticks):
+                self._submit_dirty_state()
+            return
+
+        self._persist_snapshot(self._capture_snapshot(incremental), incremental)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Persist any dirty state and wait until it is written.
+
+        A barrier for shutdown and checkpoints in asynchronous persistence
+        mode, which also waits for pending journal snapshots; a no-op
+        otherwise, since save() already wrote synchronously.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            bool: True if everything is written, False if the timeout expired.
+        """
+        written = True
+        if self._writer is not None:
+            if self._dirty_ticks:
+                self._submit_dirty_state()
+            written = self._writer.flush(timeout)
+        if self._journal_writer is not None:
+            written = self._journal_writer.flush(timeout) and written
+        return written
+
+    def set_flush_dispatcher(self, dispatch: Optional[Callable[[Callable[[], None]], Any]]) -> None:
+        """
+        Let the background writer flush dirty state when save() is not called.
+
+        In asynchronous persistence mode, save() only submits once enough
+        ticks or time have accumulated, so state changed while the simulation
+        is paused, or changed from the API, would stay unwritten. With a
+        dispatcher, the writer wakes up every flush_interval_ms and, if the
+        state is dirty, dispatches the capture to the thread that owns the
+        tracker, e.g. with SimulationHost.submit.
+
+        Args:
+            dispatch: Callable that runs the given function on the owning
+                thread, or None to stop the timed flushes.
+        """
+        self._flush_dispatcher = dispatch
+        if self._writer is not None:
+            self._writer.set_due_callback(self._request_flush if dispatch is not None else None)
+
+    def collection_versions(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Return a version token for each tracked collection, keyed by attribute.
+
+        A token changes whenever the collection is mutated through the tracker
+        or replaced by a different object, so comparing two tokens tells
+        whether the collection changed in between without looking at it.
+        Replacements are detected by identity against the object seen last,
+        which is held, so a reused id() cannot hide one.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: Attribute name (e.g. "memories",
+                "applied_modifiers") to (generation, mutation counter).
+        """
+        versions = {}
+        for name, attribute in _VERSIONED_FIELDS.items():
+            current = getattr(self, attribute)
+            if current is not self._generation_objects.get(name):
+                self._generation_objects[name] = current
+                self._generations[name] += 1
+            versions[attribute] = (self._generations[name], self._mutations[name])
+        return versions
+
+    # --- Journal helpers ---
+    def _journal_record(self, op: str, *args: Any) -> None:
+        """Append a mutation to the journal, unless it is being replayed."""
+        if self._journal is not None and not self._replaying:
+            self._journal.append(op, *args)
+
+    def _full_state(self) -> Dict[str, Any]:
+        """Return the full state for a journal snapshot or export, loading lazy collections."""
+        for name in _VERSIONED_FIELDS:
+            self._ensure_collection_loaded(name)
+        return {
+            "version": self._state_version,
+            "emotion": self.last_emotion,
+            "last_intensity": self.last_intensity,
+            "last_dominance": self.last_dominance,
+            "evolution": self.evolution_stats,
+            "last_zone": self.last_zone,
+            "memories": list(self.memories),
+            "discoveries": list(self.discoveries),
+            "explored_zones": list(self.explored_zones),
+            "modifiers": self.applied_modifiers,
+            "modifier_entries": list(self.modifiers),
+            "checkpoints": list(self.checkpoints),
+        }
+
+    def _write_journal_snapshot(self, background: bool = False) -> None:
+        """
+        Write a journal snapshot, which supersedes all journaled records.
+
+        The journal moves on to a new segment right away; with background set,
+        the snapshot itself is written by the journal writer thread.
+        """
+        if not background:
+            # An earlier snapshot must not land after this one
+            self._journal_writer.flush()
+        seq = self._journal.start_snapshot()
+        state = detach_snapshot(self._full_state())
+        if background:
+            self._journal_writer.submit({"seq": seq, "state": state})
+        else:
+            self._journal.write_snapshot(state, seq)
+
+    def _persist_journal_snapshot(self, snapshot: Dict[str, Any], incremental: bool) -> None:
+        """Journal writer thread: write a snapshot queued by _write_journal_snapshot()."""
+        self._journal.write_snapshot(snapshot["state"], snapshot["seq"])
+
+    def _replay_journal(self, records) -> None:
+        """Re-apply journaled mutations without journaling or publishing events."""
+        self._replaying = True
+        try:
+            for op, args in records:
+                if op == "update_emotion":
+                    self.last_emotion = args[0]
+                else:
+                    getattr(self, op)(*args)
+        finally:
+            self._replaying = False
+
+    def _recover_from_journal(self) -> None:
+        """Restore the newest journal snapshot and replay the records after it."""
+        state, records = self._journal.recover()
+        if state is not None:
+            # The journal is newer than any lazily loadable database state
+            self._lazy_state = None
+            self._state_version = max(self._state_version, state.get("version", 0))
+            self._apply_scalar_fields(state)
+            self._setup_collections(state)
+            self.modifiers = deque(map(as_modifier_entry, state.get("modifier_entries", [])), maxlen=self.max_modifiers)
+            self._rebuild_modifier_index()
+            self._apply_evolution_and_zone(state)
+        self._replay_journal(records)
+        if state is not None or records:
+            print(f"📜 Recovered Eterna state from journal ({len(records)} records replayed)")
+        # Start from a snapshot so the replayed records are not replayed again
+        if state is None or records:
+            self._write_journal_snapshot()
+
+    def _capture_snapshot(self, incremental: bool) -> Dict[str, Any]:
+        """Build a full or incremental snapshot of the current state."""
         snapshot = self._init_snapshot_metadata()
 
-        if not incremental or not hasattr(self, "_last_saved_state"):
+        if not incremental:
             snapshot.update(self._full_snapshot_fields())
         else:
             snapshot.update(self._compute_incremental_changes())
+        return snapshot
 
-        self._persist_snapshot(snapshot, incremental)
+    def _submit_dirty_state(self) -> None:
+        """Capture the dirty state on this thread and queue it for the writer."""
+        incremental = not self._dirty_full
+        snapshot = detach_snapshot(self._capture_snapshot(incremental))
+        self._dirty_ticks = 0
+        self._dirty_full = False
+        self._writer.submit(snapshot, incremental)
+
+    def _has_unsaved_changes(self) -> bool:
+        """Return True if anything changed since the last save, in O(number of fields)."""
+        saved = self._saved_versions
+        return bool(
+            self._dirty_ticks
+            or any(self._is_dirty(name) for name in _VERSIONED_FIELDS)
+            or self.last_emotion != saved.get("emotion", _UNSAVED)
+            or self.evolution_stats != saved.get("evolution", _UNSAVED)
+            or self.last_zone != saved.get("last_zone", _UNSAVED)
+        )
+
+    def _request_flush(self) -> None:
+        """Writer thread: dispatch a capture of dirty state to the owning thread."""
+        # Journaled mutations are already durable; snapshots follow save()
+        if self._journal is not None or self._flush_dispatcher is None:
+            return
+        # Only a hint off the owning thread; _flush_dirty checks again
+        if self._has_unsaved_changes():
+            self._flush_dispatcher(self._flush_dirty)
+
+    def _flush_dirty(self) -> None:
+        """Owning thread: submit dirty state that no save() has submitted yet."""
+        if self._writer is not None and self._has_unsaved_changes():
+            self._submit_dirty_state()
 
     # --- Save helpers to reduce cyclomatic complexity ---
     def _init_snapshot_metadata(self) -> Dict[str, Any]:
@@ -777,57 +1032,64 @@ class EternaStateTracker(StateTrackerInterface):
             "max_checkpoints": self.max_checkpoints,
             "checkpoints": [copy.deepcopy(entry) for entry in self.checkpoints],
         }
-        # Store a copy of the current state for future incremental saves
-        self._last_saved_state = {
-            "emotion": copy.deepcopy(self.last_emotion) if self.last_emotion else None,
-            "modifiers": copy.deepcopy(self.applied_modifiers),
-            "memories": list(self.memories),
-            "evolution": copy.deepcopy(self.evolution_stats),
-            "explored_zones": list(self.explored_zones),
-            "discoveries": list(self.discoveries),
-            "last_zone": self.last_zone,
-        }
+        self._mark_saved()
         return full
 
+    def _mark_field_saved(self, name: str) -> None:
+        """Record the current version of a versioned collection as saved."""
+        self._saved_versions[name] = (getattr(self, _VERSIONED_FIELDS[name]), self._mutations[name])
+
+    def _mark_saved(self) -> None:
+        """Record the whole current state as saved."""
+        for name in _VERSIONED_FIELDS:
+            self._mark_field_saved(name)
+        self._saved_versions["emotion"] = _shallow_copy(self.last_emotion)
+        self._saved_versions["evolution"] = _shallow_copy(self.evolution_stats)
+        self._saved_versions["last_zone"] = self.last_zone
+
+    def _is_dirty(self, name: str) -> bool:
+        """Return True if a versioned collection changed since it was last saved.
+
+        A collection counts as changed if it was mutated through the tracker
+        or replaced by a different object.
+        """
+        saved = self._saved_versions.get(name)
+        return saved is None or saved[0] is not getattr(self, _VERSIONED_FIELDS[name]) or saved[1] != self._mutations[name]
+
     def _compute_incremental_changes(self) -> Dict[str, Any]:
-        """Compute fields that changed since last save and update the cache."""
+        """Compute fields that changed since last save and mark them saved.
+
+        Costs O(number of fields): collections are compared by mutation
+        counter, and only the small emotion/evolution dicts by value.
+        """
         changes: Dict[str, Any] = {}
+        saved = self._saved_versions
         # Emotion
-        if self.last_emotion != self._last_saved_state.get("emotion"):
+        if self.last_emotion != saved.get("emotion", _UNSAVED):
             changes["emotion"] = self.last_emotion
-            self._last_saved_state["emotion"] = copy.deepcopy(self.last_emotion) if self.last_emotion else None
-        # Modifiers
-        if self.applied_modifiers != self._last_saved_state.get("modifiers"):
-            changes["modifiers"] = self.applied_modifiers
-            self._last_saved_state["modifiers"] = copy.deepcopy(self.applied_modifiers)
-        # Memories
-        current_memories = list(self.memories)
-        if (
-            len(current_memories) != len(self._last_saved_state.get("memories", []))
-            or {str(m) for m in current_memories} != {str(m) for m in self._last_saved_state.get("memories", [])}
-        ):
-            changes["memories"] = current_memories
-            self._last_saved_state["memories"] = current_memories
+            saved["emotion"] = _shallow_copy(self.last_emotion)
         # Evolution
-        if self.evolution_stats != self._last_saved_state.get("evolution"):
+        if self.evolution_stats != saved.get("evolution", _UNSAVED):
             changes["evolution"] = self.evolution_stats
-            self._last_saved_state["evolution"] = copy.deepcopy(self.evolution_stats)
-        # Explored zones
-        current_zones = list(self.explored_zones)
-        if set(current_zones) != set(self._last_saved_state.get("explored_zones", [])):
-            changes["explored_zones"] = current_zones
-            self._last_saved_state["explored_zones"] = current_zones
-        # Discoveries
-        current_discoveries = list(self.discoveries)
-        if {str(d) for d in current_discoveries} != {str(d) for d in self._last_saved_state.get("discoveries", [])}:
-            changes["discoveries"] = current_discoveries
-            self._last_saved_state["discoveries"] = current_discoveries
+            saved["evolution"] = _shallow_copy(self.evolution_stats)
         # Last zone
-        if self.last_zone != self._last_saved_state.get("last_zone"):
+        if self.last_zone != saved.get("last_zone", _UNSAVED):
             changes["last_zone"] = self.last_zone
-            self._last_saved_state["last_zone"] = self.last_zone
-        # Always include checkpoints
-        changes["checkpoints"] = [copy.deepcopy(entry) for entry in self.checkpoints]
+            saved["last_zone"] = self.last_zone
+        # Collections
+        if self._is_dirty("modifiers"):
+            changes["modifiers"] = self.applied_modifiers
+        if self._is_dirty("memories"):
+            changes["memories"] = list(self.memories)
+        if self._is_dirty("explored_zones"):
+            changes["explored_zones"] = list(self.explored_zones)
+        if self._is_dirty("discoveries"):
+            changes["discoveries"] = list(self.discoveries)
+        if self._is_dirty("checkpoints"):
+            changes["checkpoints"] = [copy.deepcopy(entry) for entry in self.checkpoints]
+        for name in _VERSIONED_FIELDS:
+            if name in changes:
+                self._mark_field_saved(name)
         return changes
 
     def _persist_snapshot(self, snapshot: Dict[str, Any], incremental: bool) -> None:
@@ -838,7 +1100,7 @@ class EternaStateTracker(StateTrackerInterface):
                 f"💾 Eterna state saved to database (ID: {state_id}, version {snapshot['version']}, {'incremental' if incremental else 'full'})"
             )
         else:
-            save_json(self.save_path, snapshot, create_dirs=True, indent=None)
+            save_json(self.save_path, to_builtin(snapshot), create_dirs=True, indent=None)
             print(
                 f"💾 Eterna state saved to {self.save_path} (version {snapshot['version']}, {'incremental' if incremental else 'full'})"
             )
@@ -888,9 +1150,9 @@ class EternaStateTracker(StateTrackerInterface):
         if "emotion" in snapshot:
             self.last_emotion = snapshot.get("emotion")
         if "last_intensity" in snapshot:
-            self.last_intensity = snapshot.get("last_intensity", 0.0)
+            self._last_intensity = snapshot.get("last_intensity", 0.0)
         if "last_dominance" in snapshot:
-            self.last_dominance = snapshot.get("last_dominance", 0.0)
+            self._last_dominance = snapshot.get("last_dominance", 0.0)
         if "modifiers" in snapshot:
             self.applied_modifiers = snapshot.get("modifiers", {})
 
@@ -911,10 +1173,10 @@ class EternaStateTracker(StateTrackerInterface):
             return
         # Eager loading of collections
         if "memories" in snapshot:
-            self.memories = deque(snapshot.get("memories", []), maxlen=self.max_memories)
+            self.memories = deque(map(as_memory, snapshot.get("memories", [])), maxlen=self.max_memories)
             self._rebuild_memory_index()
         if "discoveries" in snapshot:
-            self.discoveries = deque(snapshot.get("discoveries", []), maxlen=self.max_discoveries)
+            self.discoveries = deque(map(as_discovery, snapshot.get("discoveries", [])), maxlen=self.max_discoveries)
             self._rebuild_discovery_index()
         if "explored_zones" in snapshot:
             self.explored_zones = deque(snapshot.get("explored_zones", []), maxlen=self.max_explored_zones)
@@ -932,19 +1194,6 @@ class EternaStateTracker(StateTrackerInterface):
         if "last_zone" in snapshot:
             self.last_zone = snapshot.get("last_zone")
 
-    def _init_last_saved_state(self) -> None:
-        lazy_mode = self.use_lazy_loading and self.use_database and self.db and getattr(self, "_lazy_state", None)
-        self._last_saved_state = {
-            "emotion": copy.deepcopy(self.last_emotion) if self.last_emotion else None,
-            "modifiers": copy.deepcopy(self.applied_modifiers),
-            "memories": [] if lazy_mode else list(getattr(self, "memories", [])),
-            "evolution": copy.deepcopy(self.evolution_stats),
-            "explored_zones": [] if lazy_mode else list(getattr(self, "explored_zones", [])),
-            "discoveries": [] if lazy_mode else list(getattr(self, "discoveries", [])),
-            "last_zone": self.last_zone,
-            "checkpoints": [] if lazy_mode else [copy.deepcopy(entry) for entry in getattr(self, "checkpoints", [])],
-        }
-
     def load(self):
         """
         Load the state from persistent storage.
@@ -959,15 +1208,21 @@ class EternaStateTracker(StateTrackerInterface):
         - Handles incremental state updates
         - Maintains a cache of the loaded state for future incremental saves
         - Supports lazy loading of collections for reduced memory usage
+
+        With a journal, the newest journal snapshot and the mutations recorded
+        after it are then applied on top, since they are at least as recent.
         """
         snapshot = self._load_snapshot()
-        if not snapshot:
-            return
-        self._apply_version_and_config(snapshot)
-        self._apply_scalar_fields(snapshot)
-        self._setup_collections(snapshot)
-        self._apply_evolution_and_zone(snapshot)
-        self._init_last_saved_state()
+        if snapshot:
+            self._apply_version_and_config(snapshot)
+            self._apply_scalar_fields(snapshot)
+            self._setup_collections(snapshot)
+            self._apply_evolution_and_zone(snapshot)
+            # What was just loaded matches storage; in lazy mode the empty
+            # collections stand in for the stored ones until they are accessed
+            self._mark_saved()
+        if self._journal is not None:
+            self._recover_from_journal()
 
     # --- quick‑and‑dirty identity drift metric -------------------------------
     # ------------------------------------------------------------------
@@ -1036,9 +1291,10 @@ class EternaStateTracker(StateTrackerInterface):
         the oldest checkpoints when the maximum size is reached.
         """
         record = self._normalize_checkpoint_entry(checkpoint)
+        # Journal the normalized record so replay restores it unchanged
+        self._journal_record("register_checkpoint", record)
         self.checkpoints.append(record)
-        self._last_saved_state.setdefault("checkpoints", [])
-        self._last_saved_state["checkpoints"] = [copy.deepcopy(entry) for entry in self.checkpoints]
+        self._mutations["checkpoints"] += 1
         return record
 
     def identity_continuity(self) -> float:
@@ -1117,6 +1373,47 @@ class EternaStateTracker(StateTrackerInterface):
             print(f"🔮 Last modified zone: {last_modified_zone}")
         return None
 
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """
+        Replace the tracked state with checkpointed tracker data.
+
+        The data is left untouched, so the same checkpoint can be restored
+        more than once. With a journal, a snapshot of the restored state is
+        written, so a crash after the rollback does not replay the mutations
+        it undid.
+
+        Args:
+            data: Tracker data shaped like EternaWorld.capture_checkpoint()
+                stores it under "state_tracker_data".
+        """
+        self.last_emotion = detach_snapshot(data.get("last_emotion"))
+        self.applied_modifiers = detach_snapshot(data.get("applied_modifiers", {}))
+
+        # Restore collections as bounded deques
+        # Checkpoints from before the record types hold plain dicts
+        self.memories = deque(map(as_memory, data.get("memories", [])), maxlen=self.max_memories)
+        self.discoveries = deque(map(as_discovery, data.get("discoveries", [])), maxlen=self.max_discoveries)
+        self.explored_zones = deque(data.get("explored_zones", []), maxlen=self.max_explored_zones)
+        self.modifiers = deque(
+            (ModifierEntry(zone, mod) for zone, mods in self.applied_modifiers.items() for mod in mods),
+            maxlen=self.max_modifiers,
+        )
+
+        # Queries read the indexes, which still describe the replaced collections
+        self._rebuild_memory_index()
+        self._rebuild_discovery_index()
+        self._rebuild_modifier_index()
+        self._zone_index = set(self.explored_zones)
+
+        self.evolution_stats = detach_snapshot(data.get("evolution_stats", self.evolution_stats))
+        self.last_zone = data.get("last_zone")
+
+        # Lazy loading must not overwrite the restored collections
+        self._collections_accessed.update(("memories", "discoveries", "explored_zones", "modifiers"))
+
+        if self._journal is not None:
+            self._write_journal_snapshot()
+
     # ------------------------------------------------------------------
     # Record that we just rolled back to a given checkpoint
     # ------------------------------------------------------------------
@@ -1372,6 +1669,86 @@ class EternaStateTracker(StateTrackerInterface):
             print(f"❌ Data import failed: {e}")
             return False
 
+    def export_to_ndjson(self, output_path=None, compress=None) -> Optional[str]:
+        """
+        Stream the state to a newline-delimited JSON file.
+
+        With the database, the whole state history is streamed by
+        EternaDatabase.export_to_ndjson(). Otherwise the current state is
+        written as a single record after the header line.
+
+        Args:
+            output_path: Path of the dump. If None, a timestamped path in an
+                "exports" directory is generated.
+            compress: Whether to gzip the dump; None compresses if the path
+                ends in ".gz".
+
+        Returns:
+            Optional[str]: The path to the dump, or None if the export failed.
+        """
+        if self.use_database and self.db:
+            self.flush()
+            return self.db.export_to_ndjson(output_path, compress=compress)
+
+        if output_path is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_dir = os.path.join(os.path.dirname(self.save_path), "exports")
+            output_path = os.path.join(export_dir, f"eternia_export_{timestamp}.ndjson" + (".gz" if compress else ""))
+
+        header = {
+            "format": NDJSON_FORMAT,
+            "kind": "state",
+            "schema_version": 1,
+            "export_timestamp": time.time(),
+        }
+        record = {"type": "state", "timestamp": time.time(), **self._full_state()}
+        try:
+            write_ndjson(output_path, (header, to_builtin(record)), compress=compress)
+            print(f"✅ State exported to {output_path}")
+            return output_path
+        except Exception as e:
+            print(f"❌ State export failed: {e}")
+            return None
+
+    def import_from_ndjson(self, input_path) -> bool:
+        """
+        Import states from a newline-delimited JSON dump and reload.
+
+        With the database, every state in the dump is imported one at a
+        time. Otherwise the last state in the dump replaces the state file.
+
+        Args:
+            input_path: Path of the dump, optionally gzipped.
+
+        Returns:
+            bool: True if the import was successful, False otherwise.
+        """
+        if self.use_database and self.db:
+            self.flush()
+            if self.db.import_from_ndjson(input_path) is None:
+                return False
+            self.load()
+            return True
+
+        if not os.path.exists(input_path):
+            print(f"❌ Import file not found: {input_path}")
+            return False
+        try:
+            last_state = None
+            for record in iter_ndjson(input_path):
+                if isinstance(record, dict) and record.pop("type", None) == "state":
+                    last_state = record
+            if last_state is None:
+                print("❌ No state data found in import file")
+                return False
+            save_json(self.save_path, last_state, create_dirs=True)
+            self.load()
+            print(f"✅ Data imported from {input_path}")
+            return True
+        except Exception as e:
+            print(f"❌ Data import failed: {e}")
+            return False
+
     def current_zone(self):
         """
         Get the name of the current zone.
@@ -1405,7 +1782,7 @@ class EternaStateTracker(StateTrackerInterface):
         """
         return getattr(self, "_recent_reward_avg", 0.0)
 
-    def observation_vector(self, companion=None) -> list[float]:
+    def observation_vector(self, companion=None, identity: Optional[float] = None) -> list[float]:
         """
         Generate an observation vector for reinforcement learning.
 
@@ -1415,6 +1792,8 @@ class EternaStateTracker(StateTrackerInterface):
 
         Args:
             companion: Optional companion object to include in the observation.
+            identity: Identity continuity already computed for this tick. If
+                None, identity_continuity() is called, which moves its baseline.
 
         Returns:
             list[float]: A list of 10 floating-point values representing the observation.
@@ -1432,7 +1811,7 @@ class EternaStateTracker(StateTrackerInterface):
         zone_id = self.zone_index(getattr(self, "last_zone", None)) / 10.0
         role_id = getattr(companion, "role_id", 0) / 10.0 if companion else 0.0
         convo_len = 0.0
-        ident = self.identity_continuity()
+        ident = self.identity_continuity() if identity is None else identity
         tod = math.sin(datetime.datetime.now().hour / 24 * 2 * math.pi)
         recent_r = self.recent_reward_avg()
         noise = random.random()
@@ -0,0 +1,209 @@
+"""
+Background, write-coalescing persistence for EternaStateTracker.
+
+In asynchronous persistence mode the tracker's save() only counts the tick as
+dirty. Every flush_every_ticks saves or flush_interval_ms milliseconds,
+whichever comes first, the tracker captures a snapshot on the calling thread
+and hands it to a BackgroundStateWriter. The writer persists it on its own
+thread. If the writer is still busy, newer snapshots are merged into the
+pending one, so a burst of saves costs a single write. flush() is a barrier
+that returns once everything submitted so far is on disk.
+
+Once ticks stop, save() is no longer called, so the writer also keeps time:
+with a due callback set, it calls it from its own thread whenever
+flush_interval_ms pass without a submit. The callback must not capture the
+state itself; the tracker posts the capture to the thread that owns it.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def detach_snapshot(value: Any) -> Any:
+    """
+    Copy the containers of a snapshot so it can be serialized on another thread.
+
+    Dictionaries are copied recursively and lists, tuples and deques shallowly
+    into lists; leaf records are shared, since the tracker never mutates them
+    after insertion.
+
+    Args:
+        value: The snapshot (or a value inside it).
+
+    Returns:
+        A copy that no longer aliases the tracker's live containers.
+    """
+    if isinstance(value, dict):
+        return {k: detach_snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, deque)):
+        return list(value)
+    return value
+
+
+class BackgroundStateWriter:
+    """
+    Persists tracker snapshots on a background thread, coalescing bursts.
+
+    Attributes:
+        flush_interval: Maximum seconds between writes while the tracker is dirty.
+        flush_every_ticks: Maximum number of coalesced saves per write.
+        writes: Number of snapshots written so far.
+        coalesced: Number of snapshots merged into a pending one instead of
+            being written separately.
+    """
+
+    def __init__(
+        self,
+        persist: Callable[[Dict[str, Any], bool], None],
+        flush_interval_ms: int = 1000,
+        flush_every_ticks: int = 100,
+    ):
+        """
+        Initialize and start the writer thread.
+
+        Args:
+            persist: Callable writing a snapshot; receives the snapshot and
+                whether it is incremental.
+            flush_interval_ms: Maximum milliseconds between writes while dirty.
+                Defaults to 1000.
+            flush_every_ticks: Maximum number of saves merged into one write.
+                Defaults to 100.
+        """
+        self._persist = persist
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.flush_every_ticks = max(1, int(flush_every_ticks))
+        self.writes = 0
+        self.coalesced = 0
+
+        self._cond = threading.Condition()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._pending_incremental = True
+        self._writing = False
+        self._closed = False
+        self._last_submit = time.monotonic()
+        self._on_due: Optional[Callable[[], None]] = None
+
+        self._thread = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self._thread.start()
+
+    def due(self, dirty_ticks: int) -> bool:
+        """
+        Return True if a tracker with this many unsaved ticks should submit now.
+
+        Args:
+            dirty_ticks: Number of save() calls since the last submit.
+        """
+        return (
+            dirty_ticks >= self.flush_every_ticks
+            or time.monotonic() - self._last_submit >= self.flush_interval
+        )
+
+    def set_due_callback(self, on_due: Optional[Callable[[], None]]) -> None:
+        """
+        Set the callback run on the writer thread when a write is overdue.
+
+        Args:
+            on_due: Called whenever flush_interval passes without a submit,
+                or None to stop the timed wake-ups. Ignored if flush_interval
+                is 0.
+        """
+        with self._cond:
+            self._on_due = on_due
+            self._cond.notify_all()
+
+    def submit(self, snapshot: Dict[str, Any], incremental: bool = True) -> None:
+        """
+        Queue a detached snapshot for writing, merging it with any pending one.
+
+        Args:
+            snapshot: Snapshot that no longer aliases live tracker state.
+            incremental: Whether the snapshot only carries changed fields.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("State writer is closed")
+            if self._pending is None:
+                self._pending = snapshot
+                self._pending_incremental = incremental
+            else:
+                # Later fields win; fields missing from an incremental
+                # snapshot keep the value from the earlier one.
+                self._pending.update(snapshot)
+                self._pending_incremental = self._pending_incremental and incremental
+                self.coalesced += 1
+            self._last_submit = time.monotonic()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every submitted snapshot has been written.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            bool: True if the writer is idle, False if the timeout expired.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Flush outstanding snapshots and stop the writer thread.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+        """
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _time_until_due(self) -> Optional[float]:
+        """Seconds until the due callback should run, or None if it never should."""
+        if self._on_due is None or self.flush_interval <= 0:
+            return None
+        return max(0.0, self._last_submit + self.flush_interval - time.monotonic())
+
+    def _run(self) -> None:
+        while True:
+            on_due = None
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    # Recomputed after every wake-up, since submits and
+                    # set_due_callback() move the deadline
+                    remaining = self._time_until_due()
+                    if remaining == 0.0:
+                        break
+                    self._cond.wait(remaining)
+                if self._pending is None:
+                    if self._closed:
+                        return
+                    # Nothing was submitted for a whole interval
+                    on_due = self._on_due
+                    self._last_submit = time.monotonic()
+                else:
+                    snapshot, incremental = self._pending, self._pending_incremental
+                    self._pending = None
+                    self._writing = True
+            if on_due is not None:
+                try:
+                    on_due()
+                except Exception:
+                    logger.exception("State writer due callback failed")
+                continue
+            try:
+                self._persist(snapshot, incremental)
+                self.writes += 1
+            except Exception:
+                logger.exception("Background state write failed")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
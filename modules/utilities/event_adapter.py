@@ -16,6 +16,40 @@ from modules.governor_events import GovernorEvent
 from modules.zone_events import ZoneEvent
 
 
+def enqueue_event(
+    event_queue: asyncio.Queue,
+    payload: Dict[str, Any],
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> None:
+    """
+    Put an event on an asyncio queue from any thread.
+
+    asyncio.Queue is not thread-safe, so when the caller is not running on the
+    queue's event loop (e.g. the simulation thread) the put is scheduled on
+    that loop instead. Events are dropped if the queue is full.
+
+    Args:
+        event_queue: The queue to put the event on.
+        payload: The event payload.
+        loop: The event loop that owns the queue, if known.
+    """
+    def _put() -> None:
+        try:
+            event_queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            pass  # drop on overflow
+
+    if loop is not None and not loop.is_closed():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            loop.call_soon_threadsafe(_put)
+            return
+    _put()
+
+
 class LegacyEventAdapter(EventListener):
     """
     Adapter that forwards events from the event bus to the legacy event queue.
@@ -32,6 +66,7 @@ class LegacyEventAdapter(EventListener):
             event_queue: The legacy event queue to forward events to.
         """
         self.event_queue = event_queue
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         super().__init__()  # Register event handlers
 
     @event_handler(GovernorEvent, priority=EventPriority.MONITOR)
@@ -45,12 +80,8 @@ class LegacyEventAdapter(EventListener):
         # Convert the event to the legacy format
         legacy_event = self._convert_to_legacy_format(event)
 
-        # Forward the event to the legacy queue
-        try:
-            self.event_queue.put_nowait(legacy_event)
-        except asyncio.QueueFull:
-            # Drop the event if the queue is full (same behavior as in governor._broadcast)
-            pass
+        # Forward the event to the legacy queue (dropped if the queue is full)
+        enqueue_event(self.event_queue, legacy_event, self.loop)
 
     @event_handler(ZoneEvent, priority=EventPriority.MONITOR)
     def handle_zone_event(self, event: ZoneEvent) -> None:
@@ -63,12 +94,8 @@ class LegacyEventAdapter(EventListener):
         # Convert the event to the legacy format
         legacy_event = self._convert_to_legacy_format(event)
 
-        # Forward the event to the legacy queue
-        try:
-            self.event_queue.put_nowait(legacy_event)
-        except asyncio.QueueFull:
-            # Drop the event if the queue is full
-            pass
+        # Forward the event to the legacy queue (dropped if the queue is full)
+        enqueue_event(self.event_queue, legacy_event, self.loop)
 
     def _convert_to_legacy_format(self, event: Event) -> Dict[str, Any]:
         """
@@ -6,12 +6,13 @@ It helps reduce duplicate code and standardize file handling across the codebase
 """
 
 import os
+import gzip
 import json
 import pickle
 import yaml
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union, TypeVar, Type, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union, TypeVar, Type, Callable
 
 T = TypeVar('T')
 
@@ -127,6 +128,73 @@ def save_json(file_path: Union[str, Path], data: Any, create_dirs: bool = True,
         logging.error(f"Error saving JSON to {path}: {e}")
         return False
 
+def write_ndjson(file_path: Union[str, Path], records: Iterable[Any], compress: Optional[bool] = None,
+                 create_dirs: bool = True, default: Optional[Callable[[Any], Any]] = None) -> int:
+    """
+    Stream records to a newline-delimited JSON (NDJSON) file, one per line.
+
+    Records are consumed and written one at a time, so memory use does not
+    depend on the size of the export. The file is written under a temporary
+    name and renamed into place once complete.
+
+    Args:
+        file_path: The path to the NDJSON file
+        records: Iterable (typically a generator) of JSON-serializable records
+        compress: Whether to gzip the file; None compresses if the path ends in ".gz"
+        create_dirs: Whether to create directories if they don't exist
+        default: Optional json.dump hook for objects JSON cannot serialize
+
+    Returns:
+        The number of records written
+
+    Raises:
+        OSError, TypeError, ValueError: If the file or a record cannot be written;
+            the partial file is removed
+    """
+    path = Path(file_path) if isinstance(file_path, str) else file_path
+    if compress is None:
+        compress = path.suffix == ".gz"
+    if create_dirs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+    try:
+        with (gzip.open(tmp_path, "wt", encoding="utf-8") if compress else open(tmp_path, "w", encoding="utf-8")) as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":"), default=default))
+                f.write("\n")
+                count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return count
+
+def iter_ndjson(file_path: Union[str, Path]) -> Iterator[Any]:
+    """
+    Read a newline-delimited JSON (NDJSON) file one record at a time.
+
+    Gzip-compressed files are detected by their magic number.
+
+    Args:
+        file_path: The path to the NDJSON file
+
+    Yields:
+        The decoded records, in file order; blank lines are skipped
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If a line is not valid JSON
+    """
+    path = Path(file_path) if isinstance(file_path, str) else file_path
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    with (gzip.open(path, "rt", encoding="utf-8") if compressed else open(path, "r", encoding="utf-8")) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
 def load_yaml(file_path: Union[str, Path], default: Any = None) -> Any:
     """
     Load YAML data from a file.
@@ -0,0 +1,181 @@
+"""
+Immutable per-tick snapshots of the Eternia world.
+
+The simulation publishes one WorldSnapshot at the end of every tick. Read
+endpoints serve that object instead of reading live tracker fields, so polling
+clients never race the simulation thread or trigger side effects such as
+identity_continuity() updating its baseline. Each snapshot carries an ETag so
+HTTP clients can revalidate with If-None-Match.
+
+The world's metrics are likewise computed once per tick into a MetricsFrame,
+a read-only dict shared by the governor, its policy callbacks, Prometheus and
+WebSocket clients.
+"""
+
+import itertools
+import secrets
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# Distinguishes ETags issued by this process from those of a previous run.
+_BOOT_ID = secrets.token_hex(4)
+_sequence = itertools.count(1)
+
+
+@dataclass(frozen=True)
+class WorldSnapshot:
+    """
+    Frozen view of the world state at the end of a tick.
+
+    Attributes:
+        cycle: Runtime cycle count when the snapshot was taken.
+        identity_score: Identity continuity computed for this tick.
+        emotion: Name of the last recorded emotion, if any.
+        modifiers: Applied modifiers keyed by zone.
+        current_zone: Name of the current zone, if any.
+        zones: Serialized zones from the exploration registry.
+        agents: Serialized companions.
+        sequence: Monotonic snapshot number within this process.
+        created_at: Unix timestamp of the snapshot.
+    """
+
+    cycle: int
+    identity_score: float
+    emotion: Optional[str]
+    modifiers: Mapping[str, Tuple[str, ...]]
+    current_zone: Optional[str]
+    zones: Tuple[Mapping[str, Any], ...] = ()
+    agents: Tuple[Mapping[str, Any], ...] = ()
+    sequence: int = field(default_factory=lambda: next(_sequence))
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag identifying this snapshot."""
+        return f'"{_BOOT_ID}-{self.sequence}"'
+
+    def to_state_dict(self) -> Dict[str, Any]:
+        """Return the fields served by GET /state as plain JSON types."""
+        return {
+            "cycle": self.cycle,
+            "identity_score": self.identity_score,
+            "emotion": self.emotion,
+            "modifiers": {zone: list(mods) for zone, mods in self.modifiers.items()},
+            "current_zone": self.current_zone,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the full snapshot as plain JSON types."""
+        data = self.to_state_dict()
+        data["zones"] = [dict(zone) for zone in self.zones]
+        data["agents"] = [dict(agent) for agent in self.agents]
+        data["sequence"] = self.sequence
+        data["created_at"] = self.created_at
+        return data
+
+
+class MetricsFrame(dict):
+    """
+    Read-only metrics of one tick.
+
+    A dict subclass so it serializes like the plain metrics dicts it
+    replaces, but every mutating method raises TypeError: the frame is
+    shared by every reader of the tick, including policy callbacks.
+
+    Attributes:
+        cycle: Runtime cycle count the metrics were computed at.
+    """
+
+    __slots__ = ("cycle",)
+
+    def __init__(self, cycle: int, values: Mapping[str, Any]):
+        """
+        Initialize the frame.
+
+        Args:
+            cycle: Runtime cycle count the metrics were computed at.
+            values: The metrics.
+        """
+        super().__init__(values)
+        self.cycle = cycle
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("MetricsFrame is read-only; copy it with dict(frame) to modify")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return MetricsFrame, (self.cycle, dict(self))
+
+
+def _plain(value: Any) -> Any:
+    """Reduce a value to a JSON primitive, stringifying anything complex."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict) and "name" in value:
+        return value["name"]
+    if hasattr(value, "name") and isinstance(getattr(value, "name"), str):
+        return value.name
+    return str(value)
+
+
+def _freeze_zone(index: int, zone: Any) -> Mapping[str, Any]:
+    return MappingProxyType({
+        "id": index,
+        "name": _plain(getattr(zone, "name", zone)),
+        "origin": _plain(getattr(zone, "origin", None)),
+        "complexity": _plain(getattr(zone, "complexity_level", None)),
+        "explored": bool(getattr(zone, "explored", False)),
+        "emotion": _plain(getattr(zone, "emotion_tag", None)),
+        "modifiers": tuple(_plain(m) for m in (getattr(zone, "modifiers", None) or ())),
+    })
+
+
+def _freeze_agent(agent: Any) -> Mapping[str, Any]:
+    return MappingProxyType({
+        "name": _plain(getattr(agent, "name", None)),
+        "role": _plain(getattr(agent, "role", None)),
+        "emotion": _plain(getattr(agent, "emotion", None)),
+        "zone": _plain(getattr(agent, "zone", None)),
+    })
+
+
+def build_world_snapshot(world: Any, identity_score: float) -> WorldSnapshot:
+    """
+    Capture a WorldSnapshot from a world on the simulation thread.
+
+    Args:
+        world: The EternaWorld to capture.
+        identity_score: Identity continuity already computed for this tick.
+
+    Returns:
+        WorldSnapshot: The frozen snapshot.
+    """
+    tracker = world.state_tracker
+    eterna = world.eterna
+
+    modifiers = MappingProxyType({
+        str(zone): tuple(_plain(m) for m in mods)
+        for zone, mods in list(tracker.applied_modifiers.items())
+    })
+
+    exploration = getattr(eterna, "exploration", None)
+    registry = getattr(exploration, "registry", None)
+    zones = tuple(
+        _freeze_zone(i, zone) for i, zone in enumerate(list(getattr(registry, "zones", None) or ()))
+    )
+    companions = getattr(getattr(eterna, "companions", None), "companions", None) or ()
+    agents = tuple(_freeze_agent(agent) for agent in list(companions))
+
+    return WorldSnapshot(
+        cycle=int(eterna.runtime.cycle_count),
+        identity_score=float(identity_score),
+        emotion=_plain(tracker.last_emotion),
+        modifiers=modifiers,
+        current_zone=_plain(tracker.current_zone()),
+        zones=zones,
+        agents=agents,
+    )
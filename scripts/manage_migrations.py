@@ -3,7 +3,8 @@
 Migration management script for Eternia database.
 
 This script provides a command-line interface for managing database migrations.
-It allows creating, applying, and rolling back migrations.
+It allows creating, applying, and rolling back migrations, and checking that
+every query issued by EternaDatabase is served by an index.
 """
 
 import argparse
@@ -14,7 +15,7 @@ import sys
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from modules.database import EternaDatabase
+from modules.database import EternaDatabase, find_full_scans
 
 # Configure logging
 logging.basicConfig(
@@ -94,6 +95,28 @@ def show_status(args):
         print(f"{migration_id:<20} {applied_str:<10} {os.path.basename(description)}")
 
 
+def explain_queries(args):
+    """Run EXPLAIN QUERY PLAN on every EternaDatabase query; fail on full table scans."""
+    db = EternaDatabase(args.db_path, args.migrations_path)
+    plans = db.explain_queries()
+    db.close()
+
+    for name, steps in plans.items():
+        print(f"{name}:")
+        for step in steps:
+            print(f"  {step}")
+
+    scans = find_full_scans(plans)
+    if scans:
+        print("\nFull table scans found:")
+        for name, steps in scans.items():
+            print(f"  {name}: {'; '.join(steps)}")
+        return 1
+
+    print("\nNo full table scans")
+    return 0
+
+
 def main():
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(
@@ -153,16 +176,22 @@ def main():
         "status", help="Show the status of all migrations"
     )
     status_parser.set_defaults(func=show_status)
+
+    # Explain queries command
+    explain_parser = subparsers.add_parser(
+        "explain", help="Check every database query plan for full table scans"
+    )
+    explain_parser.set_defaults(func=explain_queries)
     
     # Parse arguments
     args = parser.parse_args()
     
     # Execute the command
     if hasattr(args, "func"):
-        args.func(args)
-    else:
-        parser.print_help()
+        return args.func(args) or 0
+    parser.print_help()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
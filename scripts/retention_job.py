@@ -2,11 +2,15 @@
 """
 Retention job for Eternia.
 
-Purges old logs and triggers backup rotation according to environment variables.
+Purges old logs, triggers backup rotation and compacts the state history
+according to environment variables.
 
 Environment variables:
 - LOG_RETENTION_DAYS (default: 7)
 - BACKUP_RETENTION_DAYS (default: config backup.retention_days or 7)
+- STATE_DB_PATH (default: config persistence.compaction.db_path or data/eternia.db)
+- STATE_KEEP_ALL_MINUTES (default: config persistence.compaction.keep_all_minutes or 10)
+- STATE_PER_MINUTE_HOURS (default: config persistence.compaction.per_minute_hours or 24)
 """
 from __future__ import annotations
 
@@ -16,12 +20,32 @@ import logging
 
 from modules.retention import purge_logs
 from modules.backup_manager import backup_manager
+from modules.state_compaction import CompactionPolicy, StateCompactor
 from config.config_manager import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("retention_job")
 
 
+def compact_state_db() -> int:
+    """Compact the state history database; returns the number of reclaimed pages."""
+    db_path = os.getenv("STATE_DB_PATH", config.get("persistence.compaction.db_path", "data/eternia.db"))
+    if not os.path.exists(db_path):
+        logger.info("State database not found, skipping compaction: %s", db_path)
+        return 0
+    policy = CompactionPolicy(
+        keep_all_minutes=float(
+            os.getenv("STATE_KEEP_ALL_MINUTES", config.get("persistence.compaction.keep_all_minutes", 10))
+        ),
+        per_minute_hours=float(
+            os.getenv("STATE_PER_MINUTE_HOURS", config.get("persistence.compaction.per_minute_hours", 24))
+        ),
+        batch_size=int(config.get("persistence.compaction.batch_size", 500)),
+    )
+    report = StateCompactor(db_path, policy).run()
+    return report.reclaimed_pages
+
+
 def main() -> int:
     log_days = int(os.getenv("LOG_RETENTION_DAYS", "7"))
     backup_days_env = os.getenv("BACKUP_RETENTION_DAYS")
@@ -34,8 +58,14 @@ def main() -> int:
 
     deleted_logs = purge_logs(older_than_days=log_days)
     deleted_backups = backup_manager.cleanup_old_backups()
+    reclaimed_pages = compact_state_db()
 
-    logger.info("Retention summary: logs=%d, backups=%d", deleted_logs, deleted_backups)
+    logger.info(
+        "Retention summary: logs=%d, backups=%d, state_pages_reclaimed=%d",
+        deleted_logs,
+        deleted_backups,
+        reclaimed_pages,
+    )
     return 0
 
 
@@ -3,11 +3,13 @@ import json
 import logging
 import os
 import secrets
+import threading
 from pathlib import Path
 
 from modules.api_interface import APIInterface
 from modules.dependency_injection import get_container
 from modules.governor import AlignmentGovernor
+from modules.simulation_host import SimulationHost
 from modules.utilities.event_adapter import setup_legacy_adapter
 from world_builder import build_world
 
@@ -94,8 +96,9 @@ def load_governor_state():
                 return
 
             # Use the api_interface to access the governor
-            api_interface.governor._shutdown = state.get("shutdown", False)
-            api_interface.governor._paused = state.get("paused", False)
+            api_interface.governor.set_run_state(
+                shutdown=state.get("shutdown", False), paused=state.get("paused", False)
+            )
     except json.JSONDecodeError as e:
         logging.error(f"Invalid JSON in governor state file: {e}")
     except PermissionError as e:
@@ -104,11 +107,29 @@ def load_governor_state():
         logging.error(f"Error loading governor state: {e}")
 
 
+# Last state written to STATE_FILE, so repeated saves of the same state are skipped
+_saved_governor_state = None
+# Transitions are saved from API threads and the simulation thread alike
+_governor_state_lock = threading.Lock()
+
+
 # Save governor state
 def save_governor_state(shutdown=False, paused=False):
     """
     Save the governor state (shutdown and pause) to the file system with proper error handling.
+
+    The file is only rewritten when the state differs from the last one saved.
+    Calls are serialized, so concurrent transitions never share the temporary file.
     """
+    with _governor_state_lock:
+        _write_governor_state({"shutdown": bool(shutdown), "paused": bool(paused)})
+
+
+def _write_governor_state(state):
+    """Write the state to STATE_FILE unless it was the last one saved; hold _governor_state_lock."""
+    global _saved_governor_state
+    if state == _saved_governor_state:
+        return
     try:
         # Create directory if it doesn't exist
         STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -120,10 +141,13 @@ def save_governor_state(shutdown=False, paused=False):
         # Write to a temporary file first, then rename to ensure atomic write
         temp_file = STATE_FILE.with_suffix(".tmp")
         with open(temp_file, "w") as f:
-            json.dump({"shutdown": bool(shutdown), "paused": bool(paused)}, f)
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
 
         # Rename the temporary file to the actual file
         temp_file.replace(STATE_FILE)
+        _saved_governor_state = state
     except PermissionError as e:
         logging.error(f"Permission denied when saving governor state: {e}")
     except Exception as e:
@@ -133,43 +157,37 @@ def save_governor_state(shutdown=False, paused=False):
 # Load governor state on startup, but ensure we're not in shutdown state
 # to allow cycles to start running immediately
 load_governor_state()
-api_interface.governor._shutdown = False  # Ensure we're not in shutdown state
-api_interface.governor._paused = False  # Ensure we're not in paused state
+# Ensure we're neither shut down nor paused
+api_interface.governor.set_run_state(shutdown=False, paused=False)
 save_governor_state(False, False)  # Save the non-shutdown, non-paused state
 
 
+def _persist_governor_state(shutdown: bool, paused: bool):
+    """Persist the governor's shutdown/pause flags when they change."""
+    # Save governor state to persist across page reloads
+    save_governor_state(shutdown=shutdown, paused=paused)
+
+
+# Written only on transitions, whichever thread makes them, not every tick
+api_interface.governor.add_run_state_listener(_persist_governor_state)
+
+
 # ---------------- simulation task ----------------
+# The simulation runs on its own thread so that REST and WebSocket handlers
+# are never blocked by world.step(); see modules/simulation_host.py.
+simulation_host = SimulationHost(
+    api_interface.world,
+    api_interface.governor,
+    event_queue=event_queue,
+)
+# Dirty tracker state left behind when ticks stop is captured on the simulation
+# thread; while the host is not running the timed flush is skipped, since
+# API handlers may be mutating the tracker
+api_interface.governor.state_tracker.set_flush_dispatcher(simulation_host.post)
+
+
 async def run_world():
-    while True:
-        # Check if the governor is shutdown or paused and save the state
-        if api_interface.governor.is_shutdown():
-            # Save governor state to persist across page reloads
-            save_governor_state(
-                shutdown=True, paused=api_interface.governor.is_paused()
-            )
-            # Wait for a long time to effectively stop the simulation
-            await asyncio.sleep(
-                10
-            )  # Check every 10 seconds if shutdown is still active
-            continue  # Continue checking instead of breaking to allow for resume
-        elif api_interface.governor.is_paused():
-            # Save governor state to persist across page reloads
-            save_governor_state(shutdown=False, paused=True)
-            # When paused, add a longer delay to prevent CPU spinning
-            await asyncio.sleep(0.5)  # longer delay when paused
-            continue  # Skip the rest of the loop
-        else:
-            # Clear governor state if not shutdown or paused
-            save_governor_state(shutdown=False, paused=False)
-
-        # Use the api_interface to execute a step
-        metrics = api_interface.world.collect_metrics()
-        if api_interface.governor.tick(metrics):
-            api_interface.world.step()
-            # Use the api_interface to access the world's runtime
-            api_interface.world.eterna.runtime.cycle_count += 1  # Increment cycle count
-            await asyncio.sleep(0)  # yield when running
-        else:
-            # This case is handled above now, but keep as a fallback
-            # When paused, add a longer delay to prevent CPU spinning
-            await asyncio.sleep(0.5)  # longer delay when paused
+    """Start the simulation thread, bound to the running API event loop."""
+    loop = asyncio.get_running_loop()
+    legacy_adapter.loop = loop
+    simulation_host.start(loop)
@@ -11,7 +11,8 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from ..auth import get_current_active_user, Permission, User
-from ..deps import world, governor, save_governor_state, DEV_TOKEN
+from ..deps import world, governor, simulation_host, DEV_TOKEN
+from modules.checkpoint_catalog import CheckpointCatalog
 from modules.governor import CHECKPOINT_DIR
 from ..schemas import CommandOut
 
@@ -21,16 +22,6 @@ LOG_VALUE_MAX = 256
 SAFE_CHECKPOINT_RE = re.compile(r"^[A-Za-z0-9._-]+$")
 
 
-def _checkpoint_catalog(root: Path) -> dict[str, Path]:
-    catalog: dict[str, Path] = {}
-    if not root.exists():
-        return catalog
-    for entry in root.iterdir():
-        if entry.is_file() and entry.suffix in {".json", ".bin"}:
-            catalog[entry.name] = entry
-    return catalog
-
-
 def _fingerprint(value: str) -> str:
     try:
         digest = hashlib.sha256(value.encode("utf-8", "ignore")).hexdigest()
@@ -60,9 +51,10 @@ def _resolve_checkpoint_target(file_input: str) -> Path:
         raise HTTPException(status_code=400, detail="Invalid file path")
 
     checkpoint_root = CHECKPOINT_DIR.resolve()
-    catalog = _checkpoint_catalog(checkpoint_root)
+    # Only checkpoints in the catalog are valid targets; no directory listing
+    entry = CheckpointCatalog.for_directory(checkpoint_root).get(safe_name)
 
-    candidate = catalog.get(safe_name)
+    candidate = entry.path if entry else None
     if not candidate:
         logger.warning(
             "Checkpoint not present (fingerprint=%s)",
@@ -73,6 +65,21 @@ def _resolve_checkpoint_target(file_input: str) -> Path:
     return candidate
 
 
+def _reset_cycle_count() -> None:
+    """Restart the cycle count; run on the simulation thread between ticks."""
+    world.eterna.runtime.cycle_count = 0
+
+
+def _resume() -> None:
+    """Clear a shutdown and resume; run on the simulation thread between ticks."""
+    # If the simulation was shutdown, we need to reset the shutdown flag
+    if governor.is_shutdown():
+        governor.set_run_state(shutdown=False)
+        # Reset the cycle count to start from the beginning
+        _reset_cycle_count()
+    governor.resume()
+
+
 def _user_fingerprint(user: Union[str, User]) -> str:
     raw = user.username if isinstance(user, User) else str(user)
     return _fingerprint(_sanitize_for_log(raw))
@@ -189,8 +196,8 @@ async def rollback(
         # Log the user who performed the rollback
         user_info = _user_fingerprint(current_user)
 
-        # Perform the rollback
-        governor.rollback(target)
+        # Perform the rollback between ticks on the simulation thread
+        await simulation_host.call(governor.rollback, target)
         target_label = target.name if target else "latest"
         logger.info(
             "System rolled back",
@@ -265,45 +272,33 @@ async def command(
     command_status = "unknown"
 
     try:
+        # Every command runs between ticks on the simulation thread
         match action:
             case "pause":
-                governor.pause()
-                # Save pause state immediately
-                save_governor_state(shutdown=False, paused=True)
+                await simulation_host.call(governor.pause)
                 command_status = "paused"
                 logger.info("System paused", extra={"requested_by": user_info})
             case "resume":
-                # If the simulation was shutdown, we need to reset the shutdown flag
-                if governor.is_shutdown():
-                    governor._shutdown = False
-                    # Reset the cycle count to start from the beginning
-                    world.eterna.runtime.cycle_count = 0
-                governor.resume()
-                # Clear both shutdown and pause states
-                save_governor_state(shutdown=False, paused=False)
+                await simulation_host.call(_resume)
                 command_status = "running"
                 logger.info("System resumed", extra={"requested_by": user_info})
             case "shutdown":
-                governor.shutdown("user request")
-                # Save shutdown state immediately
-                save_governor_state(shutdown=True, paused=False)
+                await simulation_host.call(governor.shutdown, "user request")
                 command_status = "shutdown"
                 logger.info("System shutdown initiated", extra={"requested_by": user_info})
                 return {"status": command_status, "detail": "server will stop world loop"}
             case "step_reset" | "step":
                 # Reset the cycle count to start from the beginning
-                world.eterna.runtime.cycle_count = 0
+                await simulation_host.call(_reset_cycle_count)
                 command_status = "step_reset"
                 logger.info("Step counter reset", extra={"requested_by": user_info})
             case "reset":
                 # Reset the cycle count to start from the beginning
-                world.eterna.runtime.cycle_count = 0
+                await simulation_host.call(_reset_cycle_count)
                 command_status = "reset"
                 logger.info("Step counter reset", extra={"requested_by": user_info})
             case "emergency_stop" | "emergency_shutdown":
-                governor.shutdown("emergency stop requested")
-                # Save shutdown state immediately
-                save_governor_state(shutdown=True, paused=False)
+                await simulation_host.call(governor.shutdown, "emergency stop requested")
                 command_status = "emergency_stopped"
                 logger.info("Emergency stop initiated", extra={"requested_by": user_info})
                 return {"status": command_status, "detail": "emergency stop initiated, server will stop world loop"}
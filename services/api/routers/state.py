@@ -1,14 +1,16 @@
+import base64
 import logging
-from typing import Dict, List, Optional, Union
+from itertools import islice
+from typing import Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, field_validator
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from ..auth import get_current_active_user, Permission, User
-from ..deps import world, DEV_TOKEN
+from ..deps import world, governor, DEV_TOKEN
 from ..schemas import StateOut
 
 # Configure logging
@@ -56,46 +58,58 @@ async def _auth_via_jwt(token: str, client_info: str):
     return user
 
 
-def _get_tracker_or_error():
-    # World/state_tracker checks
-    if not hasattr(world, 'state_tracker') or not world.state_tracker:
-        logger.error("State tracker not initialized")
-        raise HTTPException(status_code=500, detail="State tracker not initialized")
-    tracker = world.state_tracker
-
-    if not hasattr(world, 'eterna') or not world.eterna:
-        logger.error("World or Eterna not initialized")
+def _get_snapshot_or_error():
+    snapshot = getattr(world, "snapshot", None)
+    if snapshot is None:
+        logger.error("World snapshot not published")
         raise HTTPException(status_code=500, detail="World not initialized")
-    if not hasattr(world.eterna, 'runtime') or not world.eterna.runtime:
-        logger.error("Runtime not initialized")
-        raise HTTPException(status_code=500, detail="Runtime not initialized")
-    if not hasattr(world.eterna.runtime, 'cycle_count'):
-        logger.error("cycle_count not found in runtime")
-        raise HTTPException(status_code=500, detail="Cycle count not found")
-
-    # Tracker capability checks
-    if not hasattr(tracker, 'identity_continuity'):
-        logger.error("identity_continuity method not found in state tracker")
-        raise HTTPException(status_code=500, detail="Method not found")
-    if not hasattr(tracker, 'applied_modifiers'):
-        logger.error("applied_modifiers attribute not found in state tracker")
-        raise HTTPException(status_code=500, detail="Attribute not found")
-    if not hasattr(tracker, 'current_zone'):
-        logger.error("current_zone method not found in state tracker")
-        raise HTTPException(status_code=500, detail="Method not found")
-    if not hasattr(tracker, 'last_emotion'):
-        logger.error("last_emotion attribute not found in state tracker")
-        raise HTTPException(status_code=500, detail="Attribute not found")
-
-    return tracker
-
-
-def _emotion_to_name(emotion) -> str:
-    if isinstance(emotion, dict) and "name" in emotion:
-        return emotion["name"]
-    if hasattr(emotion, "name"):
-        return emotion.name
-    return emotion
+    return snapshot
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header matches the given ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# Serialized /state body for the most recent snapshot, keyed by its ETag
+_state_body_cache: tuple[str, bytes] = ("", b"")
+
+
+def _state_body(snapshot) -> bytes:
+    global _state_body_cache
+    etag, body = _state_body_cache
+    if etag != snapshot.etag:
+        body = StateOut.model_validate(snapshot.to_state_dict()).model_dump_json().encode()
+        _state_body_cache = (snapshot.etag, body)
+    return body
+
+
+def _encode_history_cursor(state: dict) -> str:
+    """Encode the keyset position after a state as an opaque cursor."""
+    raw = f"{state['timestamp']!r}:{state['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, state_id = raw.rsplit(":", 1)
+        return float(timestamp), int(state_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _get_state_db_or_error():
+    db = getattr(getattr(world, "state_tracker", None), "db", None)
+    if db is None:
+        raise HTTPException(status_code=503, detail="State history requires database persistence")
+    return db
 
 
 async def auth(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -224,6 +238,7 @@ async def send_reward(
     response_description="Current state of the system",
     responses={
         200: {"description": "State successfully retrieved", "model": StateOut},
+        304: {"description": "State unchanged since the snapshot named in If-None-Match"},
         500: {"description": "Internal server error"},
     },
 )
@@ -231,22 +246,94 @@ async def send_reward(
 async def get_state(request: Request, current_user: Union[str, User] = Depends(auth)):
     """
     Get the current state of the system.
+
+    Serves the snapshot published at the end of the last tick, so reads never
+    touch live simulation state. Conditional GETs with a matching
+    If-None-Match header get 304 Not Modified.
     """
     try:
-        tracker = _get_tracker_or_error()
-        emotion = _emotion_to_name(tracker.last_emotion)
-        return {
-            "cycle": world.eterna.runtime.cycle_count,
-            "identity_score": tracker.identity_continuity(),
-            "emotion": emotion,
-            "modifiers": tracker.applied_modifiers,
-            "current_zone": tracker.current_zone(),
-        }
+        snapshot = _get_snapshot_or_error()
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=_state_body(snapshot), media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Error retrieving state: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve state: {str(e)}")
 
 
+@router.get(
+    "/state/history",
+    summary="Get state history",
+    description="Streams persisted state versions in timestamp order, with cursor pagination. Only the requested fields are read.",
+    response_description="A page of historical states and the cursor of the next page",
+    responses={
+        200: {"description": "History page successfully retrieved"},
+        400: {"description": "Unknown field or invalid cursor"},
+        503: {"description": "Database persistence is disabled"},
+    },
+)
+@limiter.limit("60/minute")
+def get_state_history(
+    request: Request,
+    start: Optional[float] = Query(None, description="Earliest Unix timestamp to include"),
+    end: Optional[float] = Query(None, description="Unix timestamp to stop before"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. 'version,evolution'"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of states per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    current_user: Union[str, User] = Depends(auth),
+):
+    """
+    Get a page of the persisted state history.
+
+    Returns:
+        {"items": [...], "next_cursor": str or None}
+    """
+    db = _get_state_db_or_error()
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    after = _decode_history_cursor(cursor) if cursor else None
+    try:
+        states = db.iter_state_range(start, end, field_list, batch_size=limit + 1, after=after)
+        items = list(islice(states, limit + 1))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error retrieving state history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve state history")
+    next_cursor = _encode_history_cursor(items[limit - 1]) if len(items) > limit else None
+    return {"items": items[:limit], "next_cursor": next_cursor}
+
+
+@router.get(
+    "/state/history/at",
+    summary="Get a historical state",
+    description="Returns the full persisted state at a version, or the last one saved at or before a timestamp.",
+    response_description="The historical state",
+    responses={
+        200: {"description": "State successfully retrieved"},
+        400: {"description": "Neither or both of version and timestamp given"},
+        404: {"description": "No matching state"},
+        503: {"description": "Database persistence is disabled"},
+    },
+)
+@limiter.limit("60/minute")
+def get_state_at(
+    request: Request,
+    version: Optional[int] = Query(None, description="State version"),
+    timestamp: Optional[float] = Query(None, description="Unix timestamp"),
+    current_user: Union[str, User] = Depends(auth),
+):
+    """Get the persisted state at a version or point in time."""
+    db = _get_state_db_or_error()
+    try:
+        state = db.load_state_at(version=version, timestamp=timestamp)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if state is None:
+        raise HTTPException(status_code=404, detail="No state found")
+    return state
+
+
 @router.get(
     "/checkpoints",
     summary="List checkpoints",
@@ -267,11 +354,11 @@ async def list_checkpoints(request: Request, current_user: Union[str, User] = De
         current_user: The authenticated user or legacy token
 
     Returns:
-        List of the 10 most recent checkpoints
+        List of the 10 most recent checkpoints, oldest first
     """
     try:
-        checkpoints = world.state_tracker.list_checkpoints()
-        return checkpoints[-10:] if checkpoints else []  # last 10 or empty list
+        # Read from the checkpoint catalog instead of listing the directory
+        return [entry.to_record() for entry in governor.checkpoint_catalog.entries(limit=10)]
     except Exception as e:
         logger.error(f"Error retrieving checkpoints: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve checkpoints")
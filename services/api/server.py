@@ -17,7 +17,7 @@ from modules.backup_manager import backup_manager
 from modules.monitoring import http_metrics_middleware
 from config.config_manager import config
 from .auth import auth_router, get_current_active_user
-from .deps import run_world, world, event_queue, DEV_TOKEN
+from .deps import run_world, simulation_host, world, governor, event_queue, DEV_TOKEN
 from .routers import (
     agent_router,
     zone_router,
@@ -47,6 +47,9 @@ security = HTTPBearer()
 # Shared test token used across endpoints and WebSocket
 TEST_TOKEN = "test-token-for-authentication"
 
+# Number of recent governor events replayed to a WebSocket client on connect
+WS_REPLAY_EVENTS = 50
+
 # ─────────────────────────  Helper utilities  ─────────────────────────
 
 def _get_client_host_from_headers(headers) -> str | None:
@@ -369,8 +372,11 @@ async def websocket_endpoint(ws: WebSocket):
 
         # Authentication successful
         logger.info(f"WebSocket authentication successful for {client}")
-        clients.add(ws)
         await ws.send_json({"event": "connected", "status": "authenticated"})
+        # Replay recent governor events from the journal before live ones
+        for entry in await asyncio.to_thread(governor.journal.tail, WS_REPLAY_EVENTS):
+            await ws.send_json({**entry, "replayed": True})
+        clients.add(ws)
         logger.info(f"WebSocket connection established for {client}, total active connections: {len(clients)}")
 
         try:
@@ -426,6 +432,12 @@ async def startup_event():
     # Start the backup scheduler if backups are enabled
     backup_manager.start_scheduler()
 
-    # Start the broadcaster and world loop
+    # Start the broadcaster and the simulation thread
     asyncio.create_task(broadcaster())
     asyncio.create_task(run_world())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Let the current tick finish before the process exits
+    await asyncio.to_thread(simulation_host.stop)
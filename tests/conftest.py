@@ -8,6 +8,8 @@ import pytest
 from unittest.mock import MagicMock
 import time
 
+import modules.governor as governor_module
+from modules.governor import AlignmentGovernor
 from modules.utilities.event_bus import EventBus, Event, EventListener, EventPriority
 from modules.governor_events import PauseEvent, ResumeEvent, ShutdownEvent
 from modules.emotions import EmotionalState, EmotionalCircuitSystem
@@ -194,4 +196,41 @@ def mock_governor():
     """Return a mocked governor instance."""
     governor = MagicMock()
     governor.is_shutdown.return_value = False
-    return governor
\ No newline at end of file
+    return governor
+
+
+# Governor Fixtures
+
+@pytest.fixture
+def make_governor(tmp_path, monkeypatch):
+    """
+    Return a factory for AlignmentGovernor instances that checkpoint into tmp_path.
+
+    The world and state tracker default to MagicMocks: the world captures a
+    small checkpoint of the Forest zone and the tracker registers checkpoints
+    as given. Keyword arguments are passed to AlignmentGovernor. Every
+    governor made is closed on teardown.
+    """
+    monkeypatch.setattr(governor_module, "CHECKPOINT_DIR", tmp_path)
+    governors = []
+
+    def make(world=None, state_tracker=None, **kwargs):
+        if world is None:
+            world = MagicMock()
+            world.capture_checkpoint.side_effect = lambda since=None: {
+                "state_tracker_data": {"last_zone": "Forest", "memories": [{"description": "m"}]},
+                "companion_trainer_weights": {"policy": None},
+                "cycle_count": 1,
+                "versions": {"tracker": {}, "policy": {}},
+            }
+        if state_tracker is None:
+            state_tracker = MagicMock()
+            state_tracker._state_version = 1
+            state_tracker.register_checkpoint.side_effect = lambda record: record
+        governor = AlignmentGovernor(world, state_tracker, **kwargs)
+        governors.append(governor)
+        return governor
+
+    yield make
+    for governor in governors:
+        governor.close(2.0)
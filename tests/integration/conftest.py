@@ -77,18 +77,18 @@ def patched_world():
 @pytest.fixture
 def patched_save_governor_state():
     """Return a context manager that patches the save_governor_state function."""
-    with patch("services.api.deps.save_governor_state") as mock_save, \
-         patch("services.api.routers.command.save_governor_state") as mock_command_save:
-        yield mock_command_save
+    # The governor's run-state listener in deps is the only writer
+    with patch("services.api.deps.save_governor_state") as mock_save:
+        yield mock_save
 
 @pytest.fixture
 def patched_save_shutdown_state():
     """Return a context manager that patches the save_shutdown_state function (deprecated)."""
     # This fixture is kept for backward compatibility with existing tests
     # New tests should use patched_save_governor_state instead
-    with patch("services.api.deps.save_governor_state") as mock_save, \
-         patch("services.api.routers.command.save_governor_state") as mock_command_save:
-        yield mock_command_save
+    # The governor's run-state listener in deps is the only writer
+    with patch("services.api.deps.save_governor_state") as mock_save:
+        yield mock_save
 
 
 @pytest.fixture
@@ -44,6 +44,49 @@ class TestAPIIntegration:
         assert "modifiers" in data
         assert "current_zone" in data
 
+    def test_get_state_conditional(self, client, auth_headers):
+        """Test that /state carries an ETag and answers a matching If-None-Match with 304."""
+        response = client.get("/state", headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        response = client.get("/state", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        response = client.get("/state", headers={**auth_headers, "If-None-Match": '"stale"'})
+        assert response.status_code == 200
+
+    def test_get_state_history_paginates(self, client, auth_headers, tmp_path):
+        """Test that /state/history pages through persisted states with a cursor."""
+        from modules.database import EternaDatabase
+
+        db = EternaDatabase(db_path=str(tmp_path / "eternia.db"))
+        for version in range(1, 6):
+            db.save_state({"version": version, "evolution": {"intellect": 100 + version, "senses": 100}})
+        try:
+            with patch("services.api.routers.state.world") as mock_world:
+                mock_world.state_tracker.db = db
+                response = client.get("/state/history?fields=version&limit=2", headers=auth_headers)
+                assert response.status_code == 200
+                page = response.json()
+                versions = [item["version"] for item in page["items"]]
+                while page["next_cursor"]:
+                    response = client.get(
+                        f"/state/history?fields=version&limit=2&cursor={page['next_cursor']}", headers=auth_headers
+                    )
+                    page = response.json()
+                    versions += [item["version"] for item in page["items"]]
+                assert versions == [1, 2, 3, 4, 5]
+
+                response = client.get("/state/history/at?version=3", headers=auth_headers)
+                assert response.status_code == 200
+                assert response.json()["evolution"]["intellect"] == 103
+
+                assert client.get("/state/history?fields=nope", headers=auth_headers).status_code == 400
+        finally:
+            db.close()
+
     def test_command_pause_resume(self, client, auth_headers):
         """Test that the pause and resume commands work correctly."""
         # Test pause command
@@ -63,13 +106,11 @@ class TestAPIIntegration:
 
     def test_command_shutdown(self, client, auth_headers):
         """Test that the shutdown command works correctly."""
-        with patch("services.api.routers.command.governor") as mock_governor, \
-             patch("services.api.routers.command.save_governor_state") as mock_save:
+        with patch("services.api.routers.command.governor") as mock_governor:
             response = client.post("/command/shutdown", headers=auth_headers)
             assert response.status_code == 200
             assert response.json()["status"] == "shutdown"
             mock_governor.shutdown.assert_called_once_with("user request")
-            mock_save.assert_called_once_with(shutdown=True, paused=False)
 
     def test_command_rollback(self, client, auth_headers):
         """Test that the rollback command works correctly."""
@@ -62,7 +62,10 @@ def test_patched_world_fixture(client, patched_world, auth_headers):
 
 def test_patched_save_shutdown_state_fixture(client, auth_headers, patched_governor, patched_save_shutdown_state):
     """Demonstrate how to use the patched_save_shutdown_state fixture."""
-    # Make a request that uses the save_shutdown_state function
+    from services.api.deps import _persist_governor_state
+
+    # A real governor notifies its run-state listener, which saves the state
+    patched_governor.shutdown.side_effect = lambda reason: _persist_governor_state(True, False)
     response = client.post("/command/shutdown", headers=auth_headers)
 
     # Verify the response and that the function was called
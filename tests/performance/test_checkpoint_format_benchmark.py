@@ -0,0 +1,83 @@
+"""
+Performance benchmarks for the checkpoint container against pickle.
+
+Both formats save and load the same synthetic checkpoint: tracker
+collections of compact records plus a policy of about a million float32
+weights. Pickle is the format EternaWorld used before the container; the
+container stores the weights as raw tensors and memory maps them on load.
+"""
+
+import pytest
+import torch
+
+from modules.checkpoint_writer import read_checkpoint_file, write_checkpoint_file
+from modules.state_records import DiscoveryRecord, MemoryRecord
+from modules.utilities.file_utils import load_pickle, save_pickle
+
+FORMATS = {
+    "container": (write_checkpoint_file, read_checkpoint_file),
+    "pickle": (save_pickle, load_pickle),
+}
+
+
+def _checkpoint_data(n_records=20_000):
+    """Build checkpoint data shaped like EternaWorld.capture_checkpoint()."""
+    torch.manual_seed(0)
+    return {
+        "state_tracker_data": {
+            "last_emotion": {"name": "awe", "intensity": 0.5, "direction": "neutral"},
+            "applied_modifiers": {f"zone{i}": ["mist", "echo"] for i in range(100)},
+            "memories": [
+                MemoryRecord({"description": f"memory {i}", "emotional_quality": "joy", "clarity": 0.8})
+                for i in range(n_records)
+            ],
+            "evolution_stats": {"intellect": 110.0, "senses": 105.0},
+            "explored_zones": [f"zone{i}" for i in range(1_000)],
+            "discoveries": [DiscoveryRecord({"name": f"d{i}", "category": "artifact"}) for i in range(n_records)],
+            "last_zone": "zone1",
+        },
+        "companion_trainer_weights": {
+            "policy": {
+                "fc1.weight": torch.randn(1024, 512),
+                "fc1.bias": torch.randn(1024),
+                "fc2.weight": torch.randn(512, 1024),
+                "fc2.bias": torch.randn(512),
+            },
+        },
+        "cycle_count": 12_345,
+    }
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_checkpoint_save_performance(benchmark, tmp_path, fmt):
+    """Benchmark writing a checkpoint in each format."""
+    write, _ = FORMATS[fmt]
+    data = _checkpoint_data()
+    path = tmp_path / "ckpt.bin"
+
+    benchmark(write, path, data)
+    benchmark.extra_info["bytes"] = path.stat().st_size
+
+    assert path.stat().st_size > 0
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_checkpoint_load_performance(benchmark, tmp_path, fmt):
+    """Benchmark reading a checkpoint back and touching its policy weights."""
+    write, read = FORMATS[fmt]
+    data = _checkpoint_data()
+    path = tmp_path / "ckpt.bin"
+    write(path, data)
+
+    def load():
+        loaded = read(path)
+        policy = loaded["companion_trainer_weights"]["policy"]
+        # Force the weights to be read, as load_state_dict() would
+        return loaded, sum(float(t.sum()) for t in policy.values())
+
+    loaded, _ = benchmark(load)
+
+    assert loaded["cycle_count"] == 12_345
+    assert len(loaded["state_tracker_data"]["memories"]) == 20_000
+    assert torch.equal(loaded["companion_trainer_weights"]["policy"]["fc2.bias"],
+                       data["companion_trainer_weights"]["policy"]["fc2.bias"])
@@ -0,0 +1,65 @@
+"""
+Performance benchmarks for EternaDatabase.
+
+This module measures how quickly save_state() writes states holding thousands
+of memories, discoveries, explored zones and modifiers, and reports the
+throughput in rows per second.
+"""
+
+import pytest
+
+from modules.database import EternaDatabase
+
+
+def _large_state(size):
+    """Build a state dictionary with `size` entries in each collection."""
+    return {
+        "version": 1,
+        "emotion": {"name": "joy", "intensity": 0.8, "direction": "positive"},
+        "last_intensity": 0.8,
+        "last_dominance": 0.5,
+        "last_zone": "zone-0",
+        "evolution": {"intellect": 100},
+        "memories": [
+            {"description": f"memory {i}", "emotional_quality": "calm", "clarity": 0.5, "tag": i}
+            for i in range(size)
+        ],
+        "discoveries": [
+            {"name": f"discovery {i}", "category": "artifact", "origin": "benchmark"}
+            for i in range(size)
+        ],
+        "explored_zones": [f"zone-{i}" for i in range(size)],
+        "modifiers": {
+            f"zone-{z}": [{"type": "boost", "effect": "clarity", "magnitude": i} for i in range(100)]
+            for z in range(size // 100)
+        },
+        "checkpoints": [],
+        "max_memories": size,
+        "max_discoveries": size,
+        "max_explored_zones": size,
+        "max_modifiers": size,
+    }
+
+
+@pytest.mark.parametrize("size", [1000, 5000])
+def test_save_state_bulk_throughput(benchmark, tmp_path, size):
+    """Benchmark save_state() on large states and report rows/sec."""
+    db = EternaDatabase(db_path=str(tmp_path / "bench.db"))
+    state = _large_state(size)
+    rows = 1 + 4 * size
+
+    try:
+        state_id = benchmark(db.save_state, state)
+
+        stats = getattr(benchmark, "stats", None)
+        if stats is not None:
+            benchmark.extra_info["rows"] = rows
+            benchmark.extra_info["rows_per_sec"] = rows / stats.stats.mean
+
+        loaded = db.load_latest_state()
+        assert loaded["id"] == state_id
+        assert len(loaded["memories"]) == size
+        assert len(loaded["explored_zones"]) == size
+        assert sum(len(mods) for mods in loaded["modifiers"].values()) == size
+    finally:
+        db.close()
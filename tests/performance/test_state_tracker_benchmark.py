@@ -0,0 +1,84 @@
+"""
+Performance benchmarks for EternaStateTracker.
+
+This module measures appends to the tracker's bounded, indexed collections
+once they are full. Each append evicts the oldest entry, and the per-key
+indexes are updated in constant time, so the cost per append should not grow
+with the capacity.
+"""
+
+import itertools
+
+import pytest
+
+from modules.state_tracker import EternaStateTracker
+
+QUALITIES = ("joy", "grief", "awe", "wonder", "fear")
+CATEGORIES = ("artifact", "natural", "anomaly")
+
+
+def _full_tracker(tmp_path, capacity):
+    """Build a JSON-backed tracker whose memories and discoveries are at capacity."""
+    tracker = EternaStateTracker(
+        save_path=str(tmp_path / "state.json"),
+        max_memories=capacity,
+        max_discoveries=capacity,
+        max_explored_zones=capacity,
+        use_database=False,
+    )
+    for i in range(capacity):
+        tracker.add_memory({"description": f"m{i}", "emotional_quality": QUALITIES[i % len(QUALITIES)]})
+        tracker.record_discovery({"name": f"d{i}", "category": CATEGORIES[i % len(CATEGORIES)]})
+    return tracker
+
+
+@pytest.mark.parametrize("capacity", [1_000, 100_000])
+def test_add_memory_at_capacity(benchmark, tmp_path, capacity):
+    """Benchmark add_memory() on a full tracker; the time should not depend on capacity."""
+    tracker = _full_tracker(tmp_path, capacity)
+    counter = itertools.count()
+
+    def add_memory():
+        i = next(counter)
+        tracker.add_memory({"description": f"new{i}", "emotional_quality": QUALITIES[i % len(QUALITIES)]})
+
+    benchmark(add_memory)
+    benchmark.extra_info["capacity"] = capacity
+
+    # The index still mirrors the ring exactly
+    assert len(tracker.memories) == capacity
+    assert sum(len(bucket) for bucket in tracker._memory_index.values()) == capacity
+
+
+@pytest.mark.parametrize("capacity", [1_000, 100_000])
+def test_record_discovery_at_capacity(benchmark, tmp_path, capacity):
+    """Benchmark record_discovery() on a full tracker."""
+    tracker = _full_tracker(tmp_path, capacity)
+    counter = itertools.count()
+
+    def record_discovery():
+        i = next(counter)
+        tracker.record_discovery({"name": f"new{i}", "category": CATEGORIES[i % len(CATEGORIES)]})
+
+    benchmark(record_discovery)
+    benchmark.extra_info["capacity"] = capacity
+
+    assert len(tracker.discoveries) == capacity
+    assert sum(len(bucket) for bucket in tracker._discovery_index.values()) == capacity
+
+
+@pytest.mark.parametrize("capacity", [1_000, 100_000])
+def test_mark_zone_explored_at_capacity(benchmark, tmp_path, capacity):
+    """Benchmark mark_zone_explored() once the explored-zone ring is full."""
+    tracker = _full_tracker(tmp_path, 1)
+    tracker.max_explored_zones = capacity
+    tracker.explored_zones = type(tracker.explored_zones)(maxlen=capacity)
+    tracker._zone_index = set()
+    for i in range(capacity):
+        tracker.mark_zone_explored(f"zone{i}")
+    counter = itertools.count()
+
+    benchmark(lambda: tracker.mark_zone_explored(f"new{next(counter)}"))
+    benchmark.extra_info["capacity"] = capacity
+
+    assert len(tracker._zone_index) == len(tracker.explored_zones) == capacity
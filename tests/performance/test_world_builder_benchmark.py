@@ -45,6 +45,21 @@ def test_step_performance(benchmark, monkeypatch):
     assert world.eterna.runtime.cycle_count > 0
 
 
+def test_run_steps_performance(benchmark):
+    """Benchmark headless batched stepping with sparse persistence and metrics."""
+    # Build the world
+    world = build_world()
+    start_cycle = world.eterna.runtime.cycle_count
+
+    # Measure the performance of running 100 ticks in one call
+    metrics = benchmark(world.run_steps, 100, persist_every=50, metrics_every=10)
+
+    # Verify that the ticks ran and metrics were sampled every 10 ticks
+    assert world.eterna.runtime.cycle_count >= start_cycle + 100
+    assert len(metrics) == 10
+    assert all("identity_continuity" in m for m in metrics)
+
+
 def test_collect_metrics_performance(benchmark):
     """Benchmark the performance of collecting metrics."""
     # Build the world
@@ -4,13 +4,14 @@ import pytest
 import tempfile
 import json
 import sqlite3
+import threading
 import time
 from unittest.mock import patch, MagicMock
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from modules.database import EternaDatabase
+from modules.database import EternaDatabase, find_full_scans
 from modules.state_tracker import EternaStateTracker
 
 
@@ -192,6 +193,59 @@ class TestEternaDatabase:
 
         db.close()
 
+    def test_queries_use_indexes(self, db_instance, sample_state_data):
+        """Test that no database query falls back to a full table scan."""
+        db_instance.save_state(sample_state_data)
+
+        plans = db_instance.explain_queries()
+
+        assert set(plans) == set(EternaDatabase.QUERIES)
+        assert find_full_scans(plans) == {}
+        assert any("idx_memories_state_timestamp" in step for step in plans["memories"])
+
+    def test_reads_use_per_thread_read_only_connections(self, db_instance, sample_state_data):
+        """Test that reads go through read-only connections and never wait for the writer lock."""
+        db_instance.save_state(sample_state_data)
+
+        reader = db_instance._connections.reader()
+        assert reader is not db_instance.conn
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM state")
+
+        result = {}
+
+        def read_in_thread():
+            result["reader"] = db_instance._connections.reader()
+            result["state"] = db_instance.load_latest_state()
+
+        # Hold the writer lock; the read on another thread must still complete
+        with db_instance._lock:
+            thread = threading.Thread(target=read_in_thread)
+            thread.start()
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+        assert result["reader"] is not reader
+        assert result["state"]["version"] == sample_state_data["version"]
+        assert len(result["state"]["memories"]) == len(sample_state_data["memories"])
+
+    def test_reader_is_closed_when_its_thread_ends(self, db_instance, sample_state_data):
+        """Test that short-lived reader threads do not leak their connections."""
+        db_instance.save_state(sample_state_data)
+        result = {}
+
+        def read_in_thread():
+            result["reader"] = db_instance._connections.reader()
+            db_instance.load_latest_state()
+
+        thread = threading.Thread(target=read_in_thread)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert len(db_instance._connections._readers) == 0
+        with pytest.raises(sqlite3.ProgrammingError):
+            result["reader"].execute("SELECT 1")
+
     def test_save_and_load_state(self, db_instance, sample_state_data):
         """Test saving and loading state data."""
         # Save the state
@@ -247,6 +301,131 @@ class TestEternaDatabase:
         checkpoints = db_instance.lazy_load_collection(lazy_state, "checkpoints")
         assert len(checkpoints) == len(sample_state_data["checkpoints"])
 
+    def test_delta_encoded_saves(self, db_instance, sample_state_data):
+        """Test that partial saves only write changed collections and still load fully."""
+        base_id = db_instance.save_state(sample_state_data)
+
+        # Save a delta that only changes the explored zones and the zone
+        delta_id = db_instance.save_state({
+            "version": 2,
+            "last_intensity": 0.1,
+            "last_dominance": 0.2,
+            "explored_zones": ["Zone D"],
+            "last_zone": "Zone D",
+        })
+
+        # Only the changed collection got child rows under the new state
+        db_instance.cursor.execute("SELECT COUNT(*) FROM memories WHERE state_id = ?", (delta_id,))
+        assert db_instance.cursor.fetchone()[0] == 0
+        db_instance.cursor.execute("SELECT COUNT(*) FROM explored_zones WHERE state_id = ?", (delta_id,))
+        assert db_instance.cursor.fetchone()[0] == 1
+
+        loaded_state = db_instance.load_latest_state()
+        assert loaded_state["id"] == delta_id
+        assert loaded_state["changed_collections"] == ["explored_zones"]
+        assert loaded_state["memories_state_id"] == base_id
+        assert loaded_state["explored_zones"] == ["Zone D"]
+        assert loaded_state["last_zone"] == "Zone D"
+        assert loaded_state["emotion"]["name"] == sample_state_data["emotion"]["name"]
+        assert len(loaded_state["memories"]) == len(sample_state_data["memories"])
+        assert len(loaded_state["checkpoints"]) == len(sample_state_data["checkpoints"])
+
+        # Pointers skip intermediate deltas and lazy loading follows them
+        db_instance.save_state({"version": 3, "last_zone": "Zone E"})
+        lazy_state = db_instance.load_latest_state(lazy_load=True)
+        assert lazy_state["memories_state_id"] == base_id
+        assert lazy_state["explored_zones_state_id"] == delta_id
+        assert db_instance.lazy_load_collection(lazy_state, "explored_zones") == ["Zone D"]
+        assert len(db_instance.lazy_load_collection(lazy_state, "discoveries")) == len(
+            sample_state_data["discoveries"]
+        )
+
+    def test_time_travel_queries(self, db_instance, sample_state_data):
+        """Test loading past states by version/timestamp and streaming a range of them."""
+        base_id = db_instance.save_state(sample_state_data)
+        for version in range(2, 6):
+            db_instance.save_state({"version": version, "evolution": {"intellect": 100 + version, "senses": 100}})
+        db_instance.cursor.execute("UPDATE state SET timestamp = 1000 + version")
+        db_instance.conn.commit()
+
+        assert db_instance.load_state_at(version=3)["evolution"]["intellect"] == 103
+        past = db_instance.load_state_at(timestamp=1004.5)
+        assert past["version"] == 4
+        assert len(past["memories"]) == len(sample_state_data["memories"])
+        assert db_instance.load_state_at(timestamp=999) is None
+        with pytest.raises(ValueError):
+            db_instance.load_state_at()
+
+        history = list(db_instance.iter_state_range(1002, 1005, fields=["evolution", "memories"], batch_size=1))
+        assert [(s["timestamp"], s["evolution"]["intellect"]) for s in history] == [(1002, 102), (1003, 103), (1004, 104)]
+        assert all(len(s["memories"]) == len(sample_state_data["memories"]) for s in history)
+        assert "last_zone" not in history[0]
+
+        # Resuming after a state continues with the next one
+        resumed = db_instance.iter_state_range(fields=["version"], after=(history[-1]["timestamp"], history[-1]["id"]))
+        assert [s["version"] for s in resumed] == [5]
+        assert next(db_instance.iter_state_range(fields=["version"]))["id"] == base_id
+        with pytest.raises(ValueError):
+            list(db_instance.iter_state_range(fields=["nope"]))
+
+        # No read transaction is held between batches, so consumers can read and write mid-stream
+        streamed = []
+        for state in db_instance.iter_state_range(fields=["version"], batch_size=1):
+            streamed.append((state["version"], db_instance.load_state_at(version=state["version"])["version"]))
+            if state["version"] == 5:
+                db_instance.save_state({"version": 6})
+        assert streamed == [(v, v) for v in range(1, 7)]
+
+    def test_ndjson_export_and_import(self, db_instance, sample_state_data, temp_backup_dir, tmp_path):
+        """Test streaming the state history to a gzipped NDJSON dump and importing it."""
+        db_instance.save_state(sample_state_data)
+        db_instance.save_state({"version": 2, "explored_zones": ["Zone D"], "last_zone": "Zone D"})
+        db_instance.save_state({"version": 3, "last_zone": "Zone E"})
+
+        export_path = db_instance.export_to_ndjson(os.path.join(temp_backup_dir, "dump.ndjson.gz"))
+        assert export_path is not None
+
+        from modules.utilities.file_utils import iter_ndjson
+        header, *records = list(iter_ndjson(export_path))
+        assert header["format"] == "eternia-state-ndjson"
+        # The first state carries every collection, later ones only what they changed
+        assert "memories" in records[0]
+        assert "explored_zones" in records[1] and "memories" not in records[1]
+        assert not any(name in records[2] for name in ("memories", "explored_zones"))
+
+        imported = EternaDatabase(db_path=str(tmp_path / "imported.db"))
+        try:
+            assert imported.import_from_ndjson(export_path) == 3
+            fields = ["version", "last_zone", "evolution", "memories", "explored_zones", "checkpoints"]
+            original = list(db_instance.iter_state_range(fields=fields))
+            copied = list(imported.iter_state_range(fields=fields))
+            for state in original + copied:
+                state.pop("id")
+            assert copied == original
+        finally:
+            imported.close()
+
+    def test_incremental_save_after_importing_older_states(self, db_instance, sample_state_data, temp_backup_dir, tmp_path):
+        """Test that live saves build on the latest live state, not on imported history."""
+        history = EternaDatabase(db_path=str(tmp_path / "history.db"))
+        try:
+            history.save_state({"version": 1, "memories": [{"description": "old"}], "last_zone": "Old Zone"}, timestamp=1000)
+            history.save_state({"version": 2, "last_zone": "Older Zone"}, timestamp=1001)
+            export_path = history.export_to_ndjson(os.path.join(temp_backup_dir, "history.ndjson"))
+        finally:
+            history.close()
+
+        db_instance.save_state(sample_state_data)
+        assert db_instance.import_from_ndjson(export_path) == 2
+        db_instance.save_state({"version": 99, "last_intensity": 0.3})
+
+        latest = db_instance.load_latest_state()
+        assert latest["version"] == 99
+        assert latest["last_zone"] == sample_state_data["last_zone"]
+        assert [m["description"] for m in latest["memories"]] == [m["description"] for m in sample_state_data["memories"]]
+        # The imported delta still builds on the imported state before it
+        assert db_instance.load_state_at(timestamp=1001.5)["memories"][0]["description"] == "old"
+
     def test_backup_and_restore(self, db_instance, sample_state_data, temp_backup_dir):
         """Test backup and restore functionality."""
         # Save the state
@@ -469,6 +648,22 @@ class TestEternaStateTrackerWithDatabase:
         # Verify the restoration
         assert new_tracker.last_zone == sample_state_data["last_zone"]
 
+    def test_ndjson_round_trip_between_persistence_modes(
+        self, state_tracker_with_db, state_tracker_with_json, sample_state_data, temp_backup_dir
+    ):
+        """Test that a JSON-mode NDJSON export imports into a database-backed tracker."""
+        for memory in sample_state_data["memories"]:
+            state_tracker_with_json.add_memory(memory)
+        state_tracker_with_json.mark_zone_explored("Zone A")
+
+        export_path = state_tracker_with_json.export_to_ndjson(os.path.join(temp_backup_dir, "state.ndjson"))
+        assert export_path is not None
+
+        assert state_tracker_with_db.import_from_ndjson(export_path)
+        state_tracker_with_db._ensure_collection_loaded("memories")
+        assert len(state_tracker_with_db.memories) == len(sample_state_data["memories"])
+        assert state_tracker_with_db.db.load_latest_state()["explored_zones"] == ["Zone A"]
+
     def test_switching_persistence_modes(self, state_tracker_with_db, state_tracker_with_json, sample_state_data):
         """Test switching between database and JSON persistence."""
         # Set up the database tracker with sample data
@@ -520,6 +715,90 @@ class TestEternaStateTrackerWithDatabase:
         # Check that the modification was imported
         assert new_db_tracker.last_zone == "JSON Modified Zone"
 
+    def test_incremental_save_writes_only_mutated_collections(self, state_tracker_with_db, sample_state_data):
+        """Test that incremental saves detect changes through mutation counters."""
+        tracker = state_tracker_with_db
+        for memory in sample_state_data["memories"]:
+            tracker.add_memory(memory)
+        tracker.save(incremental=False)
+
+        # Nothing changed: no collection is rewritten
+        tracker.save()
+        assert tracker.db.load_latest_state(lazy_load=True)["changed_collections"] == []
+
+        tracker.record_discovery(sample_state_data["discoveries"][0])
+        tracker.update_evolution(130, 115)
+        tracker.save()
+        latest = tracker.db.load_latest_state()
+        assert latest["changed_collections"] == ["discoveries"]
+        assert latest["evolution"]["intellect"] == 130
+        assert len(latest["memories"]) == len(sample_state_data["memories"])
+
+        # Replacing a collection object counts as a change too
+        tracker.explored_zones = type(tracker.explored_zones)(["Zone X"], maxlen=tracker.max_explored_zones)
+        tracker.save()
+        assert tracker.db.load_latest_state(lazy_load=True)["changed_collections"] == ["explored_zones"]
+
+    def test_async_persistence_coalesces_saves(self, temp_db_path, temp_json_path, sample_state_data):
+        """Test that async persistence merges saves and flush() writes the latest state."""
+        tracker = EternaStateTracker(
+            save_path=temp_json_path,
+            db_path=temp_db_path,
+            use_database=True,
+            use_lazy_loading=False,
+            async_persistence=True,
+            flush_interval_ms=60_000,
+            flush_every_ticks=50,
+        )
+        tracker.initialize()
+        try:
+            tracker.db.cursor.execute("SELECT COUNT(*) FROM state")
+            rows_before = tracker.db.cursor.fetchone()[0]
+
+            for i, memory in enumerate(sample_state_data["memories"] * 10):
+                tracker.add_memory(dict(memory, description=f"memory {i}"))
+                tracker.last_zone = f"Zone {i}"
+                tracker.save()
+
+            # Nothing is written until the tick budget or a flush is reached
+            assert tracker.flush(timeout=10)
+
+            tracker.db.cursor.execute("SELECT COUNT(*) FROM state")
+            assert tracker.db.cursor.fetchone()[0] == rows_before + 1
+
+            loaded = tracker.db.load_latest_state()
+            assert loaded["last_zone"] == "Zone 19"
+            assert len(loaded["memories"]) == 20
+        finally:
+            tracker.shutdown()
+
+    def test_async_persistence_flushes_on_interval_without_saves(self, temp_db_path, temp_json_path):
+        """Test that dirty state is written on the flush interval once saves stop."""
+        tracker = EternaStateTracker(
+            save_path=temp_json_path,
+            db_path=temp_db_path,
+            use_database=True,
+            use_lazy_loading=False,
+            async_persistence=True,
+            flush_interval_ms=50,
+            flush_every_ticks=1000,
+        )
+        tracker.initialize()
+        dispatched = []
+        tracker.set_flush_dispatcher(lambda fn: dispatched.append(fn) or fn())
+        try:
+            # A mutation from the API, with no tick calling save() afterwards
+            tracker.add_memory({"description": "late", "emotional_quality": "calm"})
+
+            deadline = time.monotonic() + 10
+            while tracker._writer.writes == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert dispatched
+            assert tracker.flush(timeout=10)
+            assert tracker.db.load_latest_state()["memories"][-1]["description"] == "late"
+        finally:
+            tracker.shutdown()
+
 
 if __name__ == "__main__":
     pytest.main(["-v", "test_database.py"])
@@ -6,6 +6,7 @@ This script tests the file utility functions in file_utils.py.
 
 import sys
 import os
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 from pathlib import Path
@@ -19,6 +20,8 @@ from modules.utilities.file_utils import (
     safe_write_file,
     load_json,
     save_json,
+    write_ndjson,
+    iter_ndjson,
     load_yaml,
     save_yaml,
     load_pickle,
@@ -347,5 +350,24 @@ class TestFileUtils(unittest.TestCase):
         result = get_file_extension("test")
         self.assertEqual(result, "")
 
+    def test_ndjson_round_trip(self):
+        """Test write_ndjson/iter_ndjson with plain and gzip-compressed files."""
+        records = [{"type": "header"}, {"id": 1, "values": [1, 2]}, {"id": 2, "text": "é"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("dump.ndjson", "dump.ndjson.gz"):
+                path = os.path.join(tmp, "nested", name)
+                # A generator is consumed lazily
+                count = write_ndjson(path, (record for record in records))
+                self.assertEqual(count, 3)
+                self.assertEqual(list(iter_ndjson(path)), records)
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(2) == b"\x1f\x8b", name.endswith(".gz"))
+
+            # A failed write leaves no partial file behind
+            path = os.path.join(tmp, "bad.ndjson")
+            with self.assertRaises(TypeError):
+                write_ndjson(path, [{"ok": 1}, {"bad": object()}])
+            self.assertEqual(sorted(os.listdir(tmp)), ["nested"])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
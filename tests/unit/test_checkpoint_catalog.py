@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from modules.checkpoint_catalog import KIND_DIFFERENTIAL, KIND_FULL, CheckpointCatalog
+from modules.checkpoint_format import container_checksum
+from modules.checkpoint_writer import write_checkpoint_file
+
+
+def _write(catalog, name, base=None, state_version=None):
+    data = {"state_tracker_data": {"last_zone": name}, "state_version": state_version}
+    if base is not None:
+        data["base"] = {"name": base, "tracker": {}}
+    return write_checkpoint_file(catalog.directory / name, data, catalog=catalog)
+
+
+def test_write_records_checkpoint(tmp_path):
+    catalog = CheckpointCatalog(tmp_path)
+    size = _write(catalog, "ckpt_1.bin", state_version=7)
+    _write(catalog, "ckpt_2.bin", base="ckpt_1.bin", state_version=8)
+
+    full = catalog.get("ckpt_1.bin")
+    assert full.size == size == (tmp_path / "ckpt_1.bin").stat().st_size
+    assert full.checksum == container_checksum(tmp_path / "ckpt_1.bin")
+    assert (full.kind, full.parent, full.state_version) == (KIND_FULL, None, 7)
+    latest = catalog.latest()
+    assert (latest.name, latest.kind, latest.parent) == ("ckpt_2.bin", KIND_DIFFERENTIAL, "ckpt_1.bin")
+    assert [entry.name for entry in catalog.entries(limit=1)] == ["ckpt_2.bin"]
+
+
+def test_failed_rename_rolls_back_the_row(tmp_path, monkeypatch):
+    catalog = CheckpointCatalog(tmp_path)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("modules.checkpoint_writer.os.replace", fail)
+    with pytest.raises(OSError):
+        _write(catalog, "ckpt_1.bin")
+
+    assert catalog.get("ckpt_1.bin") is None and len(catalog) == 0
+
+
+def test_prune_keeps_bases_of_kept_checkpoints(tmp_path):
+    catalog = CheckpointCatalog(tmp_path)
+    _write(catalog, "ckpt_0.bin")
+    _write(catalog, "ckpt_1.bin")
+    for i in range(2, 5):
+        _write(catalog, f"ckpt_{i}.bin", base="ckpt_1.bin")
+
+    removed = catalog.prune(keep=2)
+
+    assert [path.name for path in removed] == ["ckpt_0.bin", "ckpt_2.bin"]
+    assert [entry.name for entry in catalog.entries()] == ["ckpt_1.bin", "ckpt_3.bin", "ckpt_4.bin"]
+    assert sorted(path.name for path in tmp_path.glob("ckpt_*")) == ["ckpt_1.bin", "ckpt_3.bin", "ckpt_4.bin"]
+
+
+def test_reconciles_with_directory_when_opened(tmp_path):
+    catalog = CheckpointCatalog(tmp_path)
+    _write(catalog, "ckpt_1.bin", state_version=3)
+    _write(catalog, "ckpt_2.bin")
+    catalog.close()
+    # A file renamed into place without its row, and a row without its file
+    write_checkpoint_file(tmp_path / "ckpt_3.bin",
+                          {"state_tracker_data": {}, "state_version": 5, "base": {"name": "ckpt_1.bin", "tracker": {}}})
+    (tmp_path / "ckpt_2.bin").unlink()
+
+    reopened = CheckpointCatalog(tmp_path)
+
+    assert [entry.name for entry in reopened.entries()] == ["ckpt_1.bin", "ckpt_3.bin"]
+    added = reopened.get("ckpt_3.bin")
+    assert (added.parent, added.state_version) == ("ckpt_1.bin", 5)
+    assert reopened.reconcile() == (0, 0)
+
+
+def test_missing_directory_is_not_created_by_reads(tmp_path):
+    catalog = CheckpointCatalog(tmp_path / "absent")
+
+    assert catalog.latest() is None and catalog.entries() == []
+    assert not (tmp_path / "absent").exists()
+
+
+def test_governor_uses_catalog_for_latest_and_pruning(tmp_path, make_governor):
+    governor = make_governor()
+    governor.state_tracker._state_version = 2
+    governor.MAX_CKPTS = 2
+    governor.FULL_CHECKPOINT_EVERY = 10
+
+    for _ in range(4):
+        assert governor._save_checkpoint()
+        governor.flush_checkpoints(2.0)
+        time.sleep(0.002)  # distinct millisecond file names
+
+    entries = governor.checkpoint_catalog.entries()
+    # The first checkpoint is the base of the two kept ones
+    assert [entry.kind for entry in entries] == [KIND_FULL, KIND_DIFFERENTIAL, KIND_DIFFERENTIAL]
+    assert entries[1].parent == entries[0].name and entries[-1].state_version == 2
+    assert governor._latest_checkpoint() == entries[-1].path
+    assert sorted(p.name for p in tmp_path.glob("ckpt_*.bin")) == [entry.name for entry in entries]
@@ -0,0 +1,74 @@
+import pytest
+import torch
+
+from modules.checkpoint_format import MAGIC, CheckpointFormatError, read_container, write_container
+from modules.state_records import MemoryRecord
+
+
+def _tensors():
+    return {
+        "fc.weight": torch.randn(32, 16),
+        "fc.bias": torch.randn(32),
+        "steps": torch.tensor(12, dtype=torch.int64),
+        "half": torch.randn(5, dtype=torch.bfloat16),
+        "empty": torch.zeros(0, 4),
+    }
+
+
+def _write(path, sections, **kwargs):
+    with open(path, "wb") as f:
+        return write_container(f, sections, **kwargs)
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "lzma"])
+def test_sections_round_trip(tmp_path, codec):
+    path = tmp_path / "ckpt.bin"
+    tensors = _tensors()
+    tracker = {"memories": [MemoryRecord({"description": "m", "clarity": 0.5})], "last_zone": "Forest"}
+
+    size = _write(path, {"tracker": tracker, "policy": tensors, "runtime": {"cycle_count": 3}}, default_codec=codec)
+
+    assert path.stat().st_size == size
+    sections = read_container(path)
+    assert sections["tracker"] == {"memories": [{"description": "m", "clarity": 0.5}], "last_zone": "Forest"}
+    assert sections["runtime"] == {"cycle_count": 3}
+    assert list(sections["policy"]) == list(tensors)
+    for name, tensor in tensors.items():
+        assert sections["policy"][name].dtype == tensor.dtype
+        assert torch.equal(sections["policy"][name], tensor)
+
+
+def test_uncompressed_tensors_are_memory_mapped(tmp_path):
+    path = tmp_path / "ckpt.bin"
+    _write(path, {"policy": _tensors()}, default_codec="none")
+
+    policy = read_container(path)["policy"]
+    loaded = policy["fc.weight"]
+    # Tensors are views at their offsets in the one mapping, not copies
+    assert policy["fc.bias"].data_ptr() - loaded.data_ptr() == loaded.numel() * loaded.element_size()
+
+    # Writing to a copy-on-write view must not change the file
+    loaded.zero_()
+    assert not torch.equal(read_container(path)["policy"]["fc.weight"], loaded)
+
+
+def test_corrupt_section_is_detected(tmp_path):
+    path = tmp_path / "ckpt.bin"
+    _write(path, {"tracker": {"last_zone": "Forest"}}, default_codec="none")
+    data = bytearray(path.read_bytes())
+    data[data.index(b"Forest")] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(CheckpointFormatError, match="Checksum"):
+        read_container(path)
+
+
+def test_rejects_files_that_are_not_containers(tmp_path):
+    path = tmp_path / "ckpt.bin"
+    path.write_bytes(b"\x80\x04not a container")
+    with pytest.raises(CheckpointFormatError):
+        read_container(path)
+
+    path.write_bytes(MAGIC)
+    with pytest.raises(CheckpointFormatError):
+        read_container(path)
@@ -0,0 +1,221 @@
+import pickle
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import torch
+
+from modules.checkpoint_format import MAGIC, CheckpointFormatError
+from modules.checkpoint_writer import (
+    BackgroundCheckpointWriter,
+    checkpoint_base,
+    prune_checkpoints,
+    read_checkpoint_file,
+    write_checkpoint_file,
+)
+from modules.state_records import MemoryRecord
+
+
+def _blocking_writer():
+    release = threading.Event()
+    written = []
+
+    def write(path, data):
+        release.wait(2.0)
+        written.append((path, data))
+        return 1
+
+    return BackgroundCheckpointWriter(write), release, written
+
+
+def test_checkpoint_file_is_a_container_written_atomically(tmp_path):
+    path = tmp_path / "ckpt_1.bin"
+    data = {
+        "state_tracker_data": {"memories": [{"description": "m"}] * 100, "last_zone": "Forest"},
+        "companion_trainer_weights": {"policy": {"w": torch.arange(6.0).reshape(2, 3)}},
+        "cycle_count": 7,
+    }
+
+    size = write_checkpoint_file(path, data)
+
+    assert path.stat().st_size == size
+    assert path.read_bytes()[:8] == MAGIC
+    assert not (tmp_path / "ckpt_1.bin.tmp").exists()
+    loaded = read_checkpoint_file(path, allow_pickle=False)
+    assert loaded["state_tracker_data"] == data["state_tracker_data"]
+    assert loaded["cycle_count"] == 7
+    assert torch.equal(loaded["companion_trainer_weights"]["policy"]["w"], data["companion_trainer_weights"]["policy"]["w"])
+
+
+def test_legacy_pickle_checkpoints_load_only_when_trusted(tmp_path):
+    path = tmp_path / "ckpt_0.bin"
+    path.write_bytes(pickle.dumps({"cycle_count": 3}))
+
+    assert read_checkpoint_file(path) == {"cycle_count": 3}
+    with pytest.raises(CheckpointFormatError):
+        read_checkpoint_file(path, allow_pickle=False)
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path):
+    path = tmp_path / "ckpt_2.bin"
+
+    with pytest.raises(CheckpointFormatError):
+        write_checkpoint_file(path, {"state_tracker_data": {}}, codecs={"tracker": "brotli"})
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_writer_rejects_submits_while_busy():
+    writer, release, written = _blocking_writer()
+    try:
+        assert writer.submit("a.bin", {"n": 1}, {"kind": "auto"})
+        assert writer.busy
+        assert not writer.submit("b.bin", {"n": 2})
+        assert writer.rejected == 1
+
+        release.set()
+        assert writer.flush(2.0)
+        done = writer.completed()
+    finally:
+        writer.close(2.0)
+
+    assert [str(path) for path, _ in written] == ["a.bin"]
+    assert len(done) == 1 and done[0].ok and done[0].metadata == {"kind": "auto"}
+    assert writer.completed() == []
+
+
+def test_writer_reports_failures():
+    def write(path, data):
+        raise OSError("disk full")
+
+    writer = BackgroundCheckpointWriter(write)
+    try:
+        writer.submit("a.bin", {})
+        writer.flush(2.0)
+        (done,) = writer.completed()
+    finally:
+        writer.close(2.0)
+
+    assert not done.ok and isinstance(done.error, OSError)
+    assert writer.failures == 1
+
+
+def test_governor_defers_checkpoint_and_registers_on_tick_thread(make_governor):
+    governor = make_governor(save_interval=1)
+    world, tracker = governor.world, governor.state_tracker
+    tracker._state_version = 4
+    governor._checkpoint_writer.close()
+    writer, release, written = _blocking_writer()
+    governor._checkpoint_writer = writer
+
+    try:
+        assert governor.tick({"identity_continuity": 1.0})
+        assert governor._tick_counter == 0
+        # The first checkpoint is still being written, so this one is deferred
+        assert governor.tick({"identity_continuity": 1.0})
+        assert governor._tick_counter == 1
+        assert world.capture_checkpoint.call_count == 1
+        tracker.register_checkpoint.assert_not_called()
+    finally:
+        release.set()
+    assert governor.flush_checkpoints(2.0)
+
+    tracker.register_checkpoint.assert_called_once()
+    record = tracker.register_checkpoint.call_args.args[0]
+    assert record["kind"] == "auto" and record["state_version"] == 4
+    assert record["path"] == str(written[0][0])
+    world.save_checkpoint.assert_not_called()
+
+
+def _tracker_data(memories):
+    return {"memories": memories, "explored_zones": ["Forest"], "last_zone": "Forest"}
+
+
+def test_differential_checkpoint_stores_only_changes(tmp_path):
+    memories = [MemoryRecord({"description": f"m{i}", "clarity": 0.5}) for i in range(500)]
+    weights = {"w": torch.randn(64, 64), "b": torch.randn(64)}
+    base = {
+        "state_tracker_data": _tracker_data(memories),
+        "companion_trainer_weights": {"policy": weights},
+        "cycle_count": 1,
+    }
+    base_size = write_checkpoint_file(tmp_path / "ckpt_1.bin", base)
+
+    # The ring evicted two memories and gained two; only "b" was trained
+    current = memories[2:] + [MemoryRecord({"description": "new1"}), MemoryRecord({"description": "new2"})]
+    new_bias = torch.randn(64)
+    delta = {
+        "state_tracker_data": {"memories": current, "last_zone": "Lake"},
+        "companion_trainer_weights": {"policy": {"b": new_bias}},
+        "cycle_count": 2,
+        "base": {"name": "ckpt_1.bin", "tracker": base["state_tracker_data"]},
+    }
+    delta_size = write_checkpoint_file(tmp_path / "ckpt_2.bin", delta)
+
+    assert delta_size * 10 < base_size
+    assert checkpoint_base(tmp_path / "ckpt_2.bin") == "ckpt_1.bin"
+    assert checkpoint_base(tmp_path / "ckpt_1.bin") is None
+    loaded = read_checkpoint_file(tmp_path / "ckpt_2.bin", allow_pickle=False)
+    assert loaded["state_tracker_data"] == {"memories": current, "explored_zones": ["Forest"], "last_zone": "Lake"}
+    assert loaded["cycle_count"] == 2
+    policy = loaded["companion_trainer_weights"]["policy"]
+    assert torch.equal(policy["w"], weights["w"]) and torch.equal(policy["b"], new_bias)
+
+
+def test_differential_checkpoint_needs_its_base(tmp_path):
+    write_checkpoint_file(tmp_path / "ckpt_1.bin", {"state_tracker_data": _tracker_data([])})
+    write_checkpoint_file(tmp_path / "ckpt_2.bin", {
+        "state_tracker_data": {"last_zone": "Lake"},
+        "base": {"name": "ckpt_1.bin", "tracker": _tracker_data([])},
+    })
+    (tmp_path / "ckpt_1.bin").unlink()
+
+    with pytest.raises(CheckpointFormatError, match="missing"):
+        read_checkpoint_file(tmp_path / "ckpt_2.bin")
+
+
+def test_prune_keeps_bases_of_kept_checkpoints(tmp_path):
+    base = {"name": "ckpt_1.bin", "tracker": {}}
+    write_checkpoint_file(tmp_path / "ckpt_0.bin", {"state_tracker_data": {}})
+    write_checkpoint_file(tmp_path / "ckpt_1.bin", {"state_tracker_data": {}})
+    for i in range(2, 5):
+        write_checkpoint_file(tmp_path / f"ckpt_{i}.bin", {"state_tracker_data": {}, "base": base})
+
+    removed = prune_checkpoints(tmp_path, keep=2)
+
+    assert [path.name for path in removed] == ["ckpt_0.bin", "ckpt_2.bin"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["ckpt_1.bin", "ckpt_3.bin", "ckpt_4.bin"]
+
+
+def test_governor_writes_a_full_base_every_k_checkpoints(make_governor):
+    governor = make_governor()
+    world, tracker = governor.world, governor.state_tracker
+    governor.FULL_CHECKPOINT_EVERY = 3
+
+    bases = []
+    for _ in range(5):
+        assert governor._save_checkpoint()
+        governor.flush_checkpoints(2.0)
+        bases.append(tracker.register_checkpoint.call_args.args[0]["base"])
+        time.sleep(0.002)  # distinct millisecond file names
+
+    assert bases[0] is None and bases[3] is None
+    assert bases[1] == bases[2] == Path(tracker.register_checkpoint.call_args_list[0].args[0]["path"]).name
+    assert [call.kwargs for call in world.capture_checkpoint.call_args_list][1]["since"] == {"tracker": {}, "policy": {}}
+
+
+def test_tracker_versions_change_when_a_collection_is_replaced(tmp_path):
+    from collections import deque
+    from modules.state_tracker import EternaStateTracker
+
+    tracker = EternaStateTracker(save_path=str(tmp_path / "state.json"), use_database=False)
+    before = tracker.collection_versions()
+    assert tracker.collection_versions() == before
+
+    # Replaced without a tracked mutation, e.g. by lazy loading or a restore
+    tracker.memories = deque([{"description": "loaded"}], maxlen=tracker.max_memories)
+    after = tracker.collection_versions()
+
+    assert after["memories"] != before["memories"]
+    assert after["discoveries"] == before["discoveries"]
@@ -0,0 +1,106 @@
+import gzip
+import json
+import time
+from unittest.mock import MagicMock
+
+from modules.governor_journal import GovernorJournal, tail_journal
+
+
+def _event(i):
+    return {"t": float(i), "event": "tick", "payload": {"i": i}}
+
+
+def test_events_are_buffered_until_flushed(tmp_path):
+    path = tmp_path / "governor_log.jsonl"
+    journal = GovernorJournal(path, flush_interval=60.0)
+    try:
+        journal.append(_event(1))
+        journal.append(_event(2))
+        assert not path.exists()
+
+        journal.flush()
+        assert [json.loads(line)["payload"]["i"] for line in path.read_text().splitlines()] == [1, 2]
+    finally:
+        journal.close()
+
+
+def test_size_threshold_triggers_a_flush(tmp_path):
+    path = tmp_path / "governor_log.jsonl"
+    journal = GovernorJournal(path, flush_interval=60.0, flush_bytes=1)
+    try:
+        journal.append(_event(1))
+        deadline = time.monotonic() + 2.0
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.read_text().count("\n") == 1
+    finally:
+        journal.close()
+
+
+def test_rotation_compresses_old_segments_and_tail_spans_them(tmp_path):
+    path = tmp_path / "governor_log.jsonl"
+    journal = GovernorJournal(path, max_bytes=200, backups=2, flush_interval=60.0)
+    try:
+        for i in range(12):
+            journal.append(_event(i))
+            journal.flush()
+
+        assert (tmp_path / "governor_log.jsonl.1.gz").exists()
+        assert (tmp_path / "governor_log.jsonl.2.gz").exists()
+        assert not (tmp_path / "governor_log.jsonl.3.gz").exists()
+        with gzip.open(tmp_path / "governor_log.jsonl.1.gz", "rt") as f:
+            assert all(json.loads(line)["event"] == "tick" for line in f)
+
+        journal.append(_event(12))
+        tail = journal.tail(5)
+        assert [event["payload"]["i"] for event in tail] == [8, 9, 10, 11, 12]
+    finally:
+        journal.close()
+
+
+def test_tail_reads_backwards_and_skips_torn_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr("modules.governor_journal._TAIL_BLOCK", 16)
+    path = tmp_path / "governor_log.jsonl"
+    lines = [json.dumps(_event(i)) for i in range(20)]
+    path.write_text("\n".join(lines) + '\n{"t": 20, "ev')
+
+    assert [event["payload"]["i"] for event in tail_journal(path, 3)] == [17, 18, 19]
+    assert len(tail_journal(path, 100)) == 20
+    assert tail_journal(tmp_path / "missing.jsonl", 3) == []
+
+
+def test_governor_logs_events_through_the_journal(make_governor):
+    governor = make_governor()
+    governor.pause()
+    governor.resume()
+
+    assert [event["event"] for event in governor.journal.tail(10)] == ["pause", "resume"]
+
+
+def test_tail_returns_buffered_events_without_flushing(tmp_path, monkeypatch):
+    path = tmp_path / "governor_log.jsonl"
+    journal = GovernorJournal(path, flush_interval=60.0)
+    try:
+        journal.append(_event(1))
+        journal.flush()
+        journal.append(_event(2))
+        journal.append(_event(3))
+        monkeypatch.setattr(journal, "flush", MagicMock(side_effect=AssertionError("tail flushed")))
+
+        assert [event["payload"]["i"] for event in journal.tail(2)] == [2, 3]
+        assert [event["payload"]["i"] for event in journal.tail(10)] == [1, 2, 3]
+        assert path.read_text().count("\n") == 1
+    finally:
+        monkeypatch.undo()
+        journal.close()
+
+
+def test_governor_keeps_working_after_close(make_governor):
+    governor = make_governor()
+    governor.pause()
+    governor.close(2.0)
+
+    governor.resume()
+    governor.shutdown("after close")
+    assert governor._save_checkpoint() is False
+    assert [event["event"] for event in governor.journal.tail(10)] == ["pause"]
@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from prometheus_client import REGISTRY
+
+
+def _transitions(state):
+    return REGISTRY.get_sample_value("governor_state_transitions_total", {"state": state}) or 0.0
+
+
+def test_listeners_only_see_transitions(make_governor):
+    governor = make_governor()
+    seen = []
+    governor.add_run_state_listener(lambda shutdown, paused: seen.append((shutdown, paused)))
+    paused_before, running_before = _transitions("paused"), _transitions("running")
+    governor.pause()
+    governor.pause()
+    governor.resume()
+    assert not governor.set_run_state(shutdown=False, paused=False)
+    governor.shutdown("test")
+    assert governor.set_run_state(shutdown=False)
+
+    assert seen == [(False, True), (False, False), (True, False), (False, False)]
+    assert _transitions("paused") == paused_before + 1
+    assert _transitions("running") == running_before + 2
+
+
+def test_failing_listener_does_not_block_the_transition(make_governor):
+    governor = make_governor()
+    governor.add_run_state_listener(MagicMock(side_effect=OSError("read-only")))
+    governor.pause()
+
+    assert governor.is_paused()
@@ -0,0 +1,96 @@
+import random
+import statistics
+from unittest.mock import MagicMock
+
+import pytest
+
+from modules.metric_stats import EWMA, MetricStatistics, P2Quantile, RollingWindow
+
+
+def test_ewma_starts_at_first_sample():
+    ewma = EWMA(alpha=0.5)
+    assert ewma.value is None
+
+    ewma.update(1.0)
+    ewma.update(0.0)
+
+    assert ewma.value == 0.5
+    with pytest.raises(ValueError):
+        EWMA(alpha=0.0)
+
+
+def test_rolling_window_matches_exact_statistics():
+    rng = random.Random(1)
+    samples = [rng.gauss(0.9, 0.05) for _ in range(500)]
+    window = RollingWindow(size=50)
+    for x in samples:
+        window.update(x)
+
+    assert window.count == 50
+    assert window.mean == pytest.approx(statistics.fmean(samples[-50:]))
+    assert window.variance == pytest.approx(statistics.variance(samples[-50:]))
+
+
+@pytest.mark.parametrize("q", [0.05, 0.5, 0.95])
+def test_p2_quantile_tracks_the_exact_quantile(q):
+    rng = random.Random(2)
+    samples = [rng.random() for _ in range(5000)]
+    estimator = P2Quantile(q)
+    for x in samples:
+        estimator.update(x)
+
+    exact = sorted(samples)[int(q * len(samples))]
+    assert estimator.value == pytest.approx(exact, abs=0.02)
+
+
+def test_p2_quantile_is_exact_for_few_samples():
+    estimator = P2Quantile(0.5)
+    for x in (3.0, 1.0, 2.0):
+        estimator.update(x)
+
+    assert estimator.value == 2.0
+
+
+def test_statistics_track_numeric_metrics_only():
+    stats = MetricStatistics(window=3)
+    for value in (1.0, 2.0, 3.0, 4.0):
+        stats.update({"identity_continuity": value, "zone": "Forest", "flag": True})
+
+    assert list(stats) == ["identity_continuity"]
+    series = stats["identity_continuity"]
+    assert (series.last, series.count, series.mean) == (4.0, 3, 3.0)
+    assert stats.to_dict()["identity_continuity"]["quantiles"]["0.5"] == series.quantile(0.5)
+
+
+@pytest.fixture
+def governor_factory(make_governor):
+    def make(**kwargs):
+        governor = make_governor(save_interval=10_000, **kwargs)
+        governor.rollback = MagicMock()
+        return governor
+
+    return make
+
+
+def test_trend_mode_ignores_a_single_low_sample(governor_factory):
+    governor = governor_factory(continuity_trend=True)
+    for _ in range(10):
+        assert governor.tick({"identity_continuity": 1.0})
+    assert governor.tick({"identity_continuity": 0.5})
+    governor.rollback.assert_not_called()
+
+    while governor.tick({"identity_continuity": 0.5}):
+        pass
+    governor.rollback.assert_called_once()
+
+
+def test_policies_can_read_statistics(governor_factory):
+    governor = governor_factory()
+    seen = []
+    governor.register_policy(lambda metrics, stats: seen.append(stats["identity_continuity"].count) or True,
+                             with_stats=True)
+    for _ in range(6):
+        assert governor.tick({"identity_continuity": 0.95})
+
+    # Policies run every 5 ticks, but the statistics saw every tick
+    assert seen == [1, 6]
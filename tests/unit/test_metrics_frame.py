@@ -0,0 +1,42 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from modules.world_snapshot import MetricsFrame
+from world_builder_modules.eterna_world import EternaWorld
+
+
+def _world(cycle=1):
+    tracker = MagicMock()
+    tracker.identity_continuity.side_effect = [0.9, 0.8, 0.7]
+    return SimpleNamespace(
+        eterna=SimpleNamespace(runtime=SimpleNamespace(cycle_count=cycle)),
+        state_tracker=tracker,
+        _metrics_frame=None,
+    )
+
+
+def test_frame_is_read_only_but_serializes_as_a_dict():
+    frame = MetricsFrame(3, {"identity_continuity": 0.9})
+
+    with pytest.raises(TypeError):
+        frame["identity_continuity"] = 0.1
+    with pytest.raises(TypeError):
+        frame.update(extra=1)
+    assert json.loads(json.dumps(frame)) == {"identity_continuity": 0.9}
+    assert {**frame, "cycle": frame.cycle} == {"identity_continuity": 0.9, "cycle": 3}
+
+
+def test_metrics_are_computed_once_per_cycle():
+    world = _world()
+
+    first = EternaWorld.collect_metrics(world)
+    again = EternaWorld.collect_metrics(world)
+    world.eterna.runtime.cycle_count += 1
+    next_cycle = EternaWorld.collect_metrics(world)
+
+    assert again is first and first["identity_continuity"] == 0.9 and first.cycle == 1
+    assert next_cycle["identity_continuity"] == 0.8 and next_cycle.cycle == 2
+    assert world.state_tracker.identity_continuity.call_count == 2
@@ -0,0 +1,58 @@
+from modules.query_cache import QueryCache
+from modules.state_tracker import EternaStateTracker
+
+
+def test_cache_hits_until_generation_changes():
+    lookups = []
+    cache = QueryCache(maxsize=4, on_lookup=lambda collection, hit: lookups.append((collection, hit)))
+    source = []
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get("memories", "joy", source, 0, compute) == 1
+    assert cache.get("memories", "joy", source, 0, compute) == 1
+    # A new generation or a replaced source invalidates the entry
+    assert cache.get("memories", "joy", source, 1, compute) == 2
+    assert cache.get("memories", "joy", [], 1, compute) == 3
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert lookups == [("memories", False), ("memories", True), ("memories", False), ("memories", False)]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QueryCache(maxsize=2)
+    source = object()
+    cache.get("c", "a", source, 0, lambda: "a")
+    cache.get("c", "b", source, 0, lambda: "b")
+    cache.get("c", "a", source, 0, lambda: "stale")  # refreshes "a"
+    cache.get("c", "c", source, 0, lambda: "c")      # evicts "b"
+
+    assert len(cache) == 2
+    assert cache.get("c", "a", source, 0, lambda: "recomputed") == "a"
+    assert cache.get("c", "b", source, 0, lambda: "recomputed") == "recomputed"
+
+
+def test_tracker_queries_see_new_modifiers(tmp_path):
+    tracker = EternaStateTracker(save_path=str(tmp_path / "state.json"), use_database=False)
+    tracker.add_modifier("Zone A", {"type": "boost", "effect": "calm"})
+    assert len(tracker.get_modifiers_by_type("boost")) == 1
+    assert len(tracker.get_modifiers_by_zone("Zone A")) == 1
+
+    tracker.add_modifier("Zone A", {"type": "boost", "effect": "focus"})
+
+    assert len(tracker.get_modifiers_by_type("boost")) == 2
+    assert len(tracker.get_modifiers_by_zone("Zone A")) == 2
+
+
+def test_mutating_a_result_does_not_corrupt_the_cache(tmp_path):
+    tracker = EternaStateTracker(save_path=str(tmp_path / "state.json"), use_database=False)
+    tracker.add_memory({"description": "a", "emotional_quality": "joy"})
+
+    tracker.get_memories_by_emotion("joy").append("junk")
+    tracker.get_memories_by_emotion("joy").clear()
+
+    assert tracker.get_memories_by_emotion("joy") == [{"description": "a", "emotional_quality": "joy"}]
+    assert tracker._query_cache.hits == 2
@@ -0,0 +1,100 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from modules.simulation_host import SimulationHost
+
+
+def _make_world():
+    world = MagicMock()
+    world.eterna = SimpleNamespace(runtime=SimpleNamespace(cycle_count=0))
+    world.collect_metrics.return_value = {"identity_continuity": 1.0}
+    return world
+
+
+def _make_governor():
+    governor = MagicMock()
+    governor.is_shutdown.return_value = False
+    governor.is_paused.return_value = False
+    governor.tick.return_value = True
+    return governor
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_host_steps_world_on_its_own_thread():
+    world = _make_world()
+    step_threads = []
+
+    def step():
+        # EternaWorld.step() advances the runtime cycle
+        world.eterna.runtime.cycle_count += 1
+        step_threads.append(threading.current_thread())
+
+    world.step.side_effect = step
+    host = SimulationHost(world, _make_governor())
+
+    host.start()
+    try:
+        assert _wait_for(lambda: world.eterna.runtime.cycle_count >= 3)
+    finally:
+        host.stop()
+
+    assert not host.is_running()
+    assert threading.current_thread() not in step_threads
+
+
+def test_commands_run_between_ticks_on_simulation_thread():
+    world = _make_world()
+    host = SimulationHost(world, _make_governor())
+
+    host.start()
+    try:
+        result = host.submit(lambda: threading.current_thread().name).result(timeout=2.0)
+    finally:
+        host.stop()
+
+    assert result == "simulation-host"
+
+
+def test_submit_runs_inline_when_host_is_stopped():
+    host = SimulationHost(_make_world(), _make_governor())
+    assert host.submit(lambda x: x * 2, 21).result(timeout=0) == 42
+
+
+
+def test_post_never_runs_on_the_calling_thread():
+    host = SimulationHost(_make_world(), _make_governor())
+    ran = []
+    assert not host.post(lambda: ran.append(threading.current_thread().name))
+
+    host.start()
+    try:
+        assert host.post(lambda: ran.append(threading.current_thread().name))
+        assert _wait_for(lambda: ran)
+    finally:
+        host.stop()
+
+    assert ran == ["simulation-host"]
+
+def test_paused_governor_blocks_steps():
+    world = _make_world()
+    governor = _make_governor()
+    governor.is_paused.return_value = True
+    host = SimulationHost(world, governor, paused_delay=0.01)
+
+    host.start()
+    try:
+        time.sleep(0.1)
+    finally:
+        host.stop()
+
+    world.step.assert_not_called()
@@ -0,0 +1,78 @@
+from prometheus_client import REGISTRY
+
+from modules.snapshot_ring import SnapshotRing
+from modules.state_tracker import EternaStateTracker
+
+
+def _rollback_count(source):
+    return REGISTRY.get_sample_value("governor_rollback_seconds_count", {"source": source}) or 0.0
+
+
+def test_ring_keeps_the_newest_snapshots(tmp_path):
+    ring = SnapshotRing(capacity=2)
+    for i in range(3):
+        ring.push(tmp_path / f"ckpt_{i}.bin", {"cycle_count": i})
+
+    assert len(ring) == 2
+    assert ring.get(tmp_path / "ckpt_0.bin") is None
+    assert ring.get(tmp_path / "ckpt_1.bin")[1] == {"cycle_count": 1}
+    assert ring.get() == (tmp_path / "ckpt_2.bin", {"cycle_count": 2})
+
+
+def test_disabled_ring_holds_nothing(tmp_path):
+    ring = SnapshotRing(capacity=0)
+    ring.push(tmp_path / "ckpt_0.bin", {})
+
+    assert len(ring) == 0 and ring.get() is None
+
+
+def test_rollback_to_recent_checkpoint_skips_disk(make_governor):
+    governor = make_governor()
+    world = governor.world
+    before = _rollback_count("memory")
+    assert governor._save_checkpoint()
+    governor.flush_checkpoints(2.0)
+    governor.rollback()
+
+    world.load_checkpoint.assert_not_called()
+    world.restore_checkpoint.assert_called_once()
+    restored, path = world.restore_checkpoint.call_args.args
+    assert restored["state_tracker_data"]["last_zone"] == "Forest"
+    assert path == governor._latest_checkpoint()
+    assert _rollback_count("memory") == before + 1
+
+
+def test_rollback_falls_back_to_disk(make_governor):
+    governor = make_governor(snapshot_ring_size=0)
+    world = governor.world
+    before = _rollback_count("disk")
+    assert governor._save_checkpoint()
+    governor.flush_checkpoints(2.0)
+    governor.rollback()
+
+    world.restore_checkpoint.assert_not_called()
+    world.load_checkpoint.assert_called_once_with(governor._latest_checkpoint(), allow_pickle=True)
+    assert _rollback_count("disk") == before + 1
+
+
+def test_queries_after_restore_see_the_restored_state(tmp_path):
+    tracker = EternaStateTracker(save_path=str(tmp_path / "state.json"), use_database=False)
+    tracker.add_memory({"description": "a", "emotional_quality": "joy"})
+    snapshot = {
+        "memories": list(tracker.memories),
+        "applied_modifiers": {"Zone A": [{"type": "boost"}]},
+        "explored_zones": ["Zone A"],
+    }
+    tracker.add_memory({"description": "b", "emotional_quality": "joy"})
+    tracker.add_modifier("Zone B", {"type": "boost"})
+    tracker.mark_zone_explored("Zone B")
+    assert len(tracker.get_memories_by_emotion("joy")) == 2
+    assert len(tracker.get_modifiers_by_type("boost")) == 1
+
+    tracker.restore_state(snapshot)
+
+    assert [m["description"] for m in tracker.get_memories_by_emotion("joy")] == ["a"]
+    assert tracker.get_modifiers_by_type("boost") == [{"zone": "Zone A", "modifier": {"type": "boost"}}]
+    assert tracker.get_modifiers_by_zone("Zone B") == []
+    tracker.mark_zone_explored("Zone B")
+    assert list(tracker.explored_zones) == ["Zone A", "Zone B"]
@@ -0,0 +1,40 @@
+from modules.database import EternaDatabase
+from modules.state_compaction import CompactionPolicy, StateCompactor, select_states_to_keep
+
+
+def test_select_states_to_keep_tiers():
+    now = 100 * 86400.0
+    states = [
+        (1, now - 60),          # recent: kept
+        (2, now - 90),          # recent: kept
+        (3, now - 3600 - 10),   # same minute as 4, older: dropped
+        (4, now - 3600 - 5),    # newest in its minute: kept
+        (5, now - 3 * 86400 - 100),  # same hour as 6, older: dropped
+        (6, now - 3 * 86400 - 50),   # newest in its hour: kept
+    ]
+    policy = CompactionPolicy(keep_all_minutes=10, per_minute_hours=24)
+
+    assert select_states_to_keep(states, policy, now=now) == {1, 2, 4, 6}
+
+
+def test_compactor_prunes_old_states_and_keeps_pointer_targets(tmp_path):
+    db_path = str(tmp_path / "eternia.db")
+    db = EternaDatabase(db_path=db_path)
+    base_id = db.save_state({"memories": [{"description": f"m{i}"} for i in range(200)], "last_zone": "A"})
+    for version in range(2, 30):
+        db.save_state({"version": version, "last_zone": f"Z{version}"})
+    # Age every state by two days so only one per hour survives
+    db.cursor.execute("UPDATE state SET timestamp = timestamp - 2 * 86400")
+    db.conn.commit()
+
+    report = StateCompactor(db_path, CompactionPolicy(batch_size=7)).run()
+
+    assert report.states_scanned == 29
+    # The newest state and the base holding its memories remain
+    assert report.states_deleted == 27
+    loaded = db.load_latest_state()
+    assert loaded["last_zone"] == "Z29"
+    assert loaded["memories_state_id"] == base_id
+    assert len(loaded["memories"]) == 200
+    assert report.pages_after <= report.pages_before
+    db.close()
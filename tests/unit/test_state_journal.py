@@ -0,0 +1,111 @@
+import threading
+
+from modules.state_journal import StateJournal, read_records
+from modules.state_tracker import EternaStateTracker
+
+
+def _tracker(tmp_path, **kwargs):
+    return EternaStateTracker(
+        save_path=str(tmp_path / "state.json"),
+        use_database=False,
+        journal_dir=str(tmp_path / "journal"),
+        **kwargs,
+    )
+
+
+def test_recover_truncates_torn_tail(tmp_path):
+    journal = StateJournal(str(tmp_path))
+    journal.append("add_memory", {"description": "a"})
+    journal.append("mark_zone", "Zone A")
+    journal.close()
+    segment = next(tmp_path.glob("journal-*.log"))
+    valid_size = segment.stat().st_size
+    with open(segment, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+
+    state, records = StateJournal(str(tmp_path)).recover()
+
+    assert state is None
+    assert records == [("add_memory", [{"description": "a"}]), ("mark_zone", ["Zone A"])]
+    assert segment.stat().st_size == valid_size
+    assert read_records(segment)[1] == valid_size
+
+
+def test_tracker_replays_journal_after_crash(tmp_path):
+    tracker = _tracker(tmp_path)
+    tracker.load()
+    tracker.add_memory({"description": "first light", "emotional_quality": "awe"})
+    tracker.add_modifier("Zone A", {"type": "boost", "effect": "calm"})
+    tracker.mark_zone("Zone A")
+    tracker.update_evolution(120, 110)
+    tracker.last_intensity = 7.5
+    tracker.last_dominance = 2.5
+    record = tracker.register_checkpoint({"path": "checkpoints/ckpt_1000.bin"})
+    # No shutdown: the process "crashes" with everything only in the journal
+
+    recovered = _tracker(tmp_path)
+    recovered.load()
+
+    assert recovered.get_memories_by_emotion("awe") == [{"description": "first light", "emotional_quality": "awe"}]
+    assert recovered.get_modifiers_by_type("boost") == [{"zone": "Zone A", "modifier": {"type": "boost", "effect": "calm"}}]
+    assert recovered.last_zone == "Zone A"
+    assert list(recovered.explored_zones) == ["Zone A"]
+    assert recovered.evolution_stats == {"intellect": 120, "senses": 110}
+    assert (recovered.last_intensity, recovered.last_dominance) == (7.5, 2.5)
+    assert list(recovered.checkpoints) == [record]
+
+
+def test_snapshot_supersedes_journal_segments(tmp_path):
+    tracker = _tracker(tmp_path, journal_snapshot_every=3)
+    tracker.load()
+    for i in range(3):
+        tracker.add_memory({"description": f"m{i}", "emotional_quality": "joy"})
+    tracker.save()
+    tracker.add_memory({"description": "m3", "emotional_quality": "joy"})
+    # The snapshot itself is written by the journal writer thread
+    assert tracker.flush(5.0)
+
+    journal_dir = tmp_path / "journal"
+    assert len(list(journal_dir.glob("snapshot-*.json"))) == 1
+    # Only the segment written after the snapshot remains
+    assert len(list(journal_dir.glob("journal-*.log"))) == 1
+
+    recovered = _tracker(tmp_path)
+    recovered.load()
+    assert [m["description"] for m in recovered.memories] == ["m0", "m1", "m2", "m3"]
+
+
+def test_restore_state_is_not_undone_by_replay(tmp_path):
+    tracker = _tracker(tmp_path)
+    tracker.load()
+    tracker.add_memory({"description": "a", "emotional_quality": "joy"})
+    tracker.add_memory({"description": "b", "emotional_quality": "joy"})
+    tracker.restore_state({"memories": [{"description": "a", "emotional_quality": "joy"}]})
+    # No shutdown: the process "crashes" right after the rollback
+
+    recovered = _tracker(tmp_path)
+    recovered.load()
+
+    assert [m["description"] for m in recovered.memories] == ["a"]
+
+
+def test_save_does_not_write_snapshots_on_the_calling_thread(tmp_path, monkeypatch):
+    tracker = _tracker(tmp_path, journal_snapshot_every=1)
+    tracker.load()
+    writers = []
+    write_snapshot = StateJournal.write_snapshot
+
+    def record_thread(self, state, seq=None):
+        writers.append(threading.current_thread())
+        return write_snapshot(self, state, seq)
+
+    monkeypatch.setattr(StateJournal, "write_snapshot", record_thread)
+    tracker.add_memory({"description": "a", "emotional_quality": "joy"})
+    tracker.save()
+    tracker.add_memory({"description": "b", "emotional_quality": "joy"})
+    assert tracker.flush(5.0)
+
+    assert writers and threading.current_thread() not in writers
+    recovered = _tracker(tmp_path)
+    recovered.load()
+    assert [m["description"] for m in recovered.memories] == ["a", "b"]
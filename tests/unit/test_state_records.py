@@ -0,0 +1,46 @@
+import json
+import pickle
+import sys
+
+from modules.state_records import DiscoveryRecord, MemoryRecord, ModifierEntry, json_default, to_builtin
+from modules.state_tracker import EternaStateTracker
+
+
+def test_memory_record_behaves_like_its_dict():
+    data = {"description": "first light", "emotional_quality": "awe", "tags": ["dawn"]}
+    record = MemoryRecord(data)
+
+    assert record == data
+    assert record["description"] == "first light"
+    assert record.get("clarity") is None and "clarity" not in record
+    assert record.to_dict() == data
+    assert json.loads(json.dumps([record], default=json_default)) == [data]
+    assert pickle.loads(pickle.dumps(record)) == data
+
+
+def test_records_intern_tags_and_stay_smaller_than_dicts():
+    first = DiscoveryRecord({"name": "a", "category": "".join(["arti", "fact"])})
+    second = DiscoveryRecord({"name": "b", "category": "".join(["art", "ifact"])})
+    assert first.category is second.category
+
+    data = {"description": "x", "emotional_quality": "joy", "clarity": 0.5}
+    assert sys.getsizeof(MemoryRecord(data)) * 2 < sys.getsizeof(data)
+    assert not hasattr(MemoryRecord(data), "__dict__")
+
+
+def test_tracker_stores_records_and_round_trips_json(tmp_path):
+    save_path = str(tmp_path / "state.json")
+    tracker = EternaStateTracker(save_path=save_path, use_database=False)
+    tracker.add_memory({"description": "m", "emotional_quality": "joy", "clarity": 0.9})
+    tracker.record_discovery({"name": "d", "category": "artifact"})
+    tracker.add_modifier("Zone A", {"type": "boost"})
+    tracker.save(incremental=False)
+
+    assert isinstance(tracker.memories[0], MemoryRecord)
+    assert isinstance(tracker.discoveries[0], DiscoveryRecord)
+    assert tracker.modifiers[0] == ModifierEntry("Zone A", {"type": "boost"})
+
+    loaded = EternaStateTracker(save_path=save_path, use_database=False)
+    loaded.load()
+    assert to_builtin(list(loaded.memories)) == [{"description": "m", "emotional_quality": "joy", "clarity": 0.9}]
+    assert loaded.get_discoveries_by_category("artifact") == [{"name": "d", "category": "artifact"}]
@@ -11,15 +11,16 @@ import random
 import concurrent.futures
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union, Tuple
-from collections import deque
 
 import torch
 
 from modules.ai_ml_rl.rl_companion_loop import PPOTrainer
 from modules.law_parser import load_laws
+from modules.checkpoint_writer import read_checkpoint_file, write_checkpoint_file
 from modules.state_tracker import EternaStateTracker
+from modules.state_writer import detach_snapshot
+from modules.world_snapshot import MetricsFrame, WorldSnapshot, build_world_snapshot
 from eterna_interface import EternaInterface
-from modules.utilities.file_utils import save_pickle, load_pickle
 
 from world_builder_modules.setup_modules_refactored import (
     setup_symbolic_modifiers,
@@ -34,6 +35,22 @@ from world_builder_modules.setup_modules_refactored import (
 
 CHECKPOINT_ROOT = Path("artifacts/checkpoints")
 
+_identity_gauge = None
+
+
+def _set_identity_gauge(value: float) -> None:
+    """Export the identity continuity of the latest metrics frame."""
+    global _identity_gauge
+    if _identity_gauge is None:
+        try:
+            # Imported lazily so the world works without the monitoring stack
+            from modules.monitoring import metrics
+            _identity_gauge = metrics.simulation_identity_continuity
+        except Exception:
+            _identity_gauge = False
+    if _identity_gauge:
+        _identity_gauge.set(value)
+
 
 class EternaWorld:
     """
@@ -165,6 +182,13 @@ class EternaWorld:
         # Using max_workers=3 as we have 3 main components to parallelize
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
 
+        # Metrics of the latest cycle, computed once and shared by every reader
+        self._metrics_frame: Optional[MetricsFrame] = None
+
+        # Frozen per-tick view served to read endpoints; no continuity has
+        # been measured before the first tick.
+        self.snapshot: WorldSnapshot = build_world_snapshot(self, 1.0)
+
     # ---------- runtime hooks ---------- #
     def step(self, dt: float = 1.0) -> None:
         """
@@ -175,11 +199,85 @@ class EternaWorld:
         2. Updates the RL companion system
         3. Handles law compliance and agent evolution
         4. Performs debug logging, UI state updates, and metrics collection in parallel
-        5. Saves the current state
+        5. Publishes a frozen WorldSnapshot for read endpoints
+        6. Saves the current state
 
         Args:
             dt: The time delta for this step. Defaults to 1.0.
         """
+        emo, reward = self._advance()
+
+        # Execute independent components in parallel
+        # Submit tasks to the executor
+        debug_future = self.executor.submit(self._log_debug_info, emo, reward)
+        ui_future = self.executor.submit(self._update_ui_state)
+        metrics_future = self.executor.submit(self.collect_metrics)
+
+        # Wait for all tasks to complete
+        # This ensures we don't proceed until all parallel tasks are done
+        concurrent.futures.wait([debug_future, ui_future, metrics_future])
+
+        # Get metrics result if needed (for governor or other components)
+        metrics = metrics_future.result()
+
+        # Publish this tick's frozen snapshot for readers
+        self.publish_snapshot(metrics.get("identity_continuity"))
+
+        # Save current state
+        self.state_tracker.save()
+
+    def run_steps(self, n: int, persist_every: int = 0, metrics_every: int = 0) -> List[Dict[str, Any]]:
+        """
+        Advance the simulation by many steps in one call, without a UI attached.
+
+        Intended for offline runs and benchmarks. Unlike step(), the per-tick
+        work runs inline instead of being fanned out to the executor, and the
+        state is persisted and metrics collected only every persist_every and
+        metrics_every ticks. The state is always persisted and a snapshot
+        published after the last tick.
+
+        Note that identity continuity is measured between consecutive
+        collections, i.e. across metrics_every ticks.
+
+        Args:
+            n: Number of steps to run.
+            persist_every: Save the state every N ticks; 0 saves only at the end.
+                Defaults to 0.
+            metrics_every: Collect metrics every N ticks; 0 disables collection.
+                Defaults to 0.
+
+        Returns:
+            List[Dict[str, Any]]: The collected metrics, each with the 'cycle'
+                it was taken at.
+        """
+        collected: List[Dict[str, Any]] = []
+        identity_score = None
+        for i in range(1, n + 1):
+            emo, reward = self._advance()
+            self._log_debug_info(emo, reward)
+            self._update_ui_state()
+
+            if metrics_every and i % metrics_every == 0:
+                metrics = self.collect_metrics()
+                identity_score = metrics.get("identity_continuity")
+                collected.append({**metrics, "cycle": self.eterna.runtime.cycle_count})
+
+            if persist_every and i % persist_every == 0:
+                self.state_tracker.save()
+
+        if n > 0:
+            self.publish_snapshot(identity_score)
+            if not persist_every or n % persist_every:
+                self.state_tracker.save()
+        return collected
+
+    def _advance(self) -> Tuple[str, float]:
+        """
+        Run the core of a step: cycle, RL companion, laws and agent evolution.
+
+        Returns:
+            Tuple containing the emotion name and the reward for this tick.
+        """
         # Advance physics / emotions
         self.eterna.runtime.run_cycle()
 
@@ -203,22 +301,7 @@ class EternaWorld:
 
         # Update agent evolution
         self._update_agent_evolution(companion)
-
-        # Execute independent components in parallel
-        # Submit tasks to the executor
-        debug_future = self.executor.submit(self._log_debug_info, emo, reward)
-        ui_future = self.executor.submit(self._update_ui_state)
-        metrics_future = self.executor.submit(self.collect_metrics)
-
-        # Wait for all tasks to complete
-        # This ensures we don't proceed until all parallel tasks are done
-        concurrent.futures.wait([debug_future, ui_future, metrics_future])
-
-        # Get metrics result if needed (for governor or other components)
-        metrics = metrics_future.result()
-
-        # Save current state
-        self.state_tracker.save()
+        return emo, reward
 
     def _update_rl_companion(self, companion, emo: str) -> Tuple[List[float], int, float]:
         """
@@ -254,7 +337,11 @@ class EternaWorld:
             # Use the default observation vector
             pass
         else:
-            obs = self.state_tracker.observation_vector(companion)
+            # Reuse the continuity of the last frame rather than measuring it
+            # mid-step, which would move its baseline
+            frame = self._metrics_frame
+            identity = frame.get("identity_continuity", 1.0) if frame is not None else 1.0
+            obs = self.state_tracker.observation_vector(companion, identity=identity)
 
         obs_tensor = torch.tensor(obs, dtype=torch.float32)
 
@@ -482,98 +569,171 @@ class EternaWorld:
                 ritual = random.choice(list(self.eterna.rituals.rituals.values()))
                 self.eterna.rituals.perform(ritual.name)
 
-    def collect_metrics(self) -> Dict[str, Any]:
+    def collect_metrics(self) -> MetricsFrame:
         """
         Collect metrics about the current state of the world.
 
         This method gathers metrics that are used by the AlignmentGovernor
         to determine if the simulation should continue, pause, or roll back.
+        They are computed once per runtime cycle: later calls in the same
+        cycle return the same read-only frame, so identity_continuity(),
+        which moves its baseline on every call, is measured exactly once.
 
         Returns:
-            Dict[str, Any]: A dictionary of metrics, including 'identity_continuity'
-                which measures how much the world's identity has changed.
+            MetricsFrame: The metrics of the current cycle, including
+                'identity_continuity' which measures how much the world's
+                identity has changed.
         """
-        return {
+        cycle = self.eterna.runtime.cycle_count
+        frame = self._metrics_frame
+        if frame is not None and frame.cycle == cycle:
+            return frame
+        frame = MetricsFrame(cycle, {
             "identity_continuity": self.state_tracker.identity_continuity(),
             # Placeholder for extra eval‑harness flags
-        }
+        })
+        self._metrics_frame = frame
+        _set_identity_gauge(frame["identity_continuity"])
+        return frame
+
+    def publish_snapshot(self, identity_score: Optional[float] = None) -> WorldSnapshot:
+        """
+        Capture and publish a frozen snapshot of the current world state.
+
+        Must be called from the thread that mutates the world. Readers get the
+        new snapshot through a single attribute swap.
+
+        Args:
+            identity_score: Identity continuity for this tick. If None, the
+                previous snapshot's score is reused.
+
+        Returns:
+            WorldSnapshot: The published snapshot.
+        """
+        if identity_score is None:
+            identity_score = self.snapshot.identity_score
+        self.snapshot = build_world_snapshot(self, identity_score)
+        return self.snapshot
 
     # ---------- checkpoint API ---------- #
-    def save_checkpoint(self, path: Path) -> None:
+    def capture_checkpoint(self, since: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Save the current state of the world to a checkpoint file.
+        Capture the state a checkpoint needs, without serializing it.
 
-        Memory optimization:
-        - Uses a more selective approach to save only essential state
-        - Avoids serializing large objects that can be reconstructed
-        - Compresses the checkpoint data to reduce disk space usage
+        Runs on the simulation thread, so the capture is consistent with the
+        current tick. Copies are kept minimal: the tracker's records are
+        immutable and shared, only their containers are copied, and the
+        policy weights are cloned since training updates them in place. Dirty
+        tracker state is handed to the background state writer without
+        waiting for it.
 
         Args:
-            path: The path where the checkpoint should be saved.
+            since: Optional "versions" of an earlier capture. Tracker
+                collections and policy tensors unchanged since then are left
+                out (and not copied), for a differential checkpoint.
+
+        Returns:
+            Dict[str, Any]: Checkpoint data that no longer aliases live state,
+                ready for write_checkpoint_file() on another thread, plus the
+                "versions" to pass as ``since`` to a later capture.
         """
-        # Create a dictionary with only the essential state
-        checkpoint_data = {
-            # Save state tracker data
-            "state_tracker_data": {
-                "last_emotion": self.state_tracker.last_emotion,
-                "applied_modifiers": self.state_tracker.applied_modifiers,
-                "memories": list(self.state_tracker.memories),
-                "evolution_stats": self.state_tracker.evolution_stats,
-                "explored_zones": list(self.state_tracker.explored_zones),
-                "discoveries": list(self.state_tracker.discoveries),
-                "last_zone": self.state_tracker.last_zone,
-            },
-            # Save RL trainer state (only the model weights, not the entire buffer)
+        self.state_tracker.flush(timeout=0)
+
+        tracker_versions = self.state_tracker.collection_versions()
+        policy = getattr(self.companion_trainer, "policy", None)
+        policy_versions = {}
+        policy_weights = None
+        if policy is not None:
+            policy_weights = {}
+            for name, tensor in policy.state_dict().items():
+                # Training updates weights in place, which bumps _version
+                policy_versions[name] = (tensor.data_ptr(), tensor._version)
+                if since is None or since["policy"].get(name) != policy_versions[name]:
+                    policy_weights[name] = tensor.detach().clone()
+
+        tracker_data = {
+            "last_emotion": self.state_tracker.last_emotion,
+            "applied_modifiers": self.state_tracker.applied_modifiers,
+            "memories": self.state_tracker.memories,
+            "evolution_stats": self.state_tracker.evolution_stats,
+            "explored_zones": self.state_tracker.explored_zones,
+            "discoveries": self.state_tracker.discoveries,
+            "last_zone": self.state_tracker.last_zone,
+        }
+        if since is not None:
+            # Collections unchanged since the earlier capture are not copied
+            tracker_data = {
+                key: value for key, value in tracker_data.items()
+                if key not in tracker_versions or since["tracker"].get(key) != tracker_versions[key]
+            }
+
+        return {
+            # State tracker data
+            "state_tracker_data": detach_snapshot(tracker_data),
+            # RL trainer state (only the model weights, not the entire buffer)
             "companion_trainer_weights": {
-                "policy": self.companion_trainer.policy.state_dict() if hasattr(self.companion_trainer, "policy") else None,
+                "policy": policy_weights,
             },
-            # Save runtime state
+            # Runtime state
             "cycle_count": self.eterna.runtime.cycle_count if hasattr(self.eterna, "runtime") else 0,
+            "versions": {"tracker": tracker_versions, "policy": policy_versions},
         }
 
-        # Save the checkpoint data
-        save_pickle(path, checkpoint_data, create_dirs=True)
+    def save_checkpoint(self, path: Path) -> None:
+        """
+        Save the current state of the world to a checkpoint file.
+
+        Captures the state, waits for the tracker's persistence to catch up
+        and writes the checkpoint synchronously. The governor instead writes
+        captured checkpoints on a BackgroundCheckpointWriter.
+
+        Args:
+            path: The path where the checkpoint should be saved.
+        """
+        checkpoint_data = self.capture_checkpoint()
+
+        # Make sure the persisted state has caught up with the checkpoint
+        self.state_tracker.flush()
+        write_checkpoint_file(path, checkpoint_data)
 
         # Register the checkpoint with the state tracker
         self.state_tracker.register_checkpoint(str(path))
 
-    def load_checkpoint(self, path: Path) -> None:
+    def load_checkpoint(self, path: Path, allow_pickle: bool = True) -> None:
         """
         Load a previously saved checkpoint.
 
         Memory optimization:
         - Selectively loads only the essential state
         - Reconstructs objects rather than deserializing them entirely
+        - Memory maps the policy weights instead of reading them up front
         - Maintains memory limits and constraints
 
         Args:
             path: The path to the checkpoint file to load.
+            allow_pickle: Whether pickled checkpoints from earlier versions may
+                be loaded. Pass False for paths that are not trusted.
+                Defaults to True.
+        """
+        # Load the checkpoint data; older checkpoints are pickles
+        checkpoint_data = read_checkpoint_file(path, allow_pickle=allow_pickle)
+        self.restore_checkpoint(checkpoint_data, path)
+
+    def restore_checkpoint(self, checkpoint_data: Dict[str, Any], path: Path) -> None:
         """
-        # Load the checkpoint data
-        checkpoint_data = load_pickle(path)
+        Restore the world from checkpoint data already in memory.
 
+        The data is left untouched, so a snapshot held for fast rollback can
+        be restored more than once: the containers the tracker mutates are
+        copied, and the policy weights are copied into the live parameters.
+
+        Args:
+            checkpoint_data: Data shaped like capture_checkpoint() returns it.
+            path: The checkpoint file the data belongs to.
+        """
         # Restore state tracker data
         if "state_tracker_data" in checkpoint_data:
-            st_data = checkpoint_data["state_tracker_data"]
-            self.state_tracker.last_emotion = st_data.get("last_emotion")
-            self.state_tracker.applied_modifiers = st_data.get("applied_modifiers", {})
-
-            # Restore collections as bounded deques
-            self.state_tracker.memories = deque(
-                st_data.get("memories", []), 
-                maxlen=self.state_tracker.max_memories
-            )
-            self.state_tracker.discoveries = deque(
-                st_data.get("discoveries", []), 
-                maxlen=self.state_tracker.max_discoveries
-            )
-            self.state_tracker.explored_zones = deque(
-                st_data.get("explored_zones", []), 
-                maxlen=self.state_tracker.max_explored_zones
-            )
-
-            self.state_tracker.evolution_stats = st_data.get("evolution_stats", self.state_tracker.evolution_stats)
-            self.state_tracker.last_zone = st_data.get("last_zone")
+            self.state_tracker.restore_state(checkpoint_data["state_tracker_data"])
 
         # Restore RL trainer weights
         if "companion_trainer_weights" in checkpoint_data and hasattr(self.companion_trainer, "policy"):
@@ -588,6 +748,10 @@ class EternaWorld:
         # Mark that we've loaded this checkpoint
         self.state_tracker.mark_rollback(str(path))
 
+        # Readers should not keep seeing the pre-rollback state
+        self._metrics_frame = None
+        self.publish_snapshot()
+
     def __del__(self) -> None:
         """
         Clean up resources when the EternaWorld instance is garbage collected.